@@ -0,0 +1,380 @@
+#!/usr/bin/env python
+
+#   Benchmarks of the CVSS v2 calculator.
+#   Copyright (C) 2026  Jakub Svoboda
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+from __future__ import print_function
+import collections
+import itertools
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import cvssv2
+
+
+all_metrics_values = cvssv2.base_metrics_values + cvssv2.temp_metrics_values + cvssv2.env_metrics_values
+cli_script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cvssv2.py")
+
+# the latency budget of the library (enforced by check_latency_budget, i.e. by --budget, and by test27 of test.py if the environment variable CVSSV2_CHECK_BUDGET is set); the limits are several times above the times measured on a typical machine so that they hold on slow machines too, but they catch the regressions that change the order of magnitude (such as building a table at import or on every call)
+import_time_budget = 0.01 # seconds to execute the cvssv2 module at import (the compilation of the source is not counted, it is cached in the .pyc file)
+call_time_budgets = collections.OrderedDict(( # seconds per call of the library functions on complete valid vectors (the scoring tables are built before the timed runs, the score cache is disabled)
+	("encode_cvssv2_vector", 25e-6),
+	("fast_compute_all", 25e-6),
+	("score_vector", 50e-6),
+	("evaluate_cvssv2_vector", 100e-6)
+))
+import_time_script = """
+import json
+import sys
+import time
+code = compile(open(sys.argv[1]).read(), sys.argv[1], "exec")
+module = type(sys)("cvssv2")
+module.__file__ = sys.argv[1]
+sys.modules["cvssv2"] = module
+start = time.time()
+exec(code, module.__dict__)
+elapsed = time.time() - start
+print(json.dumps([elapsed, "argparse" in sys.modules, module.token_tables == None, module.scoring_tables == None, module.numpy_scoring_tables == None]))
+""" # executes the cvssv2 module in a new process and prints the time, whether argparse was imported and whether the token and scoring tables are still unbuilt
+
+
+def random_valid_vector(rnd, num_of_metrics = None):
+	"""Returns a random valid vector string with the first num_of_metrics metrics (all of them if None) in the canonical order."""
+
+	if num_of_metrics == None:
+		num_of_metrics = len(all_metrics_values)
+	return "/".join(metric + ":" + rnd.choice(values) for metric, values in all_metrics_values[:num_of_metrics])
+
+
+def random_malformed_vector(rnd):
+	"""Returns a random vector string with one of the typical errors (an invalid value, a missing colon, an empty part, an unknown or a duplicate metric, a truncated vector)."""
+
+	parts = random_valid_vector(rnd).split("/")
+	position = rnd.randrange(len(parts))
+	error = rnd.randrange(6)
+	if error == 0:
+		parts[position] = parts[position] + "x"
+	elif error == 1:
+		parts[position] = parts[position].replace(":", "")
+	elif error == 2:
+		parts.insert(position, "")
+	elif error == 3:
+		parts.insert(position, "XX:Y")
+	elif error == 4:
+		parts.append(parts[position].split(":")[0] + ":ND")
+	else:
+		parts = parts[:position]
+	return "/".join(parts)
+
+
+def mixed_corpus(size, seed = 0):
+	"""Returns a deterministic list of size vector strings: 60 % complete valid vectors, 10 % valid base-only vectors and 30 % malformed vectors."""
+
+	rnd = random.Random(seed)
+	corpus = list()
+	for i in range(size):
+		kind = rnd.random()
+		if kind < 0.6:
+			corpus.append(random_valid_vector(rnd))
+		elif kind < 0.7:
+			corpus.append(random_valid_vector(rnd, len(cvssv2.base_metrics_values)))
+		else:
+			corpus.append(random_malformed_vector(rnd))
+	return corpus
+
+
+def exhaustive_corpus():
+	"""Returns the list of all valid combinations of the base and temporal metrics (72900 complete vectors); the environmental metrics cycle deterministically through all their combinations."""
+
+	env_combinations = list(itertools.product(*[values for metric, values in cvssv2.env_metrics_values]))
+	env_metrics = [metric for metric, values in cvssv2.env_metrics_values]
+	corpus = list()
+	for position, combination in enumerate(itertools.product(*[values for metric, values in cvssv2.base_metrics_values + cvssv2.temp_metrics_values])):
+		metric_values = list(zip([metric for metric, values in cvssv2.base_metrics_values + cvssv2.temp_metrics_values], combination)) + list(zip(env_metrics, env_combinations[position % len(env_combinations)]))
+		corpus.append("/".join(metric + ":" + value for metric, value in metric_values))
+	return corpus
+
+
+def random_corpus(size, seed = 0):
+	"""Returns a deterministic list of size random complete valid vectors."""
+
+	rnd = random.Random(seed)
+	return [random_valid_vector(rnd) for i in range(size)]
+
+
+def shuffled_corpus(size, seed = 0):
+	"""Returns a deterministic list of size random complete valid vectors with the metrics in a random order."""
+
+	rnd = random.Random(seed)
+	corpus = list()
+	for i in range(size):
+		parts = random_valid_vector(rnd).split("/")
+		rnd.shuffle(parts)
+		corpus.append("/".join(parts))
+	return corpus
+
+
+def malformed_corpus(size, seed = 0):
+	"""Returns a deterministic list of size malformed vectors (see random_malformed_vector)."""
+
+	rnd = random.Random(seed)
+	return [random_malformed_vector(rnd) for i in range(size)]
+
+
+def build_corpora(size, seed = 0):
+	"""Returns an ordered dictionary of corpus name:list of vector strings with all benchmark corpora."""
+
+	corpora = collections.OrderedDict()
+	corpora["exhaustive"] = exhaustive_corpus()
+	corpora["random"] = random_corpus(size, seed)
+	corpora["shuffled"] = shuffled_corpus(size, seed)
+	corpora["malformed"] = malformed_corpus(size, seed)
+	corpora["mixed"] = mixed_corpus(size, seed)
+	return corpora
+
+
+def time_function(function, corpus, repeat = 3):
+	"""Calls the function on every item of the corpus. Returns the best time (in seconds) of the repeated runs."""
+
+	best = None
+	for i in range(repeat):
+		start = time.time()
+		for item in corpus:
+			function(item)
+		elapsed = time.time() - start
+		if (best == None) or (elapsed < best):
+			best = elapsed
+	return best
+
+
+def time_call(function, repeat = 3):
+	"""Calls the function without arguments. Returns the best time (in seconds) of the repeated runs."""
+
+	best = None
+	for i in range(repeat):
+		start = time.time()
+		function()
+		elapsed = time.time() - start
+		if (best == None) or (elapsed < best):
+			best = elapsed
+	return best
+
+
+def time_cli_single(corpus, repeat = 3):
+	"""Runs the command line program once per vector of the corpus (python cvssv2.py -v VECTOR -b). Returns the best time (in seconds) of the repeated runs."""
+
+	with open(os.devnull, "w") as devnull:
+		return time_function(lambda cvss_vector: subprocess.call([sys.executable, cli_script, "-v", cvss_vector, "-b"], stdout=devnull), corpus, repeat)
+
+
+def time_cli_batch(corpus, repeat = 3):
+	"""Runs the command line program once in the batch mode over the whole corpus. Returns the best time (in seconds) of the repeated runs."""
+
+	file_descriptor, file_name = tempfile.mkstemp()
+	try:
+		with os.fdopen(file_descriptor, "w") as f:
+			f.write("\n".join(corpus) + "\n")
+		with open(os.devnull, "w") as devnull:
+			return time_call(lambda: subprocess.call([sys.executable, cli_script, "--batch", file_name], stdout=devnull), repeat)
+	finally:
+		os.remove(file_name)
+
+
+def measure_import(repeat = 3):
+	"""Executes the cvssv2 module in new processes (see import_time_script). Returns the best time (in seconds), whether argparse was imported and whether any table (the token tables of the parsers or the scoring tables) was built at import."""
+
+	best = None
+	for i in range(repeat):
+		elapsed, argparse_imported, no_token_tables, no_tables, no_numpy_tables = json.loads(subprocess.check_output([sys.executable, "-c", import_time_script, cli_script]).decode("ascii"))
+		if (best == None) or (elapsed < best):
+			best = elapsed
+	return best, argparse_imported, not (no_token_tables and no_tables and no_numpy_tables)
+
+
+def check_latency_budget(size = 2000, seed = 0, repeat = 3):
+	"""Measures the import and the library functions of call_time_budgets on a random corpus of size vectors. Returns the list of the exceeded budgets as (name, budget, measured) tuples (the times in seconds per import or per call)."""
+
+	exceeded = list()
+	import_time, argparse_imported, tables_built = measure_import(repeat)
+	if import_time > import_time_budget:
+		exceeded.append(("import", import_time_budget, import_time))
+
+	corpus = random_corpus(size, seed)
+	inputs = {
+		"encode_cvssv2_vector": corpus,
+		"fast_compute_all": [cvssv2.encode_cvssv2_vector(cvss_vector) for cvss_vector in corpus],
+		"score_vector": corpus,
+		"evaluate_cvssv2_vector": corpus
+	}
+	cvssv2.get_scoring_tables()
+	score_cache = cvssv2.score_cache
+	cvssv2.disable_score_cache()
+	try:
+		for name, budget in call_time_budgets.items():
+			call_time = time_function(getattr(cvssv2, name), inputs[name], repeat) / size
+			if call_time > budget:
+				exceeded.append((name, budget, call_time))
+	finally:
+		cvssv2.score_cache = score_cache
+	return exceeded
+
+
+def tolerate_key_error(function):
+	"""Wraps the function so that it returns None instead of raising KeyError (compute_env raises it when the C/I/A metrics are missing but the environmental group is valid)."""
+
+	def wrapper(item):
+		try:
+			return function(item)
+		except KeyError:
+			return None
+	return wrapper
+
+
+def benchmark_functions():
+	"""Returns the list of the benchmarked library functions as (name, input kind, function) tuples. The input kind is "string" (the vector string), "values" (the metric:value dictionary) or "packed" (the packed vector)."""
+
+	return [
+		("parse_cvssv2_vector", "string", cvssv2.parse_cvssv2_vector),
+		("parse_cvssv2_vector_fast", "string", cvssv2.parse_cvssv2_vector_fast),
+		("encode_cvssv2_vector", "string", cvssv2.encode_cvssv2_vector),
+		("validate_metrics_base", "values", cvssv2.validate_metrics_base),
+		("validate_metrics_temp", "values", cvssv2.validate_metrics_temp),
+		("validate_metrics_env", "values", cvssv2.validate_metrics_env),
+		("validate_metrics_all", "values", cvssv2.validate_metrics_all),
+		("compute_base", "values", cvssv2.compute_base),
+		("compute_temp", "values", cvssv2.compute_temp),
+		("compute_env", "values", tolerate_key_error(cvssv2.compute_env)),
+		("fast_compute_all", "packed", cvssv2.fast_compute_all),
+		("score_vector", "string", cvssv2.score_vector),
+		("evaluate_cvssv2_vector", "string", cvssv2.evaluate_cvssv2_vector)
+	]
+
+
+def run_benchmarks(corpora, repeat = 3, cli_sample_size = 20):
+	"""Runs all benchmarks on all corpora. Returns an ordered dictionary corpus name:(benchmark name:{"seconds": best time, "rate": items per second}). The command line benchmarks run on the first cli_sample_size vectors of the corpus when starting one process per vector (0 disables the command line benchmarks)."""
+
+	# the tables are built outside of the timed runs
+	cvssv2.get_scoring_tables()
+	try:
+		import numpy
+	except ImportError:
+		numpy = None
+
+	results = collections.OrderedDict()
+	for corpus_name, corpus in corpora.items():
+		inputs = {
+			"string": corpus,
+			"values": [cvssv2.parse_cvssv2_vector(cvss_vector)[0] for cvss_vector in corpus],
+			"packed": [cvssv2.encode_cvssv2_vector(cvss_vector) for cvss_vector in corpus]
+		}
+		corpus_results = collections.OrderedDict()
+		for name, input_kind, function in benchmark_functions():
+			corpus_results[name] = benchmark_result(time_function(function, inputs[input_kind], repeat), len(corpus))
+		if numpy != None:
+			packed_array = numpy.array(inputs["packed"], numpy.int64)
+			corpus_results["score_many"] = benchmark_result(time_call(lambda: cvssv2.score_many(corpus), repeat), len(corpus))
+			corpus_results["score_many (packed)"] = benchmark_result(time_call(lambda: cvssv2.score_many(packed_array), repeat), len(corpus))
+		if cli_sample_size > 0:
+			corpus_results["cli -v"] = benchmark_result(time_cli_single(corpus[:cli_sample_size], 1), min(cli_sample_size, len(corpus)))
+			corpus_results["cli --batch"] = benchmark_result(time_cli_batch(corpus, 1), len(corpus))
+		results[corpus_name] = corpus_results
+	return results
+
+
+def benchmark_result(seconds, count):
+	"""Returns the result record of one benchmark."""
+
+	return collections.OrderedDict((("seconds", seconds), ("rate", count / seconds if seconds > 0 else float("inf"))))
+
+
+def compare_results(old_results, new_results, threshold = 0.1):
+	"""Compares two benchmark results (the "results" part of the JSON report). Returns the list of regressions as (corpus name, benchmark name, old rate, new rate) tuples for the benchmarks whose rate dropped by more than the threshold (a fraction of the old rate). Benchmarks missing in either result are skipped."""
+
+	regressions = list()
+	for corpus_name, corpus_results in new_results.items():
+		for name, result in corpus_results.items():
+			if (corpus_name in old_results) and (name in old_results[corpus_name]):
+				old_rate = old_results[corpus_name][name]["rate"]
+				if result["rate"] < old_rate * (1 - threshold):
+					regressions.append((corpus_name, name, old_rate, result["rate"]))
+	return regressions
+
+
+def main():
+	"""Runs the benchmarks, prints the rates and optionally saves them into a JSON report and compares them with a previous report."""
+
+	import argparse
+	parser = argparse.ArgumentParser()
+	parser.add_argument('-n', '--size', type=int, default=20000, help="The number of vectors in the random corpora (the exhaustive corpus has always 72900 vectors).")
+	parser.add_argument('-s', '--seed', type=int, default=0, help="The seed of the corpus generators.")
+	parser.add_argument('-r', '--repeat', type=int, default=3, help="The number of runs of each benchmark; the best run is reported.")
+	parser.add_argument('-c', '--corpus', action='append', help="Runs only the given corpus (exhaustive, random, shuffled, malformed, mixed); can be repeated.")
+	parser.add_argument('--cli-sample', type=int, default=20, help="The number of vectors scored by starting one process per vector (0 skips the command line benchmarks).")
+	parser.add_argument('-o', '--output', help="Saves the results into the given JSON file.")
+	parser.add_argument('--compare', metavar='FILE', help="Compares the results with a previous JSON report and exits with status 1 if any benchmark is slower by more than the threshold.")
+	parser.add_argument('--threshold', type=float, default=0.1, help="The allowed slowdown for --compare as a fraction of the previous rate (default 0.1).")
+	parser.add_argument('--budget', action='store_true', help="Only checks the latency budget (import_time_budget and call_time_budgets) and exits with status 1 if it is exceeded.")
+	args = parser.parse_args()
+
+	if args.budget:
+		exceeded = check_latency_budget(seed=args.seed, repeat=args.repeat)
+		for name, budget, measured in exceeded:
+			print("OVER BUDGET {}: {:.1f} us (budget {:.1f} us)".format(name, measured * 1e6, budget * 1e6))
+		if len(exceeded) > 0:
+			sys.exit(1)
+		print("within budget")
+		return
+
+	corpora = build_corpora(args.size, args.seed)
+	if args.corpus != None:
+		corpora = collections.OrderedDict((name, corpus) for name, corpus in corpora.items() if name in args.corpus)
+	results = run_benchmarks(corpora, args.repeat, args.cli_sample)
+
+	for corpus_name, corpus_results in results.items():
+		print("{} ({} vectors)".format(corpus_name, len(corpora[corpus_name])))
+		for name, result in corpus_results.items():
+			print("  {:<28} {:>14,.0f} vectors/s".format(name, result["rate"]))
+
+	report = collections.OrderedDict((
+		("python", sys.version.split()[0]),
+		("time", time.strftime("%Y-%m-%dT%H:%M:%S")),
+		("size", args.size),
+		("seed", args.seed),
+		("repeat", args.repeat),
+		("results", results)
+	))
+	if args.output != None:
+		with open(args.output, "w") as f:
+			json.dump(report, f, indent=2)
+
+	if args.compare != None:
+		with open(args.compare, "r") as f:
+			old_report = json.load(f)
+		regressions = compare_results(old_report["results"], results, args.threshold)
+		for corpus_name, name, old_rate, new_rate in regressions:
+			print("REGRESSION {} / {}: {:,.0f} -> {:,.0f} vectors/s".format(corpus_name, name, old_rate, new_rate))
+		if len(regressions) > 0:
+			sys.exit(1)
+
+
+
+if __name__ == '__main__':
+    main()
@@ -24,10 +24,102 @@
 # AV:A/AC:M/Au:S/C:P/I:P/A:N
 
 
+from __future__ import print_function
+import bisect
+import collections
+import itertools
+import os
+
+
 # the number of metrics for the individual groups in the CVSSv2 vector
 temp_num_of_metrics = 3
 env_num_of_metrics = 5
 
+# the metrics of the individual groups in the canonical order together with their valid values; the position of a value in its tuple is the value's ordinal
+base_metrics_values = (
+	("AV", ("L","A","N")),
+	("AC", ("H","M","L")),
+	("Au", ("M","S","N")),
+	("C", ("N","P","C")),
+	("I", ("N","P","C")),
+	("A", ("N","P","C"))
+)
+temp_metrics_values = (
+	("E", ("U","POC","F","H","ND")),
+	("RL", ("OF","TF","W","U","ND")),
+	("RC", ("UC","UR","C","ND"))
+)
+env_metrics_values = (
+	("CDP", ("N","L","LM","MH","H","ND")),
+	("TD", ("N","L","M","H","ND")),
+	("CR", ("L","M","H","ND")),
+	("IR", ("L","M","H","ND")),
+	("AR", ("L","M","H","ND"))
+)
+
+# dict of string:dict (metric:(value:ordinal))
+metric_ordinals = dict((metric, dict((value, ordinal) for ordinal, value in enumerate(values))) for metric, values in base_metrics_values + temp_metrics_values + env_metrics_values)
+
+# Packed vectors: a vector can be encoded into a single integer with a 3-bit field per metric (in the canonical order, the first metric in the lowest bits). The field is 0 for a missing metric, ordinal + 1 for a valid value and packed_invalid_value for an invalid value.
+packed_metrics = tuple(metric for metric, values in base_metrics_values + temp_metrics_values + env_metrics_values)
+packed_bits_per_metric = 3
+packed_invalid_value = 7
+packed_field_mask = 7
+packed_temp_shift = 18 # the temporal group follows the 6 base metrics
+packed_env_shift = 27 # the environmental group follows the 3 temporal metrics
+packed_base_mask = (1 << packed_temp_shift) - 1
+packed_temp_mask = (1 << (packed_env_shift - packed_temp_shift)) - 1
+packed_env_mask = (1 << (len(packed_metrics) * packed_bits_per_metric - packed_env_shift)) - 1
+try:
+	integer_types = (int, long)
+	string_types = (basestring,)
+	read_input = raw_input
+except NameError:
+	# Python 3
+	integer_types = (int,)
+	string_types = (str,)
+	read_input = input
+
+
+def build_token_tables():
+	"""Builds the token tables of the fast parsers (parse_cvssv2_vector_fast, encode_cvssv2_vector). The keys are the "metric:value" strings of all valid values."""
+
+	parse_tokens = {} # dict of string:(string, string) (token:(metric, value))
+	packed_tokens = {} # dict of string:(integer, integer) (token:(mask clearing the metric's field, the metric's field bits))
+	packed_invalid_tokens = {} # dict of string:(integer, integer) (metric:(mask clearing the metric's field, the invalid field bits))
+	for metric_position, (metric, values) in enumerate(base_metrics_values + temp_metrics_values + env_metrics_values):
+		metric_shift = metric_position * packed_bits_per_metric
+		clear_mask = ~(packed_field_mask << metric_shift)
+		for ordinal, value in enumerate(values):
+			parse_tokens[metric + ":" + value] = (metric, value)
+			packed_tokens[metric + ":" + value] = (clear_mask, (ordinal + 1) << metric_shift)
+		packed_invalid_tokens[metric] = (clear_mask, packed_invalid_value << metric_shift)
+	return parse_tokens, packed_tokens, packed_invalid_tokens
+
+
+token_tables = None # the lazily built token tables (parse_tokens, packed_tokens, packed_invalid_tokens, see build_token_tables)
+
+
+def get_token_tables():
+	"""Returns the token tables of the fast parsers (see build_token_tables), builds them on the first call."""
+
+	global token_tables
+	if token_tables == None:
+		token_tables = build_token_tables()
+	return token_tables
+
+
+byte_token_tables = None # the lazily built token tables keyed by byte strings (for the byte string input on Python 3)
+
+
+def get_byte_token_tables():
+	"""Returns the token tables of get_token_tables keyed by byte strings, builds them on the first call. The byte string input is looked up in them without decoding it; only the parts that are not valid tokens are decoded."""
+
+	global byte_token_tables
+	if byte_token_tables == None:
+		byte_token_tables = tuple(dict((key.encode("ascii"), value) for key, value in table.items()) for table in get_token_tables())
+	return byte_token_tables
+
 
 
 def parse_cvssv2_vector(cvss_vect_string):
@@ -51,6 +143,104 @@ def parse_cvssv2_vector(cvss_vect_string):
 	return cvss_vector_values, error_messages  
 
 
+def parse_cvssv2_vector_fast(cvss_vect_string):
+	"""Same as parse_cvssv2_vector but faster for bulk use. Valid metric:value pairs are looked up as whole tokens, so the names and values in the dictionary are the shared (interned) strings of *_metrics_values, and the error messages are only built when there are errors. Accepts also byte strings."""
+
+	cvss_vector_values = {} # dict of string:string
+	if cvss_vect_string == None:
+		return cvss_vector_values, ""
+	if isinstance(cvss_vect_string, bytes) and not isinstance(cvss_vect_string, str):
+		# a byte string (Python 3): the tokens are looked up as bytes, only the other parts are decoded
+		parse_tokens = get_byte_token_tables()[0]
+		metrics_list = cvss_vect_string.split(b"/")
+	else:
+		parse_tokens = get_token_tables()[0]
+		metrics_list = cvss_vect_string.split("/")
+
+	errors = None # list of the unparseable metric strings
+	for metric in metrics_list:
+		token = parse_tokens.get(metric)
+		if token != None:
+			cvss_vector_values[token[0]] = token[1]
+			continue
+		if not isinstance(metric, str):
+			metric = metric.decode("latin-1")
+		metric_name, colon, metric_value = metric.partition(":")
+		if len(colon) > 0:
+			cvss_vector_values[metric_name] = metric_value
+		else:
+			if errors == None:
+				errors = list()
+			errors.append(metric)
+
+	if errors == None:
+		return cvss_vector_values, ""
+	return cvss_vector_values, "".join("The metric string \"" + metric + "\" cannot be parsed.\n" for metric in errors)
+
+
+def pack_cvssv2_values(cvss_values):
+	"""Packs the metric:value dictionary into a single integer (see packed_metrics). Metrics that are not part of CVSSv2 are ignored."""
+
+	packed = 0
+	shift = 0
+	for metric in packed_metrics:
+		if metric in cvss_values:
+			ordinal = metric_ordinals[metric].get(cvss_values[metric])
+			if ordinal == None:
+				packed |= packed_invalid_value << shift
+			else:
+				packed |= (ordinal + 1) << shift
+		shift += packed_bits_per_metric
+	return packed
+
+
+def unpack_cvssv2_values(packed):
+	"""Unpacks the packed vector into a metric:value dictionary. An invalid metric gets an empty (invalid) value."""
+
+	cvss_values = {}
+	for metric, values in base_metrics_values + temp_metrics_values + env_metrics_values:
+		field = packed & packed_field_mask
+		if field == packed_invalid_value:
+			cvss_values[metric] = ""
+		elif field > 0:
+			cvss_values[metric] = values[field - 1]
+		packed >>= packed_bits_per_metric
+	return cvss_values
+
+
+def encode_cvssv2_vector(cvss_vect_string):
+	"""Parses the input string (CVSSv2 vector) into a packed integer. The result is the same as pack_cvssv2_values(parse_cvssv2_vector(cvss_vect_string)[0]), i.e. unparseable parts and unknown metrics are ignored and duplicate metrics are resolved the same way as in parse_cvssv2_vector (the last one wins), but the metric:value pairs are looked up as whole tokens without building the dictionary. Accepts also byte strings."""
+
+	packed = 0
+	if cvss_vect_string == None:
+		return packed
+	if isinstance(cvss_vect_string, bytes) and not isinstance(cvss_vect_string, str):
+		# a byte string (Python 3): the tokens are looked up as bytes, without decoding
+		parse_tokens, packed_tokens, packed_invalid_tokens = get_byte_token_tables()
+		separator, colon_separator = b"/", b":"
+	else:
+		parse_tokens, packed_tokens, packed_invalid_tokens = get_token_tables()
+		separator, colon_separator = "/", ":"
+	for metric in cvss_vect_string.split(separator):
+		token = packed_tokens.get(metric)
+		if token == None:
+			# an invalid value of a known metric, an unknown metric or an unparseable part
+			metric_name, colon, metric_value = metric.partition(colon_separator)
+			if (len(colon) == 0) or (metric_name not in packed_invalid_tokens):
+				continue
+			token = packed_invalid_tokens[metric_name]
+		clear_mask, bits = token
+		packed = (packed & clear_mask) | bits
+	return packed
+
+
+def decode_cvssv2_vector(packed):
+	"""Converts the packed vector into the canonical CVSSv2 vector string (metrics in the canonical order). An invalid metric is written with an empty value (e.g. "AR:") so that the string encodes back into the same packed vector."""
+
+	cvss_values = unpack_cvssv2_values(packed)
+	return "/".join(metric + ":" + cvss_values[metric] for metric in packed_metrics if metric in cvss_values)
+
+
 def validate_metrics(cvss_values, base_valid_metrics):
 	"""Validates the provided metrics values (cvss_values dictionary) based on the provided possible legal metrics values (base_valid_metrics dictionary). Returns a list of missing metrics, a list of metrics with invalid/missing values, and a multiline string with messages about encountered errors."""
 
@@ -72,18 +262,16 @@ def validate_metrics(cvss_values, base_valid_metrics):
 	return missing_list, error_list, error_messages
 
 
+# the valid values of the individual groups; dict of string:list (metric:list of valid values) in the canonical order of the metrics
+base_valid_metrics = collections.OrderedDict((metric, list(values)) for metric, values in base_metrics_values)
+temp_valid_metrics = collections.OrderedDict((metric, list(values)) for metric, values in temp_metrics_values)
+env_valid_metrics = collections.OrderedDict((metric, list(values)) for metric, values in env_metrics_values)
+
+
 def validate_metrics_base(cvss_values):
 	"""Validates the base metrics group. Returns a list of missing metrics, a list of metrics with invalid/missing values, and a multiline string with messages about encountered errors."""
 
 	# Base AV:[L,A,N]/AC:[H,M,L]/Au:[M,S,N]/C:[N,P,C]/I:[N,P,C]/A:[N,P,C]
-	base_valid_metrics = {
-		"AV":["L","A","N"],  
-		"AC":["H","M","L"],
-		"Au":["M","S","N"],  
-		"C":["N","P","C"],   
-		"I":["N","P","C"],   
-		"A":["N","P","C"]
-	}
 	return validate_metrics(cvss_values, base_valid_metrics)
 
 
@@ -91,11 +279,6 @@ def validate_metrics_temp(cvss_values):
 	"""Validates the temporal metrics group. Returns a list of missing metrics, a list of metrics with invalid/missing values, and a multiline string with messages about encountered errors."""
 
 	# Temporal E:[U,POC,F,H,ND]/RL:[OF,TF,W,U,ND]/RC:[UC,UR,C,ND]
-	temp_valid_metrics = {
-		"E":["U","POC","F","H","ND"],
-		"RL":["OF","TF","W","U","ND"],
-		"RC":["UC","UR","C","ND"]
-	}
 	return validate_metrics(cvss_values, temp_valid_metrics)
 
 
@@ -103,45 +286,173 @@ def validate_metrics_env(cvss_values):
 	"""Validates the environmental metrics group. Returns a list of missing metrics, a list of metrics with invalid/missing values, and a multiline string with messages about encountered errors."""
 
 	# Environmental CDP:[N,L,LM,MH,H,ND]/TD:[N,L,M,H,ND]/CR:[L,M,H,ND]/IR:[L,M,H,ND]/AR:[L,M,H,ND]
-	env_valid_metrics = {
-		"CDP":["N","L","LM","MH","H","ND"],
-		"TD":["N","L","M","H","ND"],
-		"CR":["L","M","H","ND"],
-		"IR":["L","M","H","ND"],
-		"AR":["L","M","H","ND"]
-	}
 	return validate_metrics(cvss_values, env_valid_metrics)
 
-def validate_metrics_all_print_errors(cvss_values, print_errors = True):
-	"""Validates all metrics. Prints error messages about encountered errors. Returns information indicating which metrics groups are not fully populated with valid values. The cvss_values parameter is a dictionary of the metric:value pairs from the CVSSv2 vector."""
 
-	missing_list_base, error_list_base, error_messages_base = validate_metrics_base(cvss_values)
+# the single-pass validation
+
+metrics_groups = ("base", "temp", "env")
+
+# the precompiled validation schema; tuple of (metric, group, set of valid values, text of the list of valid values for the error messages)
+metrics_schema = tuple((metric, group, frozenset(values), str(list(values))) for group, group_metrics_values in zip(metrics_groups, (base_metrics_values, temp_metrics_values, env_metrics_values)) for metric, values in group_metrics_values)
+valid_values_texts = dict((metric, valid_values_text) for metric, group, valid_values, valid_values_text in metrics_schema)
+
+# Diagnostics are recorded as (error code, group, metric, value) tuples and formatted into messages only on demand (see format_diagnostic). The group and metric are None for the parts of the vector string that are not metric:value pairs; the value is None for missing metrics.
+error_unparseable = 1 # a part of the vector string cannot be parsed (the value is the part)
+error_missing = 2 # the metric is missing
+error_invalid = 3 # the metric has an invalid value
+error_temp_missing_for_env = 4 # the whole temporal group is missing while the environmental group is specified (reported by print_validation_errors only)
+
+
+def format_diagnostic(diagnostic):
+	"""Formats the (error code, group, metric, value) diagnostic into the error message (without a newline) printed by the command line program."""
+
+	code, group, metric, value = diagnostic
+	if code == error_unparseable:
+		return "The metric string \"" + value + "\" cannot be parsed."
+	if code == error_missing:
+		return "The metric \'" + metric + "\':" + valid_values_texts[metric] + " was not found."
+	if code == error_invalid:
+		return "The metric value \'" + metric + ":" +  value + "\' is invalid (valid values are " + valid_values_texts[metric] + ")."
+	if code == error_temp_missing_for_env:
+		return "Temporal metrics missing but environmental metrics are specified. Temporal metrics are required for environmental metrics computation."
+	raise ValueError("Unknown error code " + str(code) + ".")
+
+
+class ValidationResult(object):
+	"""The result of validate_metrics_all. The diagnostics attribute is the list of the (error code, group, metric, value) tuples of all errors in the canonical order of the metrics (see format_diagnostic); errors is a dictionary keyed by the group name (one of metrics_groups) of the lists of the missing or invalid metrics (like the second value returned by validate_metrics). The missing, invalid and messages properties are derived from the diagnostics on demand: the dictionaries of the lists of the missing metrics, of the metrics with an invalid value and of the multiline strings with the error messages (formatted on the first access and kept). The *_missing_count attributes are the numbers of the missing metrics of the groups."""
+
+	__slots__ = ("errors", "diagnostics", "base_missing_count", "temp_missing_count", "env_missing_count", "formatted_messages")
+
+	def __init__(self):
+		self.errors = {"base": [], "temp": [], "env": []}
+		self.diagnostics = list()
+		self.base_missing_count = 0
+		self.temp_missing_count = 0
+		self.env_missing_count = 0
+		self.formatted_messages = None
+
+
+	def group_metrics(self, code):
+		"""Returns the dictionary (keyed by the group name) of the lists of the metrics with the error code."""
+
+		metrics = {"base": [], "temp": [], "env": []}
+		for diagnostic_code, group, metric, value in self.diagnostics:
+			if diagnostic_code == code:
+				metrics[group].append(metric)
+		return metrics
+
+
+	@property
+	def missing(self):
+		return self.group_metrics(error_missing)
 
-	missing_list_temp, error_list_temp, error_messages_temp = validate_metrics_temp(cvss_values)
 
-	missing_list_env, error_list_env, error_messages_env = validate_metrics_env(cvss_values)
+	@property
+	def invalid(self):
+		return self.group_metrics(error_invalid)
+
+
+	@property
+	def messages(self):
+		if self.formatted_messages == None:
+			messages = {"base": "", "temp": "", "env": ""}
+			for diagnostic in self.diagnostics:
+				messages[diagnostic[1]] += format_diagnostic(diagnostic) + "\n"
+			self.formatted_messages = messages
+		return self.formatted_messages
+
+
+	def incomplete(self, group):
+		"""Tells whether the group is not fully populated with valid values."""
+
+		return len(self.errors[group]) > 0
+
+
+	def absent(self, group):
+		"""Tells whether all metrics of the group are missing (the temporal and environmental groups are optional)."""
+
+		if group == "base":
+			return self.base_missing_count == len(base_metrics_values)
+		if group == "temp":
+			return self.temp_missing_count == temp_num_of_metrics
+		return self.env_missing_count == env_num_of_metrics
+
+
+	@property
+	def base_incomplete(self):
+		return len(self.errors["base"]) > 0
+
+
+	@property
+	def temp_incomplete(self):
+		return len(self.errors["temp"]) > 0
+
+
+	@property
+	def env_incomplete(self):
+		return len(self.errors["env"]) > 0
+
+
+def validate_metrics_all(cvss_values):
+	"""Validates all metrics in a single pass over the precompiled schema. Returns a ValidationResult, which can be passed to the compute_* functions so that they do not validate the input again. No error messages are formatted (see ValidationResult.messages)."""
+
+	result = ValidationResult()
+	for metric, group, valid_values, valid_values_text in metrics_schema:
+		value = cvss_values.get(metric)
+		if value == None:
+			result.diagnostics.append((error_missing, group, metric, None))
+			result.errors[group].append(metric)
+			if group == "base":
+				result.base_missing_count += 1
+			elif group == "temp":
+				result.temp_missing_count += 1
+			else:
+				result.env_missing_count += 1
+		elif value not in valid_values:
+			result.diagnostics.append((error_invalid, group, metric, value))
+			result.errors[group].append(metric)
+	return result
+
+
+def print_validation_errors(validation):
+	"""Prints the error messages of the ValidationResult. Doesn't print errors for the optional metrics groups that are entirely missing."""
+
+	if len(validation.messages["base"]) > 0: print(validation.messages["base"])
+	if (not validation.absent("temp")) and (len(validation.messages["temp"]) > 0): print(validation.messages["temp"])
+	if (not validation.absent("env")) and (len(validation.messages["env"]) > 0): print(validation.messages["env"])
+	# prints error if the entire temp group is missing while the env group is specified
+	if validation.absent("temp") and (not validation.absent("env")): print(format_diagnostic((error_temp_missing_for_env, "temp", None, None)))
+
+
+def validate_metrics_all_print_errors(cvss_values, print_errors = True):
+	"""Validates all metrics. Prints error messages about encountered errors. Returns information indicating which metrics groups are not fully populated with valid values. The cvss_values parameter is a dictionary of the metric:value pairs from the CVSSv2 vector."""
+
+	validation = validate_metrics_all(cvss_values)
 
 	# doesn't print errors for metrics groups that are entirely missing (because they are optional)
 	if print_errors:
-		if len(error_messages_base) > 0: print error_messages_base
-		if (len(missing_list_temp) != temp_num_of_metrics) and (len(error_messages_temp) > 0): print error_messages_temp
-		if (len(missing_list_env) != env_num_of_metrics) and (len(error_messages_env) > 0): print error_messages_env
-		# prints error if the entire temp group is missing while the env group is specified
-		if (len(missing_list_temp) == temp_num_of_metrics) and (len(missing_list_env) != env_num_of_metrics): print "Temporal metrics missing but environmental metrics are specified. Temporal metrics are required for environmental metrics computation."
-
-	base_incomplete = len(error_list_base) > 0
-	temp_incomplete = len(error_list_temp) > 0
-	env_incomplete = len(error_list_env) > 0
+		print_validation_errors(validation)
 
-	return base_incomplete, temp_incomplete, env_incomplete
+	return validation.base_incomplete, validation.temp_incomplete, validation.env_incomplete
 	
 
-def compute_base(cvss_values, validate_input_bool = True, AdjustedImpact = None):
-	"""Computes the base group of metrics from the vector. The cvss_values parameter is a dictionary of the metric:value pairs from the CVSSv2 vector."""
+def compute_base(cvss_values, validate_input_bool = True, AdjustedImpact = None, validation = None):
+	"""Computes the base group of metrics from the vector. The cvss_values parameter is a dictionary of the metric:value pairs from the CVSSv2 vector or a packed vector (see pack_cvssv2_values). If the validation parameter (the ValidationResult of the vector) is provided, the input is not validated again. If the score cache is enabled (see enable_score_cache), the scores are taken from it unless AdjustedImpact is given or validate_input_bool is False."""
+
+	if (score_cache != None) and (AdjustedImpact == None) and validate_input_bool:
+		return cached_compute_all(cvss_values)[:3]
+	if isinstance(cvss_values, integer_types):
+		if AdjustedImpact == None:
+			return fast_compute_base(cvss_values)
+		cvss_values = unpack_cvssv2_values(cvss_values)
 
-	if validate_input_bool:
-		missing, errors, error_messages = validate_metrics_base(cvss_values)
-		if len(errors)>0:
+	if validation != None:
+		if validation.base_incomplete:
+			return float("NaN"), float("NaN"), float("NaN")
+	elif validate_input_bool:
+		# the validity check does not format any error messages
+		if group_index(cvss_values, base_metrics_values) == None:
 			return float("NaN"), float("NaN"), float("NaN")
 
 	# Base AV:[L,A,N]/AC:[H,M,L]/Au:[M,S,N]/C:[N,P,C]/I:[N,P,C]/A:[N,P,C]
@@ -241,18 +552,28 @@ def compute_base(cvss_values, validate_input_bool = True, AdjustedImpact = None)
 	return BaseScore, Impact, Exploitability
 
 
-def compute_temp(cvss_values, BaseScore_in = None, validate_input_bool = True):
-	"""Computes the temporal group of metrics from the vector. The cvss_values parameter is a dictionary of the metric:value pairs from the CVSSv2 vector."""
+def compute_temp(cvss_values, BaseScore_in = None, validate_input_bool = True, validation = None):
+	"""Computes the temporal group of metrics from the vector. The cvss_values parameter is a dictionary of the metric:value pairs from the CVSSv2 vector or a packed vector (see pack_cvssv2_values). If the validation parameter (the ValidationResult of the vector) is provided, the input is not validated again. If the score cache is enabled (see enable_score_cache), the score is taken from it unless BaseScore_in is given or validate_input_bool is False."""
+
+	if (score_cache != None) and (BaseScore_in == None) and validate_input_bool:
+		return cached_compute_all(cvss_values)[3]
+	if isinstance(cvss_values, integer_types):
+		if BaseScore_in == None:
+			return fast_compute_temp(cvss_values)
+		cvss_values = unpack_cvssv2_values(cvss_values)
 
-	if validate_input_bool:
-		missing, errors, error_messages = validate_metrics_temp(cvss_values)
-		if len(errors)>0:
+	if validation != None:
+		if validation.temp_incomplete:
+			return float("NaN")
+	elif validate_input_bool:
+		# the validity check does not format any error messages
+		if group_index(cvss_values, temp_metrics_values) == None:
 			return float("NaN")
 
 	BaseScore = BaseScore_in
 
 	if BaseScore_in == None:
-		BaseScore, imp, exp = compute_base(cvss_values, validate_input_bool)
+		BaseScore, imp, exp = compute_base(cvss_values, validate_input_bool, validation = validation)
 
 	# Temporal E:[U,POC,F,H,ND]/RL:[OF,TF,W,U,ND]/RC:[UC,UR,C,ND]
 
@@ -317,12 +638,21 @@ def compute_temp(cvss_values, BaseScore_in = None, validate_input_bool = True):
 
 
 
-def compute_env(cvss_values, validate_input_bool = True):
-	"""Computes the environmental group of metrics from the vector. The cvss_values parameter is a dictionary of the metric:value pairs from the CVSSv2 vector."""
+def compute_env(cvss_values, validate_input_bool = True, validation = None):
+	"""Computes the environmental group of metrics from the vector. The cvss_values parameter is a dictionary of the metric:value pairs from the CVSSv2 vector or a packed vector (see pack_cvssv2_values). If the validation parameter (the ValidationResult of the vector) is provided, the input is not validated again. If the score cache is enabled (see enable_score_cache), the score is taken from it unless validate_input_bool is False."""
 
-	if validate_input_bool:
-		missing, errors, error_messages = validate_metrics_env(cvss_values)
-		if len(errors)>0:
+	# a dictionary without C, I or A raises KeyError below, the cache would return NaN
+	if (score_cache != None) and validate_input_bool and (isinstance(cvss_values, integer_types) or ("C" in cvss_values and "I" in cvss_values and "A" in cvss_values)):
+		return cached_compute_all(cvss_values)[4]
+	if isinstance(cvss_values, integer_types):
+		return fast_compute_env(cvss_values)
+
+	if validation != None:
+		if validation.env_incomplete:
+			return float("NaN")
+	elif validate_input_bool:
+		# the validity check does not format any error messages
+		if group_index(cvss_values, env_metrics_values) == None:
 			return float("NaN")
 
 
@@ -453,8 +783,8 @@ def compute_env(cvss_values, validate_input_bool = True):
 
 	# AdjustedTemporal = TemporalScore recomputed with the Impact sub-equation 
 	#                    replaced with the following AdjustedImpact equation.
-	AdjustedBase, imp, exp = compute_base(cvss_values, validate_input_bool, AdjustedImpact)
-	AdjustedTemporal = compute_temp(cvss_values, AdjustedBase, validate_input_bool)
+	AdjustedBase, imp, exp = compute_base(cvss_values, validate_input_bool, AdjustedImpact, validation)
+	AdjustedTemporal = compute_temp(cvss_values, AdjustedBase, validate_input_bool, validation)
 
 	# EnvironmentalScore = (AdjustedTemporal 
 	#                         + (10 - AdjustedTemporal) 
@@ -465,6 +795,1697 @@ def compute_env(cvss_values, validate_input_bool = True):
 	return EnvironmentalScore
 
 
+# The lookup-table scoring engine.
+#
+# The whole CVSSv2 vector space is small (729 base vectors, 100 temporal and 1920 environmental metrics combinations), so every score can be precomputed and scoring is then reduced to a few index lookups. The tables are built lazily on the first use. They are computed with exactly the same arithmetic (including the order of the floating point operations) as compute_base, compute_temp and compute_env, so the fast_compute_* functions return exactly the same values as those functions.
+
+# the numeric weights of the metric values in the order of the values in *_metrics_values (see compute_base, compute_temp and compute_env for the sources)
+metric_weights = {
+	"AV": (0.395, 0.646, 1),
+	"AC": (0.35, 0.61, 0.71),
+	"Au": (0.45, 0.56, 0.704),
+	"C": (0, 0.275, 0.660),
+	"I": (0, 0.275, 0.660),
+	"A": (0, 0.275, 0.660),
+	"E": (0.85, 0.9, 0.95, 1.00, 1.00),
+	"RL": (0.87, 0.90, 0.95, 1.00, 1.00),
+	"RC": (0.90, 0.95, 1.00, 1.00),
+	"CDP": (0, 0.1, 0.3, 0.4, 0.5, 0),
+	"TD": (0, 0.25, 0.75, 1.00, 1.00),
+	"CR": (0.5, 1, 1.51, 1),
+	"IR": (0.5, 1, 1.51, 1),
+	"AR": (0.5, 1, 1.51, 1)
+}
+
+# the sizes of the individual index spaces
+base_index_count = 729 # AV, AC, Au, C, I, A
+exploitability_index_count = 27 # AV, AC, Au
+impact_index_count = 27 # C, I, A
+temp_index_count = 100 # E, RL, RC
+env_index_count = 1920 # CDP, TD, CR, IR, AR
+requirements_index_count = 64 # CR, IR, AR
+env_modifiers_index_count = 30 # CDP, TD
+
+
+def group_index(cvss_values, group_metrics_values, ordinals = metric_ordinals, default_value = None):
+	"""Computes the lookup-table index of one metrics group (one of base_metrics_values, temp_metrics_values, env_metrics_values) from the metric:value dictionary: the mixed-radix number of the value ordinals, the first metric being the most significant. Returns None if any metric of the group is missing or has an invalid value. cvssv3.py passes its own ordinals and the default value of the missing metrics ("X")."""
+
+	index = 0
+	for metric, values in group_metrics_values:
+		ordinal = ordinals[metric].get(cvss_values.get(metric, default_value))
+		if ordinal == None:
+			return None
+		index = index * len(values) + ordinal
+	return index
+
+
+def group_indices(cvss_values):
+	"""Returns the lookup-table indices (base index, temporal index, environmental index) of the vector given as a metric:value dictionary or as a packed vector. An index is None if its group has a missing or invalid metric."""
+
+	if isinstance(cvss_values, integer_types):
+		tables = get_scoring_tables()
+		return tables.packed_base_indices.get(cvss_values & packed_base_mask), tables.packed_temp_indices.get((cvss_values >> packed_temp_shift) & packed_temp_mask), tables.packed_env_indices.get((cvss_values >> packed_env_shift) & packed_env_mask)
+	return group_index(cvss_values, base_metrics_values), group_index(cvss_values, temp_metrics_values), group_index(cvss_values, env_metrics_values)
+
+
+def packed_group_index(packed, group_metrics_values):
+	"""Returns the lookup-table index of one metrics group (one of base_metrics_values, temp_metrics_values, env_metrics_values) of the packed vector, None if any metric of the group is missing or has an invalid value. group_indices makes the same lookups inline."""
+
+	tables = get_scoring_tables()
+	if group_metrics_values is base_metrics_values:
+		return tables.packed_base_indices.get(packed & packed_base_mask)
+	if group_metrics_values is temp_metrics_values:
+		return tables.packed_temp_indices.get((packed >> packed_temp_shift) & packed_temp_mask)
+	return tables.packed_env_indices.get((packed >> packed_env_shift) & packed_env_mask)
+
+
+def group_indices_by_group(cvss_values):
+	"""Same as group_indices, but every group index is computed by a separate call of group_index or packed_group_index. The profiling uses it instead of group_indices so that the validation of each group is counted separately (see Profiler.install)."""
+
+	if isinstance(cvss_values, integer_types):
+		return packed_group_index(cvss_values, base_metrics_values), packed_group_index(cvss_values, temp_metrics_values), packed_group_index(cvss_values, env_metrics_values)
+	return group_index(cvss_values, base_metrics_values), group_index(cvss_values, temp_metrics_values), group_index(cvss_values, env_metrics_values)
+
+
+class ScoreIds(object):
+	"""The distinct scores of the lookup tables (the base class of ScoringTables here and in cvssv3.py).
+
+	Scores are stored as ids into score_values (a list of the distinct floats), because the temporal score is computed from the base score and the environmental score from the adjusted temporal score. -0.0 (which compute_base returns e.g. for C:N/I:N/A:N with a low exploitability) and 0.0 are kept as distinct values.
+	"""
+
+	def __init__(self):
+		self.score_values = list() # list of float (score id:score)
+		self.score_ids = {} # dict of string:integer (repr of the score:score id); repr() keeps -0.0 and 0.0 apart
+
+
+	def score_id(self, score):
+		"""Returns the id of the score, registers the score if it is new."""
+
+		key = repr(score)
+		if key not in self.score_ids:
+			self.score_ids[key] = len(self.score_values)
+			self.score_values.append(score)
+		return self.score_ids[key]
+
+
+class ScoringTables(ScoreIds):
+	"""Precomputed scores of the whole CVSSv2 vector space, stored as score ids (see ScoreIds)."""
+
+	def __init__(self):
+		ScoreIds.__init__(self)
+		# group indices of the packed vectors; dict of integer:integer (packed group bits:group index)
+		self.packed_base_indices = self.packed_group_indices(base_metrics_values)
+		self.packed_temp_indices = self.packed_group_indices(temp_metrics_values)
+		self.packed_env_indices = self.packed_group_indices(env_metrics_values)
+
+		# exploitability (not rounded) indexed by (AV, AC, Au)
+		exploitability_list = list()
+		for AccessVector in metric_weights["AV"]:
+			for AccessComplexity in metric_weights["AC"]:
+				for Authentication in metric_weights["Au"]:
+					exploitability_list.append(20 * AccessComplexity * Authentication * AccessVector)
+
+		# impact (not rounded) indexed by (C, I, A), and the impact weights for the adjusted impact
+		impact_list = list()
+		impact_weights_list = list()
+		for ConfImpact in metric_weights["C"]:
+			for IntegImpact in metric_weights["I"]:
+				for AvailImpact in metric_weights["A"]:
+					impact_list.append(10.41 * (1 - (1 - ConfImpact) * (1 - IntegImpact) * (1 - AvailImpact)))
+					impact_weights_list.append((ConfImpact, IntegImpact, AvailImpact))
+
+		# base scores indexed by the base index (AV, AC, Au, C, I, A)
+		self.base_scores = list() # list of (BaseScore, Impact, Exploitability)
+		self.base_score_ids = list()
+		for Exploitability in exploitability_list:
+			for Impact in impact_list:
+				BaseScore = self.base_formula(Impact, Exploitability)
+				self.base_scores.append((BaseScore, round(Impact, 1), round(Exploitability, 1)))
+				self.base_score_ids.append(self.score_id(BaseScore))
+
+		# adjusted impact indexed by (C, I, A, CR, IR, AR)
+		adjusted_impact_list = list()
+		for ConfImpact, IntegImpact, AvailImpact in impact_weights_list:
+			for ConfReq in metric_weights["CR"]:
+				for IntegReq in metric_weights["IR"]:
+					for AvailReq in metric_weights["AR"]:
+						adjusted_impact_list.append(min(10, 10.41 * (1 - (1 - ConfImpact * ConfReq) * (1 - IntegImpact * IntegReq) * (1 - AvailImpact * AvailReq))))
+
+		# adjusted base score ids indexed by (AV, AC, Au, C, I, A, CR, IR, AR)
+		self.adjusted_base_ids = list()
+		for Exploitability in exploitability_list:
+			for AdjustedImpact in adjusted_impact_list:
+				self.adjusted_base_ids.append(self.score_id(self.base_formula(AdjustedImpact, Exploitability)))
+
+		# temporal score ids indexed by (base score id, E, RL, RC); covers both the base and the adjusted base scores
+		temp_multipliers = [(Exploitability, RemediationLevel, ReportConfidence) for Exploitability in metric_weights["E"] for RemediationLevel in metric_weights["RL"] for ReportConfidence in metric_weights["RC"]]
+		self.temp_ids = list()
+		for BaseScore in list(self.score_values):
+			for Exploitability, RemediationLevel, ReportConfidence in temp_multipliers:
+				self.temp_ids.append(self.score_id(round ( BaseScore * Exploitability * RemediationLevel * ReportConfidence, 1)))
+
+		# environmental scores indexed by (adjusted temporal score id, CDP, TD)
+		self.env_scores = list()
+		for AdjustedTemporal in self.score_values:
+			for CollateralDamagePotential in metric_weights["CDP"]:
+				for TargetDistribution in metric_weights["TD"]:
+					self.env_scores.append(round (  (AdjustedTemporal + (10 - AdjustedTemporal) * CollateralDamagePotential) * TargetDistribution, 1))
+
+
+	def packed_group_indices(self, group_metrics_values):
+		"""Maps the packed bits of every valid combination of the group's metrics (relative to the group's first field) to the group index."""
+
+		indices = {}
+		# itertools.product varies the last metric the fastest, which is the order of the group indices
+		for index, ordinals in enumerate(itertools.product(*[range(len(values)) for metric, values in group_metrics_values])):
+			packed = 0
+			for position, ordinal in enumerate(ordinals):
+				packed |= (ordinal + 1) << (position * packed_bits_per_metric)
+			indices[packed] = index
+		return indices
+
+
+	def base_formula(self, Impact, Exploitability):
+		"""The base score equation of compute_base."""
+
+		f_Impact = 1.176
+		if Impact == 0:
+			f_Impact = 0
+		return round ( (0.6 * Impact + 0.4 * Exploitability - 1.5) * f_Impact, 1)
+
+
+	def temp_score(self, base_index, temp_index):
+		"""Returns the temporal score for the given base and temporal indices."""
+
+		return self.score_values[self.temp_ids[self.base_score_ids[base_index] * temp_index_count + temp_index]]
+
+
+	def env_score(self, base_index, temp_index, env_index):
+		"""Returns the environmental score for the given base, temporal and environmental indices."""
+
+		exploitability_index, impact_index = divmod(base_index, impact_index_count)
+		env_modifiers_index, requirements_index = divmod(env_index, requirements_index_count)
+		adjusted_base_id = self.adjusted_base_ids[(exploitability_index * impact_index_count + impact_index) * requirements_index_count + requirements_index]
+		adjusted_temp_id = self.temp_ids[adjusted_base_id * temp_index_count + temp_index]
+		return self.env_scores[adjusted_temp_id * env_modifiers_index_count + env_modifiers_index]
+
+
+scoring_tables = None # the lazily built ScoringTables instance
+
+
+def get_scoring_tables():
+	"""Returns the ScoringTables instance, builds it on the first call."""
+
+	global scoring_tables
+	if scoring_tables == None:
+		scoring_tables = ScoringTables()
+	return scoring_tables
+
+
+def fast_compute_all(cvss_values):
+	"""Computes all scores from the vector (a metric:value dictionary or a packed vector) using the lookup tables. Returns BaseScore, Impact, Exploitability, TemporalScore, EnvironmentalScore; the values are the same as the ones returned by compute_base, compute_temp and compute_env (NaN for the groups that cannot be computed). Unlike compute_env, a missing C/I/A metric results in NaN instead of KeyError."""
+
+	nan = float("NaN")
+	tables = get_scoring_tables()
+	base_index, temp_index, env_index = group_indices(cvss_values)
+	if base_index == None:
+		return nan, nan, nan, nan, nan
+	BaseScore, Impact, Exploitability = tables.base_scores[base_index]
+	if temp_index == None:
+		return BaseScore, Impact, Exploitability, nan, nan
+	TemporalScore = tables.temp_score(base_index, temp_index)
+	if env_index == None:
+		return BaseScore, Impact, Exploitability, TemporalScore, nan
+	return BaseScore, Impact, Exploitability, TemporalScore, tables.env_score(base_index, temp_index, env_index)
+
+
+def fast_compute_base(cvss_values):
+	"""Same as compute_base(cvss_values) but uses the lookup tables. Accepts also a packed vector."""
+
+	base_index, temp_index, env_index = group_indices(cvss_values)
+	if base_index == None:
+		return float("NaN"), float("NaN"), float("NaN")
+	return get_scoring_tables().base_scores[base_index]
+
+
+def fast_compute_temp(cvss_values):
+	"""Same as compute_temp(cvss_values) but uses the lookup tables. Accepts also a packed vector."""
+
+	base_index, temp_index, env_index = group_indices(cvss_values)
+	if base_index == None or temp_index == None:
+		return float("NaN")
+	return get_scoring_tables().temp_score(base_index, temp_index)
+
+
+def fast_compute_env(cvss_values):
+	"""Same as compute_env(cvss_values) but uses the lookup tables. Accepts also a packed vector. Unlike compute_env, a missing C/I/A metric results in NaN instead of KeyError."""
+
+	base_index, temp_index, env_index = group_indices(cvss_values)
+	if base_index == None or temp_index == None or env_index == None:
+		return float("NaN")
+	return get_scoring_tables().env_score(base_index, temp_index, env_index)
+
+
+# packed fields of the environmental group that select the requirements index (CR, IR, AR) and the modifiers index (CDP, TD)
+packed_requirements_mask = ((1 << (3 * packed_bits_per_metric)) - 1) << (packed_env_shift + 2 * packed_bits_per_metric)
+packed_env_modifiers_mask = ((1 << (2 * packed_bits_per_metric)) - 1) << packed_env_shift
+
+
+def packed_fields_mask(packed):
+	"""Returns the mask of all fields (see packed_metrics) that are set in the packed vector."""
+
+	mask = 0
+	shift = 0
+	while (packed >> shift) > 0:
+		if (packed >> shift) & packed_field_mask:
+			mask |= packed_field_mask << shift
+		shift += packed_bits_per_metric
+	return mask
+
+
+class IncrementalScores(object):
+	"""The scores of one vector that are updated incrementally when some of its metrics change (see update).
+
+	The lookup-table engine computes the environmental score in stages: the adjusted base score (from the base metrics and CR, IR, AR), the adjusted temporal score (from the adjusted base score and the temporal metrics) and the environmental score (from the adjusted temporal score and CDP, TD). The indices and the intermediate score ids of every stage are kept, so a change of CDP/TD costs one table lookup, a change of CR/IR/AR or of the temporal metrics a few, and only a change of the base metrics recomputes everything. The scores are the same as the ones of fast_compute_all."""
+
+	__slots__ = ("packed", "base_index", "temp_index", "env_index", "adjusted_base_id", "adjusted_temp_id", "BaseScore", "Impact", "Exploitability", "TemporalScore", "EnvironmentalScore")
+
+	def __init__(self, cvss_vector = None):
+		"""Scores the vector given as a vector string, a metric:value dictionary or a packed vector."""
+
+		self.packed = 0
+		self.recompute_base()
+		if cvss_vector != None:
+			self.update(cvss_vector)
+
+
+	def copy(self):
+		"""Returns an independent copy (e.g. to apply different changes to the same vector without recomputing its base stages)."""
+
+		duplicate = IncrementalScores.__new__(IncrementalScores)
+		for attribute in IncrementalScores.__slots__:
+			setattr(duplicate, attribute, getattr(self, attribute))
+		return duplicate
+
+
+	def scores(self):
+		"""Returns BaseScore, Impact, Exploitability, TemporalScore, EnvironmentalScore (see fast_compute_all)."""
+
+		return self.BaseScore, self.Impact, self.Exploitability, self.TemporalScore, self.EnvironmentalScore
+
+
+	def update(self, changes):
+		"""Sets the metrics given as a vector string (e.g. "E:F/RL:OF"), a metric:value dictionary or a packed vector (the metrics missing in the changes are kept) and recomputes only the stages that depend on the changed metrics. Returns the new scores (see scores)."""
+
+		if isinstance(changes, integer_types):
+			changes_packed = changes
+		elif isinstance(changes, dict):
+			changes_packed = pack_cvssv2_values(changes)
+		else:
+			changes_packed = encode_cvssv2_vector(changes)
+		old_packed = self.packed
+		self.packed = (old_packed & ~packed_fields_mask(changes_packed)) | changes_packed
+		changed = old_packed ^ self.packed
+		if changed & packed_base_mask:
+			self.recompute_base()
+		elif changed & (packed_temp_mask << packed_temp_shift):
+			self.recompute_temp()
+		elif changed & packed_requirements_mask:
+			self.recompute_adjusted_base()
+		elif changed & packed_env_modifiers_mask:
+			if self.adjusted_temp_id == None:
+				# the environmental group may have just become complete
+				self.recompute_adjusted_base()
+			else:
+				self.recompute_env()
+		return self.scores()
+
+
+	def recompute_base(self):
+		"""Recomputes all stages."""
+
+		tables = get_scoring_tables()
+		self.base_index = tables.packed_base_indices.get(self.packed & packed_base_mask)
+		if self.base_index == None:
+			nan = float("NaN")
+			self.BaseScore, self.Impact, self.Exploitability = nan, nan, nan
+		else:
+			self.BaseScore, self.Impact, self.Exploitability = tables.base_scores[self.base_index]
+		self.recompute_temp()
+
+
+	def recompute_temp(self):
+		"""Recomputes the temporal score and the stages of the environmental score that depend on it."""
+
+		tables = get_scoring_tables()
+		self.temp_index = tables.packed_temp_indices.get((self.packed >> packed_temp_shift) & packed_temp_mask)
+		if (self.base_index == None) or (self.temp_index == None):
+			self.TemporalScore = float("NaN")
+		else:
+			self.TemporalScore = tables.temp_score(self.base_index, self.temp_index)
+		self.recompute_adjusted_base()
+
+
+	def recompute_adjusted_base(self):
+		"""Recomputes the adjusted base and temporal scores and the environmental score."""
+
+		tables = get_scoring_tables()
+		self.env_index = tables.packed_env_indices.get((self.packed >> packed_env_shift) & packed_env_mask)
+		if (self.base_index == None) or (self.temp_index == None) or (self.env_index == None):
+			self.adjusted_base_id = None
+			self.adjusted_temp_id = None
+		else:
+			requirements_index = self.env_index % requirements_index_count
+			self.adjusted_base_id = tables.adjusted_base_ids[self.base_index * requirements_index_count + requirements_index]
+			self.adjusted_temp_id = tables.temp_ids[self.adjusted_base_id * temp_index_count + self.temp_index]
+		self.recompute_env()
+
+
+	def recompute_env(self):
+		"""Recomputes the environmental score from the adjusted temporal score."""
+
+		tables = get_scoring_tables()
+		self.env_index = tables.packed_env_indices.get((self.packed >> packed_env_shift) & packed_env_mask)
+		if (self.adjusted_temp_id == None) or (self.env_index == None):
+			self.EnvironmentalScore = float("NaN")
+		else:
+			self.EnvironmentalScore = tables.env_scores[self.adjusted_temp_id * env_modifiers_index_count + self.env_index // requirements_index_count]
+
+
+numpy_scoring_tables = None # the lazily built NumPy arrays of the lookup tables
+
+
+def get_numpy_scoring_tables():
+	"""Returns the lookup tables as a dictionary of name:NumPy array, converts them on the first call. The score arrays (base_scores with one row per score, score_values, env_scores) end with an extra NaN entry, the score of the rows whose group cannot be computed."""
+
+	global numpy_scoring_tables
+	if numpy_scoring_tables == None:
+		import numpy
+		tables = get_scoring_tables()
+		nan = float("NaN")
+		numpy_scoring_tables = {
+			"base_scores": numpy.array([list(scores) + [nan] for scores in zip(*tables.base_scores)], numpy.float64),
+			"base_score_ids": numpy.array(tables.base_score_ids, numpy.int64),
+			"adjusted_base_ids": numpy.array(tables.adjusted_base_ids, numpy.int64),
+			"temp_ids": numpy.array(tables.temp_ids, numpy.int64),
+			"env_scores": numpy.array(tables.env_scores + [nan], numpy.float64),
+			"score_values": numpy.array(tables.score_values + [nan], numpy.float64),
+			"packed_base_indices": packed_indices_array(tables.packed_base_indices, packed_base_mask),
+			"packed_temp_indices": packed_indices_array(tables.packed_temp_indices, packed_temp_mask),
+			"packed_env_indices": packed_indices_array(tables.packed_env_indices, packed_env_mask)
+		}
+	return numpy_scoring_tables
+
+
+def packed_indices_array(packed_indices, mask):
+	"""Converts the dictionary of packed group bits:group index (see ScoringTables.packed_group_indices) into a NumPy array indexed by the packed group bits; -1 marks the bits of the invalid and incomplete groups."""
+
+	import numpy
+	indices_array = numpy.full(mask + 1, -1, numpy.int64)
+	indices_array[numpy.array(list(packed_indices.keys()), numpy.int64)] = numpy.array(list(packed_indices.values()), numpy.int64)
+	return indices_array
+
+
+def packed_group_index_array(packed_array, shift, mask, indices_array):
+	"""Computes the lookup-table indices of one metrics group for a NumPy array of packed vectors (a single gather from indices_array, see packed_indices_array). Returns the array of indices and a boolean array telling which rows have the group complete and valid (the index of an invalid row is 0)."""
+
+	import numpy
+	index_array = indices_array[(packed_array >> shift) & mask]
+	valid_array = index_array >= 0
+	return numpy.maximum(index_array, 0), valid_array
+
+
+def score_many(vectors):
+	"""Computes the scores of many vectors at once. The vectors parameter is an iterable of CVSSv2 vector strings and/or packed vectors, or a NumPy integer array of packed vectors. Returns NumPy arrays BaseScore, Impact, Exploitability, TemporalScore, EnvironmentalScore with the same values as compute_base, compute_temp and compute_env (NaN where the scores cannot be computed). Requires NumPy.
+
+	The scores are gathered column-wise from the lookup tables rather than evaluated with NumPy arithmetic, because NumPy rounds halves to even while round() does not, so the results would differ from the scalar functions."""
+
+	import numpy
+	if isinstance(vectors, numpy.ndarray) and vectors.dtype.kind in "iu":
+		packed_array = vectors.astype(numpy.int64)
+	else:
+		packed_array = numpy.fromiter((vector if isinstance(vector, integer_types) else encode_cvssv2_vector(vector) for vector in vectors), numpy.int64)
+
+	arrays = get_numpy_scoring_tables()
+	base_index, base_valid = packed_group_index_array(packed_array, 0, packed_base_mask, arrays["packed_base_indices"])
+	temp_index, temp_valid = packed_group_index_array(packed_array, packed_temp_shift, packed_temp_mask, arrays["packed_temp_indices"])
+	env_index, env_valid = packed_group_index_array(packed_array, packed_env_shift, packed_env_mask, arrays["packed_env_indices"])
+	temp_valid &= base_valid
+	env_valid &= temp_valid
+
+	# the rows that cannot be scored gather the NaN at the end of the score arrays
+	BaseScore, Impact, Exploitability = arrays["base_scores"][:, numpy.where(base_valid, base_index, base_index_count)]
+
+	temp_ids = arrays["temp_ids"][arrays["base_score_ids"][base_index] * temp_index_count + temp_index]
+	TemporalScore = arrays["score_values"][numpy.where(temp_valid, temp_ids, len(arrays["score_values"]) - 1)]
+
+	# the adjusted base scores are indexed by (the base index, the requirements index), see IncrementalScores.recompute_adjusted_base
+	env_modifiers_index, requirements_index = numpy.divmod(env_index, requirements_index_count)
+	adjusted_base_ids = arrays["adjusted_base_ids"][base_index * requirements_index_count + requirements_index]
+	adjusted_temp_ids = arrays["temp_ids"][adjusted_base_ids * temp_index_count + temp_index]
+	EnvironmentalScore = arrays["env_scores"][numpy.where(env_valid, adjusted_temp_ids * env_modifiers_index_count + env_modifiers_index, len(arrays["env_scores"]) - 1)]
+
+	return BaseScore, Impact, Exploitability, TemporalScore, EnvironmentalScore
+
+
+# the score cache
+
+default_score_cache_size = 65536
+
+
+def canonical_cvssv2_vector(cvss_vect_string):
+	"""Returns the canonical form of the CVSSv2 vector string: the metrics in the canonical order, duplicate metrics resolved (the last one wins), unknown metrics and unparseable parts dropped, invalid values emptied (see decode_cvssv2_vector)."""
+
+	return decode_cvssv2_vector(encode_cvssv2_vector(cvss_vect_string))
+
+
+class ScoreCache(object):
+	"""Memoizes the score tuples (see fast_compute_all) of vectors with the least recently used eviction.
+
+	The entries are keyed by the canonical packed vector only, so the vectors that differ only in the metric order or in duplicate metrics share one entry and max_size is the number of distinct vectors held. Thread-safe: the entries and the counters are changed under a lock, the scores of a miss are computed outside of it."""
+
+	def __init__(self, max_size = default_score_cache_size):
+		import threading
+		if max_size < 1:
+			raise ValueError("The cache size must be at least 1.")
+		self.max_size = max_size
+		self.lock = threading.Lock()
+		self.entries = collections.OrderedDict() # the least recently used entry first
+		self.hits = 0
+		self.misses = 0
+		self.evictions = 0
+
+
+	def score(self, cvss_vect_string):
+		"""Returns the scores of the vector string (see score_vector), computes them on a cache miss."""
+
+		return self.score_packed(encode_cvssv2_vector(cvss_vect_string))
+
+
+	def score_packed(self, packed):
+		"""Returns the scores of the packed vector (see fast_compute_all), computes them on a cache miss."""
+
+		entries = self.entries
+		with self.lock:
+			scores = entries.pop(packed, None)
+			if scores != None:
+				self.hits += 1
+				entries[packed] = scores
+				return scores
+			self.misses += 1
+		# the lookup tables are read-only, so the scoring does not need the lock
+		scores = fast_compute_all(packed)
+		with self.lock:
+			entries[packed] = scores
+			while len(entries) > self.max_size:
+				entries.popitem(False)
+				self.evictions += 1
+		return scores
+
+
+	def clear(self):
+		"""Removes all entries and resets the counters."""
+
+		with self.lock:
+			self.entries.clear()
+			self.hits = 0
+			self.misses = 0
+			self.evictions = 0
+
+
+	def info(self):
+		"""Returns the cache statistics as a dictionary (hits, misses, evictions, size, max_size)."""
+
+		with self.lock:
+			return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "size": len(self.entries), "max_size": self.max_size}
+
+
+score_cache = None # the ScoreCache used by the library scoring functions (see cached_compute_all); None if the cache is disabled
+
+
+def enable_score_cache(max_size = default_score_cache_size):
+	"""Enables the score cache used by the library scoring functions (see cached_compute_all) and thus by the batch modes with the given maximum number of entries. Replaces the previous cache."""
+
+	global score_cache
+	score_cache = ScoreCache(max_size)
+
+
+def disable_score_cache():
+	"""Disables the score cache used by score_vector."""
+
+	global score_cache
+	score_cache = None
+
+
+def cached_compute_all(cvss_values):
+	"""Returns fast_compute_all of the vector (a metric:value dictionary or a packed vector) through the score cache if it is enabled. The library scoring functions (compute_base, compute_temp, compute_env, evaluate_cvssv2_vector, score_vector) use it, so they share the cache with the batch modes."""
+
+	if score_cache == None:
+		return fast_compute_all(cvss_values)
+	if not isinstance(cvss_values, integer_types):
+		cvss_values = pack_cvssv2_values(cvss_values)
+	return score_cache.score_packed(cvss_values)
+
+
+def score_cache_info():
+	"""Returns the statistics of the score cache (see ScoreCache.info) or None if the cache is disabled."""
+
+	if score_cache == None:
+		return None
+	return score_cache.info()
+
+
+# the reverse score index
+
+env_index_cache_size = 256 # the number of the base and temporal vectors whose environmental index is kept by ScoreIndex
+score_index_names = ("base", "temp", "env") # the scores of ScoreIndex.minimal_changes: BaseScore, TemporalScore, EnvironmentalScore
+
+
+class ScoreIndex(object):
+	"""Sorted indices from the scores to the vectors for range queries, score histograms and the minimal metric changes that cross a score threshold. The vectors are returned as packed vectors (see pack_cvssv2_values and decode_cvssv2_vector).
+
+	The base index (729 base vectors) and the temporal index (72900 base and temporal vectors) cover the whole vector space and are built at once. The environmental scores depend on all three groups, so the environmental index (1920 environmental combinations) is built on demand for a given base and temporal vector; the indices of the env_index_cache_size most recently used ones are kept."""
+
+	def __init__(self):
+		tables = get_scoring_tables()
+		# packed group bits indexed by the group index
+		self.base_packed = self.group_packed_bits(tables.packed_base_indices, 0)
+		self.temp_packed = self.group_packed_bits(tables.packed_temp_indices, packed_temp_shift)
+		self.env_packed = self.group_packed_bits(tables.packed_env_indices, packed_env_shift)
+
+		# (list of scores in the ascending order, list of the packed vectors of the scores)
+		self.base_index = self.sorted_index((BaseScore, base_packed) for (BaseScore, Impact, Exploitability), base_packed in zip(tables.base_scores, self.base_packed))
+		self.temp_index = self.sorted_index((tables.temp_score(base_index, temp_index), base_packed | temp_packed) for base_index, base_packed in enumerate(self.base_packed) for temp_index, temp_packed in enumerate(self.temp_packed))
+		self.env_indices = collections.OrderedDict() # dict of integer:index (packed base and temporal bits:index); the least recently used first
+
+
+	def group_packed_bits(self, packed_indices, shift):
+		"""Inverts the packed group bits:group index dictionary of ScoringTables into a list of the packed bits (shifted to the group's position) indexed by the group index."""
+
+		packed_bits = [0] * len(packed_indices)
+		for packed, index in packed_indices.items():
+			packed_bits[index] = packed << shift
+		return packed_bits
+
+
+	def sorted_index(self, entries):
+		"""Sorts the (score, packed vector) entries by the score (and the packed vector). Returns the list of the scores and the list of the packed vectors."""
+
+		entries = sorted(entries)
+		return [score for score, packed in entries], [packed for score, packed in entries]
+
+
+	def packed_vector(self, cvss_vector):
+		"""Returns the packed vector of the CVSSv2 vector string (or of a packed vector)."""
+
+		if isinstance(cvss_vector, integer_types):
+			return cvss_vector
+		return encode_cvssv2_vector(cvss_vector)
+
+
+	def env_index(self, cvss_vector):
+		"""Returns the environmental index of the base and temporal metrics of the vector. Raises ValueError if the base or temporal group is incomplete."""
+
+		tables = get_scoring_tables()
+		packed = self.packed_vector(cvss_vector)
+		base_index, temp_index, env_index = group_indices(packed)
+		if (base_index == None) or (temp_index == None):
+			raise ValueError("The environmental score needs complete base and temporal metrics.")
+		key = self.base_packed[base_index] | self.temp_packed[temp_index]
+		index = self.env_indices.pop(key, None)
+		if index == None:
+			index = self.sorted_index((tables.env_score(base_index, temp_index, env_index), key | env_packed) for env_index, env_packed in enumerate(self.env_packed))
+			while len(self.env_indices) >= env_index_cache_size:
+				self.env_indices.popitem(False)
+		self.env_indices[key] = index
+		return index
+
+
+	def range_query(self, index, low, high):
+		"""Returns the packed vectors of the index with the scores from low to high (inclusive) in the ascending order of the scores."""
+
+		scores, packed_vectors = index
+		return packed_vectors[bisect.bisect_left(scores, low):bisect.bisect_right(scores, high)]
+
+
+	def histogram(self, index):
+		"""Returns the number of vectors of the index for each score as an ordered dictionary of float:integer (score:count) in the ascending order of the scores. -0.0 is counted as 0.0."""
+
+		scores = index[0]
+		counts = collections.OrderedDict()
+		start = 0
+		while start < len(scores):
+			end = bisect.bisect_right(scores, scores[start], start)
+			counts[scores[start] + 0.0] = end - start
+			start = end
+		return counts
+
+
+	def base_range(self, low, high):
+		"""Returns the packed base vectors with the base score from low to high (inclusive)."""
+
+		return self.range_query(self.base_index, low, high)
+
+
+	def temp_range(self, low, high):
+		"""Returns the packed base and temporal vectors with the temporal score from low to high (inclusive)."""
+
+		return self.range_query(self.temp_index, low, high)
+
+
+	def env_range(self, cvss_vector, low, high):
+		"""Returns the packed vectors with the base and temporal metrics of cvss_vector (a vector string or a packed vector) and any environmental metrics whose environmental score is from low to high (inclusive)."""
+
+		return self.range_query(self.env_index(cvss_vector), low, high)
+
+
+	def base_histogram(self):
+		"""Returns the histogram of the base scores of all base vectors (see histogram)."""
+
+		return self.histogram(self.base_index)
+
+
+	def temp_histogram(self):
+		"""Returns the histogram of the temporal scores of all base and temporal vectors (see histogram)."""
+
+		return self.histogram(self.temp_index)
+
+
+	def env_histogram(self, cvss_vector):
+		"""Returns the histogram of the environmental scores of all environmental metrics combined with the base and temporal metrics of cvss_vector (see histogram)."""
+
+		return self.histogram(self.env_index(cvss_vector))
+
+
+	def minimal_changes(self, cvss_vector, threshold, score_name = "base", above = True, metrics = None, max_changes = None):
+		"""Finds the smallest number of metric value changes of cvss_vector (a vector string or a packed vector) that make its score (one of score_index_names) cross the threshold: reach at least threshold if above is True, drop below threshold otherwise. Only the metrics in metrics are changed (by default the metrics of the score's group and the groups it depends on), at most max_changes of them. Returns the number of changes and the list of all packed vectors with that number of changes that cross the threshold (0 and the vector itself if it already crosses it), or None and an empty list if there is no such vector. Raises ValueError if a group needed by the score is incomplete."""
+
+		score_position = {"base": 0, "temp": 3, "env": 4}[score_name]
+		packed = self.packed_vector(cvss_vector)
+		def crosses(packed):
+			score = fast_compute_all(packed)[score_position]
+			if score != score:
+				raise ValueError("The vector \'" + decode_cvssv2_vector(packed) + "\' has an incomplete metrics group needed by the " + score_name + " score.")
+			return (score >= threshold) if above else (score < threshold)
+		if crosses(packed):
+			return 0, [packed]
+
+		if metrics == None:
+			metrics = packed_metrics[:{"base": 6, "temp": 9, "env": 14}[score_name]]
+		# (shift of the field, list of the field values other than the vector's value) of each changeable metric
+		alternatives = list()
+		for metric in metrics:
+			shift = packed_metrics.index(metric) * packed_bits_per_metric
+			current = (packed >> shift) & packed_field_mask
+			alternatives.append((shift, [value + 1 for value in range(len(metric_ordinals[metric])) if value + 1 != current]))
+		if max_changes == None:
+			max_changes = len(alternatives)
+
+		for num_of_changes in range(1, min(max_changes, len(alternatives)) + 1):
+			found = list()
+			for changed in itertools.combinations(alternatives, num_of_changes):
+				cleared = packed
+				for shift, values in changed:
+					cleared &= ~(packed_field_mask << shift)
+				for fields in itertools.product(*[[value << shift for value in values] for shift, values in changed]):
+					candidate = cleared
+					for field in fields:
+						candidate |= field
+					if crosses(candidate):
+						found.append(candidate)
+			if len(found) > 0:
+				return num_of_changes, sorted(found)
+		return None, []
+
+
+score_index = None # the lazily built ScoreIndex instance
+
+
+def get_score_index():
+	"""Returns the ScoreIndex instance, builds it on the first call."""
+
+	global score_index
+	if score_index == None:
+		score_index = ScoreIndex()
+	return score_index
+
+
+# the structured results
+
+score_result_fields = ("vector", "BaseScore", "Impact", "Exploitability", "TemporalScore", "EnvironmentalScore", "diagnostics")
+
+
+class ScoreResult(object):
+	"""The scores and the diagnostics of one vector string (see evaluate_cvssv2_vector). The diagnostics attribute is a tuple of (error code, group, metric, value) tuples (see format_diagnostic); the messages are formatted only by messages(). The result is pickled as the tuple of its fields (see as_tuple)."""
+
+	__slots__ = score_result_fields
+
+	def __init__(self, vector, scores, diagnostics = ()):
+		self.vector = vector
+		self.BaseScore, self.Impact, self.Exploitability, self.TemporalScore, self.EnvironmentalScore = scores
+		self.diagnostics = tuple(diagnostics)
+
+
+	def scores(self):
+		"""Returns BaseScore, Impact, Exploitability, TemporalScore, EnvironmentalScore."""
+
+		return self.BaseScore, self.Impact, self.Exploitability, self.TemporalScore, self.EnvironmentalScore
+
+
+	def error_codes(self):
+		"""Returns the list of the error codes of the diagnostics."""
+
+		return [diagnostic[0] for diagnostic in self.diagnostics]
+
+
+	def messages(self):
+		"""Formats the diagnostics into a multiline string with the error messages."""
+
+		return "".join(format_diagnostic(diagnostic) + "\n" for diagnostic in self.diagnostics)
+
+
+	def as_tuple(self):
+		"""Returns the fields (in the order of score_result_fields) as a tuple of plain values."""
+
+		return (self.vector, self.BaseScore, self.Impact, self.Exploitability, self.TemporalScore, self.EnvironmentalScore, self.diagnostics)
+
+
+	def __getstate__(self):
+		return self.as_tuple()
+
+
+	def __setstate__(self, state):
+		self.vector, self.BaseScore, self.Impact, self.Exploitability, self.TemporalScore, self.EnvironmentalScore, self.diagnostics = state
+
+
+	def __repr__(self):
+		return "ScoreResult" + repr(self.as_tuple())
+
+
+def evaluate_cvssv2_vector(cvss_vect_string):
+	"""Parses, validates and scores the CVSSv2 vector string without formatting any error messages or printing. Returns a ScoreResult with the scores of fast_compute_all and the diagnostics of the unparseable parts (in the order of the vector string) followed by the diagnostics of validate_metrics_all."""
+
+	cvss_values = {}
+	diagnostics = list()
+	if cvss_vect_string != None:
+		for part in cvss_vect_string.split("/"):
+			metric_name, colon, metric_value = part.partition(":")
+			if len(colon) == 0:
+				diagnostics.append((error_unparseable, None, None, part))
+			else:
+				cvss_values[metric_name] = metric_value
+	diagnostics.extend(validate_metrics_all(cvss_values).diagnostics)
+	return ScoreResult(cvss_vect_string, cached_compute_all(cvss_values), diagnostics)
+
+
+# the batch mode
+
+batch_output_formats = ("tsv", "csv", "jsonl")
+batch_fields = ("vector", "base", "impact", "exploitability", "temporal", "environmental")
+batch_chunk_size = 1000 # the maximum number of result rows held in memory before they are written and flushed
+
+
+cvssv3_prefix = "CVSS:3." # the vectors starting with this prefix are scored by cvssv3.py
+
+
+def score_vector(cvss_vect_string):
+	"""Computes all scores of the CVSSv2 vector string using the lookup tables (and the score cache if it is enabled, see enable_score_cache). Returns BaseScore, Impact, Exploitability, TemporalScore, EnvironmentalScore (NaN for the groups that cannot be computed). CVSSv3 vectors (starting with cvssv3_prefix) are scored by cvssv3.score_vector, so mixed input can be scored in one pass."""
+
+	if cvss_vect_string.startswith(cvssv3_prefix):
+		import cvssv3
+		return cvssv3.score_vector(cvss_vect_string)
+	return cached_compute_all(encode_cvssv2_vector(cvss_vect_string))
+
+
+def read_vectors(in_file):
+	"""Yields the vectors from the file object, one vector per line. Empty lines are skipped. Reads line by line (without a read-ahead buffer) so that it works in shell pipelines."""
+
+	for line in iter(in_file.readline, ""):
+		cvss_vect_string = line.strip()
+		if len(cvss_vect_string) > 0:
+			yield cvss_vect_string
+
+
+def batch_row_formatter(output_format):
+	"""Returns a function that formats the vector and its scores as one output line (including the newline) in the given format (one of batch_output_formats)."""
+
+	if output_format == "tsv":
+		def format_row(cvss_vect_string, scores):
+			return "\t".join([cvss_vect_string] + [str(score) for score in scores]) + "\n"
+	elif output_format == "csv":
+		def format_row(cvss_vect_string, scores):
+			if ("," in cvss_vect_string) or ("\"" in cvss_vect_string):
+				cvss_vect_string = "\"" + cvss_vect_string.replace("\"", "\"\"") + "\""
+			return ",".join([cvss_vect_string] + [str(score) for score in scores]) + "\n"
+	elif output_format == "jsonl":
+		import json
+		def format_row(cvss_vect_string, scores):
+			# NaN is not valid JSON, null is used instead
+			values = [json.dumps(cvss_vect_string)] + [("null" if score != score else str(score)) for score in scores]
+			return "{" + ", ".join("\"" + field + "\": " + value for field, value in zip(batch_fields, values)) + "}\n"
+	else:
+		raise ValueError("Unknown output format \'" + str(output_format) + "\' (valid formats are " + str(list(batch_output_formats)) + ").")
+	if profiler != None:
+		return profiler.wrap("format", format_row)
+	return format_row
+
+
+def batch_header(output_format):
+	"""Returns the header line of the output format (an empty string if the format has no header)."""
+
+	if output_format == "csv":
+		return ",".join(batch_fields) + "\n"
+	return ""
+
+
+def score_batch(in_file, out_file, output_format = "tsv", chunk_size = batch_chunk_size):
+	"""Reads vectors line by line from the in_file file object and writes one result row per vector to the out_file file object (the columns are listed in batch_fields). The memory use does not depend on the input size; the output is written and flushed in chunks of at most chunk_size rows. The csv format starts with a header line. Returns the number of scored vectors."""
+
+	format_row = batch_row_formatter(output_format)
+	out_file.write(batch_header(output_format))
+
+	count = 0
+	chunk = list()
+	for cvss_vect_string in read_vectors(in_file):
+		chunk.append(format_row(cvss_vect_string, score_vector(cvss_vect_string)))
+		count += 1
+		if len(chunk) >= chunk_size:
+			out_file.write("".join(chunk))
+			out_file.flush()
+			chunk = list()
+	out_file.write("".join(chunk))
+	out_file.flush()
+	return count
+
+
+# the parallel batch mode
+
+parallel_shard_size = 4 * 1024 * 1024 # the approximate number of input bytes scored by one task of the process pool
+
+
+def file_shards(file_name, shard_size = parallel_shard_size):
+	"""Splits the file into shards of approximately shard_size bytes. The shard boundaries are aligned to the line starts. Returns a list of (start offset, end offset) tuples in the file order."""
+
+	boundaries = [0]
+	with open(file_name, "rb") as f:
+		f.seek(0, 2)
+		file_size = f.tell()
+		offset = shard_size
+		while offset < file_size:
+			# move to the start of the next line
+			f.seek(offset - 1)
+			f.readline()
+			boundary = f.tell()
+			if boundary >= file_size:
+				break
+			if boundary > boundaries[-1]:
+				boundaries.append(boundary)
+			offset = max(offset + shard_size, boundary + 1)
+		boundaries.append(file_size)
+	return [(boundaries[i], boundaries[i + 1]) for i in range(len(boundaries) - 1) if boundaries[i] < boundaries[i + 1]]
+
+
+def read_shard_vectors(file_name, start, end):
+	"""Yields the vectors from the lines of the file that start from the start offset to the end offset (see file_shards). Empty lines are skipped."""
+
+	with open(file_name, "rb") as f:
+		f.seek(start)
+		position = start
+		while position < end:
+			line = f.readline()
+			if len(line) == 0:
+				break
+			position += len(line)
+			cvss_vect_string = line.strip()
+			if not isinstance(cvss_vect_string, str):
+				# Python 3 reads the shard as bytes
+				cvss_vect_string = cvss_vect_string.decode("latin-1")
+			if len(cvss_vect_string) > 0:
+				yield cvss_vect_string
+
+
+def score_file_shard(shard_task):
+	"""Scores the lines of one shard of the file. The shard_task parameter is a (file name, start offset, end offset, output format) tuple. Returns the formatted result rows as a single string. This is the task function of the process pool in score_file_parallel."""
+
+	file_name, start, end, output_format = shard_task
+	format_row = batch_row_formatter(output_format)
+	return "".join(format_row(cvss_vect_string, score_vector(cvss_vect_string)) for cvss_vect_string in read_shard_vectors(file_name, start, end))
+
+
+def score_file_parallel(file_name, out_file, output_format = "tsv", jobs = None, shard_size = parallel_shard_size):
+	"""Same as score_batch but scores the file named file_name in jobs processes (the number of CPUs if jobs is None). The file is split into byte ranges of approximately shard_size bytes (see file_shards) that are scored by a process pool; the results are written to out_file in the input order as soon as the preceding shards are done."""
+
+	import multiprocessing
+	# build the lookup tables before the pool is created so that forked workers share them
+	get_scoring_tables()
+	shard_tasks = [(file_name, start, end, output_format) for start, end in file_shards(file_name, shard_size)]
+	out_file.write(batch_header(output_format))
+	pool = multiprocessing.Pool(jobs)
+	try:
+		# imap returns the results in the order of the tasks
+		for rows in pool.imap(score_file_shard, shard_tasks):
+			out_file.write(rows)
+			out_file.flush()
+		pool.close()
+	except:
+		pool.terminate()
+		raise
+	finally:
+		pool.join()
+	out_file.flush()
+
+
+# the statistics mode
+
+stats_score_names = batch_fields[1:] # the scores counted by ScoreStats
+stats_score_values = 101 # the number of the possible values of a score (0.0 to 10.0 by 0.1)
+stats_percentiles = (50, 90, 99) # the percentiles printed by ScoreStats.summary
+severity_bands = (("Low", 0.0, 3.9), ("Medium", 4.0, 6.9), ("High", 7.0, 10.0)) # the NVD severity ratings of the CVSS v2 scores as (name, lowest score, highest score) tuples
+
+
+class ScoreStats(object):
+	"""Streaming aggregates of a stream of vectors in constant memory: the number of vectors, the number of the invalid vectors (without the base score), a histogram over the possible values of each score (stats_score_names) and the counts of the values of each CVSSv2 metric (indexed by the packed field, see pack_cvssv2_values: 0 is a missing metric, 1 to n are the valid values, packed_invalid_value is an invalid value).
+
+	The aggregates of separately collected parts of a stream (such as the shards of a parallel run) are combined by merge; to_dict and score_stats_from_dict convert them to and from JSON-compatible dictionaries so that the parts can be collected by separate processes or machines. CVSSv3 vectors are scored by cvssv3.score_vector and counted in the score histograms but not in the metric counts."""
+
+	def __init__(self):
+		self.count = 0
+		self.invalid_count = 0
+		self.cvssv3_count = 0
+		self.score_counts = collections.OrderedDict((score_name, [0] * (stats_score_values + 1)) for score_name in stats_score_names) # score name:counts; the index is the score in tenths, the last item counts NaN
+		self.metric_counts = collections.OrderedDict((metric, [0] * (packed_field_mask + 1)) for metric in packed_metrics) # metric:counts; the index is the packed field
+
+
+	def add(self, cvss_vect_string):
+		"""Scores the vector string and adds it to the aggregates."""
+
+		if cvss_vect_string.startswith(cvssv3_prefix):
+			import cvssv3
+			self.cvssv3_count += 1
+			self.add_scores(cvssv3.score_vector(cvss_vect_string))
+			return
+		packed = encode_cvssv2_vector(cvss_vect_string)
+		fields = packed
+		for counts in self.metric_counts.values():
+			counts[fields & packed_field_mask] += 1
+			fields >>= packed_bits_per_metric
+		self.add_scores(fast_compute_all(packed))
+
+
+	def add_scores(self, scores):
+		"""Adds the scores of one vector (in the order of stats_score_names) to the score histograms."""
+
+		self.count += 1
+		if scores[0] != scores[0]:
+			self.invalid_count += 1
+		for counts, score in zip(self.score_counts.values(), scores):
+			if score != score:
+				counts[stats_score_values] += 1
+			else:
+				counts[int(round(abs(score) * 10))] += 1
+
+
+	def merge(self, other):
+		"""Adds the aggregates of the other ScoreStats to this one. Returns self."""
+
+		self.count += other.count
+		self.invalid_count += other.invalid_count
+		self.cvssv3_count += other.cvssv3_count
+		for aggregates, other_aggregates in ((self.score_counts, other.score_counts), (self.metric_counts, other.metric_counts)):
+			for name, counts in aggregates.items():
+				other_counts = other_aggregates[name]
+				if len(other_counts) != len(counts):
+					raise ValueError("The counts of '" + name + "' have a different length.")
+				for i, count in enumerate(other_counts):
+					counts[i] += count
+		return self
+
+
+	def histogram(self, score_name):
+		"""Returns the number of vectors for each value of the score as an ordered dictionary of float:integer (score:count) in the ascending order of the scores. The vectors without the score are not counted."""
+
+		counts = self.score_counts[score_name]
+		return collections.OrderedDict((tenths / 10.0, counts[tenths]) for tenths in range(stats_score_values) if counts[tenths] > 0)
+
+
+	def missing(self, score_name):
+		"""Returns the number of vectors without the score (NaN)."""
+
+		return self.score_counts[score_name][stats_score_values]
+
+
+	def mean(self, score_name):
+		"""Returns the mean of the score over the vectors that have it (NaN if there are none)."""
+
+		counts = self.score_counts[score_name]
+		num_of_scores = sum(counts[:stats_score_values])
+		if num_of_scores == 0:
+			return float("NaN")
+		return sum(tenths * counts[tenths] for tenths in range(stats_score_values)) / (10.0 * num_of_scores)
+
+
+	def percentile(self, score_name, percent):
+		"""Returns the percentile (the nearest rank, percent from 0 to 100) of the score over the vectors that have it (NaN if there are none)."""
+
+		import math
+		counts = self.score_counts[score_name]
+		num_of_scores = sum(counts[:stats_score_values])
+		if num_of_scores == 0:
+			return float("NaN")
+		rank = max(1, int(math.ceil(percent / 100.0 * num_of_scores)))
+		for tenths in range(stats_score_values):
+			rank -= counts[tenths]
+			if rank <= 0:
+				return tenths / 10.0
+		return (stats_score_values - 1) / 10.0
+
+
+	def severity_counts(self, score_name):
+		"""Returns the number of vectors in each severity band (see severity_bands) of the score as an ordered dictionary of string:integer (band name:count)."""
+
+		counts = self.score_counts[score_name]
+		return collections.OrderedDict((band, sum(counts[int(round(low * 10)):int(round(high * 10)) + 1])) for band, low, high in severity_bands)
+
+
+	def metric_value_counts(self, metric):
+		"""Returns the counts of the values of the CVSSv2 metric as an ordered dictionary of string:integer (value:count) with the valid values in the canonical order followed by "missing" and "invalid"."""
+
+		counts = self.metric_counts[metric]
+		values = dict(base_metrics_values + temp_metrics_values + env_metrics_values)[metric]
+		value_counts = collections.OrderedDict((value, counts[ordinal + 1]) for ordinal, value in enumerate(values))
+		value_counts["missing"] = counts[0]
+		value_counts["invalid"] = counts[packed_invalid_value]
+		return value_counts
+
+
+	def to_dict(self):
+		"""Returns the aggregates as a JSON-compatible dictionary (see score_stats_from_dict)."""
+
+		return collections.OrderedDict((
+			("count", self.count),
+			("invalid_count", self.invalid_count),
+			("cvssv3_count", self.cvssv3_count),
+			("score_counts", self.score_counts),
+			("metric_counts", self.metric_counts)
+		))
+
+
+	def summary(self):
+		"""Returns the aggregates as a multiline text: the numbers of vectors, the mean, the percentiles (stats_percentiles) and the severity bands of each score and the value counts of each CVSSv2 metric."""
+
+		lines = ["vectors: {}".format(self.count), "invalid vectors: {}".format(self.invalid_count), "CVSS v3 vectors: {}".format(self.cvssv3_count), ""]
+		header = ["score", "mean"] + ["p{}".format(percent) for percent in stats_percentiles] + [band for band, low, high in severity_bands] + ["missing"]
+		lines.append("{:<15}".format(header[0]) + "".join("{:>8}".format(column) for column in header[1:]))
+		for score_name in stats_score_names:
+			mean = self.mean(score_name)
+			columns = ["nan" if mean != mean else "{:.2f}".format(mean)] + [str(self.percentile(score_name, percent)) for percent in stats_percentiles] + [str(count) for count in self.severity_counts(score_name).values()] + [str(self.missing(score_name))]
+			lines.append("{:<15}".format(score_name) + "".join("{:>8}".format(column) for column in columns))
+		lines.append("")
+		for metric in packed_metrics:
+			lines.append("{:<4}".format(metric) + " ".join("{}:{}".format(value, count) for value, count in self.metric_value_counts(metric).items()))
+		return "\n".join(lines) + "\n"
+
+
+def score_stats_from_dict(stats_dict):
+	"""Returns the ScoreStats of the dictionary returned by ScoreStats.to_dict (e.g. loaded from JSON)."""
+
+	stats = ScoreStats()
+	stats.count = stats_dict["count"]
+	stats.invalid_count = stats_dict["invalid_count"]
+	stats.cvssv3_count = stats_dict["cvssv3_count"]
+	other = ScoreStats()
+	for aggregates, dict_aggregates in ((other.score_counts, stats_dict["score_counts"]), (other.metric_counts, stats_dict["metric_counts"])):
+		for name in aggregates:
+			aggregates[name] = list(dict_aggregates[name])
+	return stats.merge(other)
+
+
+def collect_stats(vectors):
+	"""Returns the ScoreStats of the vector strings of the iterable (e.g. read_vectors of a file)."""
+
+	stats = ScoreStats()
+	for cvss_vect_string in vectors:
+		stats.add(cvss_vect_string)
+	return stats
+
+
+def collect_stats_shard(shard_task):
+	"""Returns the ScoreStats of one shard of the file. The shard_task parameter is a (file name, start offset, end offset) tuple. This is the task function of the process pool in collect_stats_parallel."""
+
+	file_name, start, end = shard_task
+	return collect_stats(read_shard_vectors(file_name, start, end))
+
+
+def collect_stats_parallel(file_name, jobs = None, shard_size = parallel_shard_size):
+	"""Same as collect_stats(read_vectors(...)) but collects the aggregates of the file named file_name in jobs processes (the number of CPUs if jobs is None), one ScoreStats per shard (see file_shards), and merges them."""
+
+	import multiprocessing
+	# build the lookup tables before the pool is created so that forked workers share them
+	get_scoring_tables()
+	stats = ScoreStats()
+	pool = multiprocessing.Pool(jobs)
+	try:
+		for shard_stats in pool.imap_unordered(collect_stats_shard, [(file_name, start, end) for start, end in file_shards(file_name, shard_size)]):
+			stats.merge(shard_stats)
+		pool.close()
+	except:
+		pool.terminate()
+		raise
+	finally:
+		pool.join()
+	return stats
+
+
+def print_stats(stats, output_format = "tsv"):
+	"""Prints the ScoreStats (or the WhatIfReport): as one JSON line (see ScoreStats.to_dict) if the output format is jsonl, as the text summary otherwise."""
+
+	if output_format == "jsonl":
+		import json
+		print(json.dumps(stats.to_dict()))
+	else:
+		print(stats.summary(), end="")
+
+
+# the what-if analysis
+
+what_if_score_names = ("base", "temporal", "environmental", "overall") # the scores compared by what_if; the overall score is the environmental score if it can be computed, the temporal score otherwise, the base score otherwise
+default_what_if_crossings = 1000 # the number of the severity crossings listed in the what_if report by default (all of them are counted in band_changes)
+what_if_cache_size = 65536 # the number of the distinct vectors whose score changes what_if keeps (the kept changes are dropped when it is reached)
+
+
+def severity_band(score):
+	"""Returns the name of the severity band (see severity_bands) of the score or None for NaN."""
+
+	for band, low, high in severity_bands:
+		if score <= high:
+			return band if score == score else None
+	return None
+
+
+def overall_score(scores):
+	"""Returns the overall score of the scores (BaseScore, Impact, Exploitability, TemporalScore, EnvironmentalScore): the most specific score that can be computed."""
+
+	for score in (scores[4], scores[3], scores[0]):
+		if score == score:
+			return score
+	return scores[0]
+
+
+def parse_substitution_rules(rules_string):
+	"""Parses the comma-separated substitution rules of what_if. A rule "METRIC:VALUE=NEW" sets the metric to NEW in the vectors where it has VALUE; a rule "METRIC=NEW" sets the metric to NEW in all vectors (also where it is missing). Returns the list of (field mask, the field bits that match or None for any, the new field bits) tuples of the packed vectors (see pack_cvssv2_values). Raises ValueError for an unknown metric or value."""
+
+	rules = list()
+	for rule in rules_string.split(","):
+		condition, equals, new_value = rule.strip().partition("=")
+		metric, colon, old_value = condition.partition(":")
+		if (len(equals) == 0) or (metric not in metric_ordinals):
+			raise ValueError("The substitution rule \'" + rule + "\' does not have the form METRIC:VALUE=NEW or METRIC=NEW with a CVSSv2 metric.")
+		shift = packed_metrics.index(metric) * packed_bits_per_metric
+		match_bits = None
+		for value in ([new_value, old_value] if len(colon) > 0 else [new_value]):
+			if value not in metric_ordinals[metric]:
+				raise ValueError("The value \'" + value + "\' of the substitution rule \'" + rule + "\' is invalid (valid values are " + valid_values_texts[metric] + ").")
+		if len(colon) > 0:
+			match_bits = (metric_ordinals[metric][old_value] + 1) << shift
+		rules.append((packed_field_mask << shift, match_bits, (metric_ordinals[metric][new_value] + 1) << shift))
+	return rules
+
+
+def substitute_packed(packed, rules):
+	"""Applies the substitution rules (see parse_substitution_rules) in their order to the packed vector. Returns the new packed vector."""
+
+	for field_mask, match_bits, new_bits in rules:
+		if (match_bits == None) or (packed & field_mask == match_bits):
+			packed = (packed & ~field_mask) | new_bits
+	return packed
+
+
+class WhatIfReport(object):
+	"""The result of what_if: the number of vectors (count), of the vectors changed by the rules (changed) and of the skipped CVSSv3 vectors (skipped), the distribution of the score deltas (deltas, delta:count in tenths rounded to one decimal; the unchanged vectors have the delta 0.0), the number of vectors whose score can be computed only before or only after the change (unscored), the numbers of the severity band changes (band_changes, (old band, new band):count) and the first max_crossings vectors that cross a severity threshold (crossings, a list of (position in the input, vector string, old score, new score) tuples)."""
+
+	def __init__(self, rules_string, score_name, max_crossings = default_what_if_crossings):
+		self.rules = rules_string
+		self.score_name = score_name
+		self.max_crossings = max_crossings
+		self.count = 0
+		self.changed = 0
+		self.skipped = 0
+		self.unscored = 0
+		self.deltas = collections.defaultdict(int)
+		self.band_changes = collections.defaultdict(int)
+		self.crossings = list()
+
+
+	def to_dict(self):
+		"""Returns the report as a JSON-compatible dictionary."""
+
+		return collections.OrderedDict((
+			("rules", self.rules),
+			("score", self.score_name),
+			("count", self.count),
+			("changed", self.changed),
+			("skipped", self.skipped),
+			("unscored", self.unscored),
+			("deltas", collections.OrderedDict((str(delta), self.deltas[delta]) for delta in sorted(self.deltas))),
+			("band_changes", collections.OrderedDict((old_band + "->" + new_band, count) for (old_band, new_band), count in sorted(self.band_changes.items()))),
+			("crossings", [collections.OrderedDict((("position", position), ("vector", cvss_vect_string), ("old", old_score), ("new", new_score))) for position, cvss_vect_string, old_score, new_score in self.crossings])
+		))
+
+
+	def summary(self):
+		"""Returns the report as a multiline text."""
+
+		lines = ["rules: {}".format(self.rules), "vectors: {} (changed {}, skipped CVSS v3 {})".format(self.count, self.changed, self.skipped), "", "{} score delta".format(self.score_name)]
+		for delta in sorted(self.deltas):
+			lines.append("{:>+6.1f} {}".format(delta, self.deltas[delta]))
+		if self.unscored > 0:
+			lines.append("   nan {}".format(self.unscored))
+		lines.append("")
+		crossing_count = sum(self.band_changes.values())
+		if crossing_count > len(self.crossings):
+			lines.append("severity changes: {} (the first {} listed)".format(crossing_count, len(self.crossings)))
+		else:
+			lines.append("severity changes: {}".format(crossing_count))
+		for (old_band, new_band), count in sorted(self.band_changes.items()):
+			lines.append("{:>8} -> {:<8} {}".format(old_band, new_band, count))
+		for position, cvss_vect_string, old_score, new_score in self.crossings:
+			lines.append("{}\t{}\t{} -> {}".format(position, cvss_vect_string, old_score, new_score))
+		return "\n".join(lines) + "\n"
+
+
+def what_if(vectors, rules_string, score_name = "overall", max_crossings = default_what_if_crossings):
+	"""Compares the scores of the vector strings of the iterable before and after applying the substitution rules (see parse_substitution_rules) and returns a WhatIfReport of the score (one of what_if_score_names) that lists at most max_crossings severity crossings.
+
+	The vectors are streamed. The base stages are computed once per distinct base vector and kept in an IncrementalScores, a copy of which is updated to every vector with that base and then to its substituted version, so only the stages that depend on the changed metrics are recomputed (e.g. only the environmental score for CDP/TD). The score changes of up to what_if_cache_size distinct vectors are kept (all of them are dropped when the limit is reached), so repeated vectors are not rescored. Vectors not matched by the rules are not rescored."""
+
+	rules = parse_substitution_rules(rules_string)
+	score_position = what_if_score_names.index(score_name)
+	def selected_score(scores):
+		if score_position == 3:
+			return overall_score(scores)
+		return scores[(0, 3, 4)[score_position]]
+
+	report = WhatIfReport(rules_string, score_name, max_crossings)
+	base_scores = {} # dict of integer:IncrementalScores (packed base metrics:the scores of the base vector); bounded by the number of the base metrics combinations
+	changes = {} # dict of integer:tuple (packed vector:(old score, new score), an empty tuple if the rules do not change the vector)
+	for position, cvss_vect_string in enumerate(vectors):
+		report.count += 1
+		if cvss_vect_string.startswith(cvssv3_prefix):
+			report.skipped += 1
+			continue
+		packed = encode_cvssv2_vector(cvss_vect_string)
+		change = changes.get(packed)
+		if change == None:
+			new_packed = substitute_packed(packed, rules)
+			if new_packed == packed:
+				change = ()
+			else:
+				base_packed = packed & packed_base_mask
+				incremental_scores = base_scores.get(base_packed)
+				if incremental_scores == None:
+					incremental_scores = IncrementalScores(base_packed)
+					base_scores[base_packed] = incremental_scores
+				incremental_scores = incremental_scores.copy()
+				old_score = selected_score(incremental_scores.update(packed))
+				# the rules only set fields, so the changed fields of the new vector are the whole change
+				change = (old_score, selected_score(incremental_scores.update(new_packed & packed_fields_mask(new_packed ^ packed))))
+			if len(changes) >= what_if_cache_size:
+				changes.clear()
+			changes[packed] = change
+		if len(change) == 0:
+			report.deltas[0.0] += 1
+			continue
+		report.changed += 1
+		old_score, new_score = change
+		if (old_score != old_score) or (new_score != new_score):
+			if (old_score == old_score) or (new_score == new_score):
+				report.unscored += 1
+			else:
+				report.deltas[0.0] += 1
+			continue
+		report.deltas[round(new_score - old_score, 1) + 0.0] += 1
+		old_band = severity_band(old_score)
+		new_band = severity_band(new_score)
+		if old_band != new_band:
+			report.band_changes[(old_band, new_band)] += 1
+			if len(report.crossings) < report.max_crossings:
+				report.crossings.append((position, cvss_vect_string, old_score, new_score))
+	return report
+
+
+# the server mode
+
+server_stats_command = "STATS" # the request line that returns the server statistics instead of scores
+server_close_timeout = 5.0 # the number of seconds the closing server waits for each open connection
+
+
+class ServerStats(object):
+	"""Counts the requests of the server and keeps a histogram of their latencies. The histogram bucket k counts the requests that took less than 2**k microseconds (and at least 2**(k-1) microseconds). Thread-safe."""
+
+	def __init__(self):
+		import threading
+		self.lock = threading.Lock()
+		self.requests = 0
+		self.errors = 0
+		self.connections = 0
+		self.latency_buckets = collections.defaultdict(int)
+
+
+	def record(self, seconds, error = False):
+		"""Records one request that took the given number of seconds."""
+
+		bucket = int(seconds * 1000000).bit_length()
+		with self.lock:
+			self.requests += 1
+			if error:
+				self.errors += 1
+			self.latency_buckets[bucket] += 1
+
+
+	def record_connection(self):
+		"""Records one accepted connection."""
+
+		with self.lock:
+			self.connections += 1
+
+
+	def info(self):
+		"""Returns the statistics as a dictionary (requests, errors, connections and latency_us, the histogram as a dictionary of the exclusive upper bound in microseconds:number of requests)."""
+
+		with self.lock:
+			latency_us = collections.OrderedDict((str(2 ** bucket), self.latency_buckets[bucket]) for bucket in sorted(self.latency_buckets.keys()))
+			return collections.OrderedDict([("requests", self.requests), ("errors", self.errors), ("connections", self.connections), ("latency_us", latency_us)])
+
+
+def request_responder(stats = None):
+	"""Returns the function that answers one request line of the server and returns the response line (including the newline). The request is either a CVSSv2 vector string answered by a tab-separated row (see score_batch), or a JSON object {"vector": ...} answered by a JSON object with the scores (see the jsonl batch format; the "id" member of the request is copied into the response), or server_stats_command answered by the statistics (see ServerStats.info) as a JSON object. Malformed JSON requests are answered by {"error": ...}. The json module and the row formatter are set up once here, not per request."""
+
+	import json
+	format_row = batch_row_formatter("tsv")
+	json_fields = batch_fields[1:]
+
+	def respond(line):
+		line = line.strip()
+		if line == server_stats_command:
+			return json.dumps(stats.info() if stats != None else {}) + "\n"
+		if not line.startswith("{"):
+			return format_row(line, score_vector(line))
+		try:
+			request = json.loads(line)
+			cvss_vect_string = request["vector"]
+			if not isinstance(cvss_vect_string, string_types):
+				raise ValueError("The vector must be a string.")
+		except (ValueError, KeyError, TypeError) as e:
+			return json.dumps({"error": "Invalid request: " + str(e)}) + "\n"
+		response = collections.OrderedDict()
+		if "id" in request:
+			response["id"] = request["id"]
+		response["vector"] = cvss_vect_string
+		for field, score in zip(json_fields, score_vector(cvss_vect_string)):
+			# NaN is not valid JSON, null is used instead
+			response[field] = None if score != score else score
+		return json.dumps(response) + "\n"
+
+	return respond
+
+
+def make_server(socket_path):
+	"""Creates the scoring server listening on the Unix socket socket_path (see serve). A stale socket file left by a server that is not running anymore is replaced. Every connection is handled in its own thread and the connections are scored concurrently (the lookup tables are read-only once built and the score cache is thread-safe); a connection may send any number of request lines without waiting for the responses, which are written in the request order."""
+
+	import os
+	import socket
+	try:
+		import SocketServer as socketserver
+	except ImportError:
+		# Python 3
+		import socketserver
+	import threading
+	import time
+
+	if os.path.exists(socket_path):
+		probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+		try:
+			probe.connect(socket_path)
+		except socket.error:
+			os.remove(socket_path)
+		else:
+			raise ValueError("The socket \'" + socket_path + "\' is used by a running server.")
+		finally:
+			probe.close()
+
+	class ScoringRequestHandler(socketserver.StreamRequestHandler):
+		"""Answers the request lines of one connection."""
+
+		def handle(self):
+			stats = self.server.stats
+			respond = self.server.respond
+			stats.record_connection()
+			for line in self.rfile:
+				start = time.time()
+				if not isinstance(line, str):
+					# Python 3 reads bytes from the socket
+					line = line.decode("utf-8", "replace")
+				response = respond(line)
+				stats.record(time.time() - start, response.startswith("{\"error\""))
+				if not isinstance(response, bytes):
+					response = response.encode("utf-8")
+				self.wfile.write(response)
+
+	class ScoringServer(socketserver.ThreadingUnixStreamServer):
+		"""Keeps track of the open connections so that server_close can end them gracefully."""
+
+		daemon_threads = True
+
+		def process_request(self, request, client_address):
+			thread = threading.Thread(target=self.process_request_thread, args=(request, client_address))
+			thread.daemon = True
+			with self.connections_lock:
+				self.connections[thread] = request
+			thread.start()
+
+		def process_request_thread(self, request, client_address):
+			try:
+				socketserver.ThreadingUnixStreamServer.process_request_thread(self, request, client_address)
+			finally:
+				with self.connections_lock:
+					del self.connections[threading.current_thread()]
+
+		def server_close(self):
+			"""Closes the listening socket, stops reading the open connections (the requests already received are answered) and waits up to server_close_timeout seconds for each connection thread."""
+
+			socketserver.ThreadingUnixStreamServer.server_close(self)
+			with self.connections_lock:
+				connections = list(self.connections.items())
+			for thread, request in connections:
+				try:
+					request.shutdown(socket.SHUT_RD)
+				except socket.error:
+					pass
+			for thread, request in connections:
+				thread.join(server_close_timeout)
+
+	# build the lookup tables before the first request
+	get_token_tables()
+	get_scoring_tables()
+	server = ScoringServer(socket_path, ScoringRequestHandler)
+	server.stats = ServerStats()
+	server.respond = request_responder(server.stats)
+	server.connections = dict() # thread:socket of the open connections
+	server.connections_lock = threading.Lock()
+	return server
+
+
+def serve(socket_path):
+	"""Runs the scoring server (see make_server and request_responder) on the Unix socket socket_path until SIGTERM or SIGINT is received, then closes the server and removes the socket file."""
+
+	import os
+	import signal
+	import threading
+
+	server = make_server(socket_path)
+	def stop(signum, frame):
+		# shutdown waits for serve_forever to return, so it cannot be called from the serving thread
+		threading.Thread(target=server.shutdown).start()
+	previous_handlers = dict((signum, signal.signal(signum, stop)) for signum in (signal.SIGTERM, signal.SIGINT))
+	try:
+		server.serve_forever()
+	finally:
+		for signum, handler in previous_handlers.items():
+			signal.signal(signum, handler)
+		server.server_close()
+		if os.path.exists(socket_path):
+			os.remove(socket_path)
+
+
+# the profiling hooks
+
+# The profiling counts the calls and measures the time of the pipeline stages (profiled_stages). When it is enabled, the module functions (and the ScoringTables methods) of the stages are replaced by timing wrappers, so the calls through the module namespace are counted and there is no overhead at all when it is disabled. The counters are not thread-safe and are kept per process (the worker processes of --jobs are not included).
+#
+# The scoring pipeline validates the groups by the group index lookups (group_index in compute_base, compute_temp and compute_env, the inline lookups of group_indices in fast_compute_all), not by validate_metrics_base/temp/env. So the group index functions (profiled_group_functions) are counted in the validate_base, validate_temp or validate_env stage by their group argument, and group_indices is replaced by group_indices_by_group, which computes each group index by a separate call.
+
+profiled_stages = ( # (stage, the profiled functions) in the pipeline order
+	("build_tables", ("ScoringTables.__init__",)),
+	("parse", ("parse_cvssv2_vector", "parse_cvssv2_vector_fast", "encode_cvssv2_vector")),
+	("validate_base", ("validate_metrics_base",)),
+	("validate_temp", ("validate_metrics_temp",)),
+	("validate_env", ("validate_metrics_env",)),
+	("validate_all", ("validate_metrics_all", "group_indices")),
+	("compute_base", ("compute_base", "fast_compute_base")),
+	("compute_temp", ("compute_temp", "fast_compute_temp", "ScoringTables.temp_score")),
+	("compute_env", ("compute_env", "fast_compute_env", "ScoringTables.env_score")),
+	("compute_all", ("fast_compute_all",)),
+	("format", ("format_diagnostic", "print_validation_errors")) # and the row formatters of batch_row_formatter
+)
+profiled_group_functions = ("group_index", "packed_group_index") # counted in the stage of their group argument (profiled_group_stages)
+profiled_group_stages = (("validate_base", base_metrics_values), ("validate_temp", temp_metrics_values), ("validate_env", env_metrics_values))
+profiled_replacements = {"group_indices": "group_indices_by_group"} # the profiled functions that are replaced by the equivalent functions with separately profiled steps
+profiling_env_variable = "CVSSV2_PROFILE" # if set, the profiling is enabled at import and the report is written at exit to the file named by the variable ("-" for the standard error)
+
+
+class Profiler(object):
+	"""The call counters and timers of the profiled stages. Each stage counts the calls, the total time (including the nested profiled stages, e.g. validate_all within compute_all) and the self time (excluding them)."""
+
+	def __init__(self):
+		import timeit
+		self.timer = timeit.default_timer
+		self.start = self.timer()
+		self.counters = collections.OrderedDict((stage, [0, 0.0, 0.0]) for stage, names in profiled_stages) # stage:[calls, seconds, self seconds]
+		self.nested_seconds = [0.0] # the time of the nested stages of each active call, the outermost level last
+		self.originals = list() # (namespace, name, the original function) of the replaced functions
+
+
+	def wrap(self, stage, function):
+		"""Returns a wrapper of the function that counts its calls and time in the stage."""
+
+		counters = self.counters[stage]
+		nested_seconds = self.nested_seconds
+		timer = self.timer
+		def profiled(*args, **kwargs):
+			nested_seconds.append(0.0)
+			start = timer()
+			try:
+				return function(*args, **kwargs)
+			finally:
+				elapsed = timer() - start
+				nested = nested_seconds.pop()
+				nested_seconds[-1] += elapsed
+				counters[0] += 1
+				counters[1] += elapsed
+				counters[2] += elapsed - nested
+		profiled.__name__ = function.__name__
+		profiled.__doc__ = function.__doc__
+		return profiled
+
+
+	def wrap_group_function(self, function):
+		"""Returns a wrapper of the group index function (one of profiled_group_functions) that counts its calls and time in the stage of its group argument (see profiled_group_stages). The calls with other groups (the CVSSv3 groups of cvssv3.group_index) are not counted."""
+
+		wrappers = dict((id(group_metrics_values), self.wrap(stage, function)) for stage, group_metrics_values in profiled_group_stages)
+		def profiled(cvss_values, group_metrics_values, *args):
+			return wrappers.get(id(group_metrics_values), function)(cvss_values, group_metrics_values, *args)
+		profiled.__name__ = function.__name__
+		profiled.__doc__ = function.__doc__
+		return profiled
+
+
+	def install(self):
+		"""Replaces the profiled functions by their wrappers."""
+
+		namespace = globals()
+		for name in profiled_group_functions:
+			self.originals.append((namespace, name, namespace[name]))
+			namespace[name] = self.wrap_group_function(namespace[name])
+		for stage, names in profiled_stages:
+			for name in names:
+				class_name, dot, attribute = name.rpartition(".")
+				if len(dot) == 0:
+					namespace = globals()
+					function = namespace[attribute]
+				else:
+					namespace = globals()[class_name]
+					function = namespace.__dict__[attribute]
+				self.originals.append((namespace, attribute, function))
+				if name in profiled_replacements:
+					function = globals()[profiled_replacements[name]]
+				if isinstance(namespace, dict):
+					namespace[attribute] = self.wrap(stage, function)
+				else:
+					setattr(namespace, attribute, self.wrap(stage, function))
+
+
+	def uninstall(self):
+		"""Restores the original profiled functions."""
+
+		for namespace, attribute, function in reversed(self.originals):
+			if isinstance(namespace, dict):
+				namespace[attribute] = function
+			else:
+				setattr(namespace, attribute, function)
+		self.originals = list()
+
+
+	def report(self):
+		"""Returns the report as a JSON-compatible ordered dictionary: the wall time since the profiling was enabled and the calls, seconds and self_seconds of each stage."""
+
+		return collections.OrderedDict((
+			("wall_seconds", self.timer() - self.start),
+			("stages", collections.OrderedDict((stage, collections.OrderedDict((("calls", calls), ("seconds", seconds), ("self_seconds", self_seconds)))) for stage, (calls, seconds, self_seconds) in self.counters.items()))
+		))
+
+
+profiler = None # the Profiler of the enabled profiling; None if the profiling is disabled
+
+
+def enable_profiling():
+	"""Enables the profiling of the pipeline stages (see profiled_stages) with new counters. Returns the Profiler."""
+
+	global profiler
+	disable_profiling()
+	profiler = Profiler()
+	profiler.install()
+	return profiler
+
+
+def disable_profiling():
+	"""Disables the profiling and restores the original functions."""
+
+	global profiler
+	if profiler != None:
+		profiler.uninstall()
+		profiler = None
+
+
+def profiling_report():
+	"""Returns the report of the enabled profiling (see Profiler.report) or None if the profiling is disabled."""
+
+	if profiler == None:
+		return None
+	return profiler.report()
+
+
+def write_profiling_report(file_name):
+	"""Writes the report of the enabled profiling as JSON to the file (\"-\" for the standard error). Does nothing if the profiling is disabled."""
+
+	import json
+	import sys
+	report = profiling_report()
+	if report == None:
+		return
+	if file_name == "-":
+		sys.stderr.write(json.dumps(report) + "\n")
+	else:
+		with open(file_name, "w") as f:
+			f.write(json.dumps(report, indent=2) + "\n")
+
+
+def enable_profiling_at_exit(file_name):
+	"""Enables the profiling and writes the report to the file (see write_profiling_report) when the process exits."""
+
+	import atexit
+	enable_profiling()
+	atexit.register(write_profiling_report, file_name)
+
+
 def interactively_ask_missing(cvss_values):
 	"""Interactively asks for missing/wrong values until everything is OK or until the user doesn't want to answer anymore."""
 
@@ -474,25 +2495,23 @@ def interactively_ask_missing(cvss_values):
 	while ask_again:
 
 		# gather list of errors
-		missing_list_base, error_list_base, error_messages_base = validate_metrics_base(cvss_values)
-		missing_list_temp, error_list_temp, error_messages_temp = validate_metrics_temp(cvss_values)
-		missing_list_env, error_list_env, error_messages_env = validate_metrics_env(cvss_values)
-		error_list = error_list_base + error_list_temp + error_list_env
+		validation = validate_metrics_all(cvss_values)
+		error_list = validation.errors["base"] + validation.errors["temp"] + validation.errors["env"]
 
 		# print errors
-		if len(error_messages_base) > 0:
-			print "Base metrics errors:"
-			print error_messages_base
-		if len(error_messages_temp) > 0:
-			print "Temporal metrics errors: (The temporal group is optional.)"
-			print error_messages_temp
-		if len(error_messages_env) > 0:
-			print "Environmental metrics errors: (The environmental group is optional.)"
-			print error_messages_env
+		if len(validation.messages["base"]) > 0:
+			print("Base metrics errors:")
+			print(validation.messages["base"])
+		if len(validation.messages["temp"]) > 0:
+			print("Temporal metrics errors: (The temporal group is optional.)")
+			print(validation.messages["temp"])
+		if len(validation.messages["env"]) > 0:
+			print("Environmental metrics errors: (The environmental group is optional.)")
+			print(validation.messages["env"])
 
 		# allow cancellation of a repeated input prompt (if there are still unresolved input errors)
 		if (len(error_list) > 0) and (not first_run):
-			val = raw_input("Do you want to skip the value input and compute what we've got? [Y]")
+			val = read_input("Do you want to skip the value input and compute what we've got? [Y]")
 			# cancel on Enter/Y/y
 			if (val == "Y") or (val == "y") or (len(val) == 0):
 				ask_again = False
@@ -500,7 +2519,7 @@ def interactively_ask_missing(cvss_values):
 
 		# ask for the inputs (corrections)
 		for metric in error_list:
-			val = raw_input("Enter the value for the \'" + metric + "\' metric: ")
+			val = read_input("Enter the value for the \'" + metric + "\' metric: ")
 			if len(val) > 0:
 				cvss_values[metric] = val
 
@@ -520,13 +2539,124 @@ def main():
 	# parse arguments
 	import argparse
 	parser = argparse.ArgumentParser()
-	parser.add_argument('-v', '--vector', help="CVSS v2 vector provided as a single string. See https://www.first.org/cvss/cvss-v2-guide.pdf for the vector format.")
+	parser.add_argument('-v', '--vector', help="CVSS v2 vector provided as a single string. See https://www.first.org/cvss/cvss-v2-guide.pdf for the vector format. CVSS v3.0 and v3.1 vectors (starting with CVSS:3.0/ or CVSS:3.1/) are scored by cvssv3.py.")
 	parser.add_argument('-b', '--bare-output', help="Prints only the resulting scores (number) or \"nan\" to the output.", action='store_true')
 	parser.add_argument('-i', '--interactive', help="The program will ask for missing CVSS v2 vector items interactively.", action='store_true')
+	parser.add_argument('--batch', metavar='FILE', help="Reads CVSS v2 (or v3.x) vectors line by line from FILE (\"-\" for the standard input) and prints one result row per vector: the vector and the base, impact, exploitability, temporal and environmental scores. Empty lines are skipped.")
+	parser.add_argument('--format', choices=batch_output_formats, default="tsv", help="The output format of the batch mode: tab-separated values (default), comma-separated values with a header line, or JSON Lines. Scores that cannot be computed are \"nan\" (null in JSON Lines).")
+	parser.add_argument('-j', '--jobs', type=int, default=1, help="The number of processes used by the batch mode (default 1). More than one process requires --batch with a file name (not the standard input).")
+	parser.add_argument('--cache-size', type=int, default=0, help="Caches the scores of up to the given number of distinct vectors in the batch and server modes (default 0, no cache). Useful when the input repeats the same vectors.")
+	parser.add_argument('--serve', metavar='SOCKET', help="Runs a scoring server on the Unix socket SOCKET until SIGTERM or SIGINT is received. Every request line is either a CVSS v2 vector (answered by a tab-separated row as in the batch mode), a JSON object {\"vector\": ...} (answered by a JSON object with the scores), or STATS (answered by the request count and the latency histogram as JSON).")
+	parser.add_argument('--stats', action='store_true', help="With --batch, prints the aggregate statistics of the vectors instead of the result rows: the number of the (invalid) vectors, the mean, the percentiles and the severity bands of each score and the value counts of each metric. With --format jsonl, prints the aggregates as one JSON line that can be merged with others by --merge-stats.")
+	parser.add_argument('--merge-stats', metavar='FILE', nargs='+', help="Merges the aggregates printed by --stats --format jsonl (one JSON line per shard, in one or more files; \"-\" for the standard input) and prints the statistics of all of them (as JSON with --format jsonl).")
+	parser.add_argument('--what-if', metavar='RULES', help="With --batch, compares the scores of the vectors before and after applying the comma-separated substitution rules (METRIC:VALUE=NEW sets the metric to NEW where it has VALUE, METRIC=NEW sets it in all vectors; e.g. RL:U=OF,CR=H) and prints the distribution of the score deltas and the vectors that cross a severity threshold (as JSON with --format jsonl).")
+	parser.add_argument('--what-if-score', choices=what_if_score_names, default="overall", help="The score compared by --what-if (default overall: the environmental score if it can be computed, the temporal score otherwise, the base score otherwise).")
+	parser.add_argument('--profile', metavar='FILE', help="Counts the calls and measures the time of the pipeline stages (parsing, validation, computation of the groups, output formatting) and writes the report as JSON to FILE (\"-\" for the standard error) at exit. The same as setting the environment variable " + profiling_env_variable + " to FILE.")
 	args = parser.parse_args()
 
+	if args.profile != None:
+		if args.serve != None:
+			print("The option --profile is incompatible with the option --serve.")
+			return
+		enable_profiling_at_exit(args.profile)
+
 	if args.bare_output and args.interactive:
-		print "The options -b and -i are mutually incompatible."
+		print("The options -b and -i are mutually incompatible.")
+		return
+
+	if args.serve != None:
+		if (args.vector != None) or args.interactive or (args.batch != None):
+			print("The option --serve is incompatible with the options -v, -i and --batch.")
+			return
+		if args.cache_size > 0:
+			enable_score_cache(args.cache_size)
+		try:
+			serve(args.serve)
+		except ValueError as e:
+			print(e)
+		return
+
+	if args.merge_stats != None:
+		if (args.vector != None) or args.interactive or (args.batch != None):
+			print("The option --merge-stats is incompatible with the options -v, -i and --batch.")
+			return
+		import json
+		import sys
+		stats = ScoreStats()
+		for file_name in args.merge_stats:
+			in_file = sys.stdin if file_name == "-" else open(file_name, "r")
+			try:
+				for line in read_vectors(in_file):
+					stats.merge(score_stats_from_dict(json.loads(line)))
+			finally:
+				if in_file != sys.stdin:
+					in_file.close()
+		print_stats(stats, args.format)
+		return
+
+	if (args.stats or (args.what_if != None)) and (args.batch == None):
+		print("The options --stats and --what-if require --batch.")
+		return
+	if args.stats and (args.what_if != None):
+		print("The option --stats is incompatible with the option --what-if.")
+		return
+	if (args.what_if != None) and (args.jobs > 1):
+		print("The option --jobs is not supported with --what-if.")
+		return
+
+	if args.batch != None:
+		if (args.vector != None) or args.interactive:
+			print("The option --batch is incompatible with the options -v and -i.")
+			return
+		import sys
+		if args.jobs < 1:
+			print("The number of jobs must be at least 1.")
+			return
+		if args.cache_size > 0:
+			enable_score_cache(args.cache_size)
+		if args.what_if != None:
+			try:
+				if args.batch == "-":
+					report = what_if(read_vectors(sys.stdin), args.what_if, args.what_if_score)
+				else:
+					with open(args.batch, "r") as in_file:
+						report = what_if(read_vectors(in_file), args.what_if, args.what_if_score)
+			except ValueError as e:
+				print(e)
+				return
+			print_stats(report, args.format)
+			return
+		if args.stats:
+			if args.jobs > 1:
+				if args.batch == "-":
+					print("The option --jobs requires --batch with a file name.")
+					return
+				stats = collect_stats_parallel(args.batch, args.jobs)
+			elif args.batch == "-":
+				stats = collect_stats(read_vectors(sys.stdin))
+			else:
+				with open(args.batch, "r") as in_file:
+					stats = collect_stats(read_vectors(in_file))
+			print_stats(stats, args.format)
+			return
+		if args.jobs > 1:
+			if args.batch == "-":
+				print("The option --jobs requires --batch with a file name.")
+				return
+			score_file_parallel(args.batch, sys.stdout, args.format, args.jobs)
+		elif args.batch == "-":
+			score_batch(sys.stdin, sys.stdout, args.format)
+		else:
+			with open(args.batch, "r") as in_file:
+				score_batch(in_file, sys.stdout, args.format)
+		return
+
+	if (args.vector != None) and args.vector.startswith(cvssv3_prefix):
+		if args.interactive:
+			print("The option -i is not supported for CVSS v3 vectors.")
+			return
+		import cvssv3
+		cvssv3.print_scores(args.vector, args.bare_output)
 		return
 
 	# parse the CVSSv2 vector string into a dictionary
@@ -534,37 +2664,45 @@ def main():
 
 	# print parsing errors
 	if (not args.bare_output) and (len(error_messages) > 0):
-		print error_messages
+		print(error_messages)
 
 	# interactively ask for missing values
 	if args.interactive:
 		interactively_ask_missing(cvss_vector_values) 
 
 	# validate the CVSSv2 vector and detect which groups are incomplete
-	base_incomplete, temp_incomplete, env_incomplete = validate_metrics_all_print_errors(cvss_vector_values, (not args.bare_output))
+	validation = validate_metrics_all(cvss_vector_values)
+	if not args.bare_output:
+		print_validation_errors(validation)
+	base_incomplete, temp_incomplete, env_incomplete = validation.base_incomplete, validation.temp_incomplete, validation.env_incomplete
 
 	# compute the scores/numeric values
-	BaseScore, Impact, Exploitability = compute_base(cvss_vector_values)
-	TemporalScore = compute_temp(cvss_vector_values)
-	EnvironmentalScore = compute_env(cvss_vector_values)
+	BaseScore, Impact, Exploitability = compute_base(cvss_vector_values, validation = validation)
+	TemporalScore = compute_temp(cvss_vector_values, validation = validation)
+	EnvironmentalScore = compute_env(cvss_vector_values, validation = validation)
 
 	# print results
 	if args.bare_output:
-		print BaseScore
-		print TemporalScore
-		print EnvironmentalScore
+		print(BaseScore)
+		print(TemporalScore)
+		print(EnvironmentalScore)
 	else:
 		if not base_incomplete:
-			print "CVSS Base Score:          {:>4}".format(BaseScore)
-			print " Impact Subscore:         {:>4}".format(Impact)
-			print " Exploitability Subscore: {:>4}".format(Exploitability)
+			print("CVSS Base Score:          {:>4}".format(BaseScore))
+			print(" Impact Subscore:         {:>4}".format(Impact))
+			print(" Exploitability Subscore: {:>4}".format(Exploitability))
 
 		if not temp_incomplete:
-			print "CVSS Temporal Score:      {:>4}".format(TemporalScore)
+			print("CVSS Temporal Score:      {:>4}".format(TemporalScore))
 
 		if not env_incomplete:
-			print "CVSS Environmental Score: {:>4}".format(EnvironmentalScore)
+			print("CVSS Environmental Score: {:>4}".format(EnvironmentalScore))
+
+
 
+# enables the profiling of the whole process if the environment variable is set
+if len(os.environ.get(profiling_env_variable, "")) > 0:
+	enable_profiling_at_exit(os.environ[profiling_env_variable])
 
 
 if __name__ == '__main__':
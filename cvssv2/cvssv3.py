@@ -0,0 +1,420 @@
+#!/usr/bin/env python
+
+#   CVSS v3.0/v3.1 calculator. Calculates score from input vector.
+#   Copyright (C) 2026  Jakub Svoboda
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+# CVSSv3 vectors start with the version prefix and may look like this:
+# CVSS:3.1/AV:N/AC:L/PR:N/UI:N/S:U/C:H/I:H/A:H
+# CVSS:3.0/AV:N/AC:L/PR:L/UI:N/S:C/C:L/I:L/A:N/E:P/RL:O/RC:C/CR:H/MAV:L/MS:U
+#
+# Sources of the equations:
+# - https://www.first.org/cvss/v3.1/specification-document
+# - https://www.first.org/cvss/v3.0/specification-document
+#
+# The base metrics are mandatory; the temporal and environmental metrics are optional and default to X (not defined). As in cvssv2.py, the scores of a group that cannot be computed (a missing base metric or an invalid value) are NaN, and a metric given more than once takes the last value.
+
+
+from __future__ import print_function
+import itertools
+import math
+import cvssv2
+
+
+vector_prefix = "CVSS:3." # the prefix that tells CVSSv3 vectors from CVSSv2 vectors
+versions = {"CVSS:3.0": "3.0", "CVSS:3.1": "3.1"} # dict of string:string (vector prefix:version)
+default_version = "3.1"
+
+# the metrics of the individual groups in the canonical order together with their valid values; the position of a value in its tuple is the value's ordinal
+base_metrics_values = (
+	("AV", ("N","A","L","P")),
+	("AC", ("L","H")),
+	("PR", ("N","L","H")),
+	("UI", ("N","R")),
+	("S", ("U","C")),
+	("C", ("H","L","N")),
+	("I", ("H","L","N")),
+	("A", ("H","L","N"))
+)
+temp_metrics_values = (
+	("E", ("X","H","F","P","U")),
+	("RL", ("X","U","W","T","O")),
+	("RC", ("X","C","R","U"))
+)
+env_metrics_values = (
+	("CR", ("X","H","M","L")),
+	("IR", ("X","H","M","L")),
+	("AR", ("X","H","M","L")),
+	("MAV", ("X","N","A","L","P")),
+	("MAC", ("X","L","H")),
+	("MPR", ("X","N","L","H")),
+	("MUI", ("X","N","R")),
+	("MS", ("X","U","C")),
+	("MC", ("X","H","L","N")),
+	("MI", ("X","H","L","N")),
+	("MA", ("X","H","L","N"))
+)
+
+# dict of string:dict (metric:(value:ordinal))
+metric_ordinals = dict((metric, dict((value, ordinal) for ordinal, value in enumerate(values))) for metric, values in base_metrics_values + temp_metrics_values + env_metrics_values)
+
+# the numeric weights of the metric values in the order of the values in *_metrics_values; the privileges required depend on the scope (unchanged, changed)
+metric_weights = {
+	"AV": (0.85, 0.62, 0.55, 0.2),
+	"AC": (0.77, 0.44),
+	"PR": ((0.85, 0.62, 0.27), (0.85, 0.68, 0.5)),
+	"UI": (0.85, 0.62),
+	"C": (0.56, 0.22, 0),
+	"I": (0.56, 0.22, 0),
+	"A": (0.56, 0.22, 0),
+	"E": (1, 1, 0.97, 0.94, 0.91),
+	"RL": (1, 1, 0.97, 0.96, 0.95),
+	"RC": (1, 1, 0.96, 0.92),
+	"CR": (1, 1.5, 1, 0.5),
+	"IR": (1, 1.5, 1, 0.5),
+	"AR": (1, 1.5, 1, 0.5)
+}
+
+# the modified base metrics of the environmental group; dict of string:string (modified metric:base metric)
+modified_metrics = dict(("M" + metric, metric) for metric in ("AV", "AC", "PR", "UI", "S", "C", "I", "A"))
+
+
+def parse_cvssv3_vector(cvss_vect_string):
+	"""Parses the input string (CVSSv3 vector) into the version ("3.0" or "3.1") and a metric:value dictionary. Returns the version (None if the version prefix is missing or unknown), the dictionary and a multiline string with messages about encountered errors."""
+
+	cvss_vector_values = {} # dict of string:string
+	error_messages = ""
+
+	if cvss_vect_string == None:
+		return None, cvss_vector_values, error_messages
+
+	metrics_list = cvss_vect_string.split("/")
+	version = versions.get(metrics_list[0])
+	if version == None:
+		error_messages += "The vector does not start with a known CVSS v3 version (" + ", ".join(sorted(versions.keys())) + ").\n"
+	for metric in metrics_list[1:]:
+		try:
+			metric_name, metric_value = metric.split(":", 1)
+			cvss_vector_values[metric_name] = metric_value
+		except ValueError:
+			error_message = "The metric string \"" + metric + "\" cannot be parsed."
+			error_messages += error_message + "\n";
+
+	return version, cvss_vector_values, error_messages
+
+
+def validate_metrics(cvss_values, group_metrics_values, required):
+	"""Validates the metrics of one group. The metrics of the optional groups (required is False) may be missing. Returns a list of the missing metrics, a list of the missing or invalid metrics and a multiline string with error messages."""
+
+	missing = list()
+	errors = list()
+	error_messages = ""
+	for metric, values in group_metrics_values:
+		if metric not in cvss_values:
+			if required:
+				missing.append(metric)
+				errors.append(metric)
+				error_messages += "The metric \'" + metric + "\' is missing.\n"
+		elif cvss_values[metric] not in values:
+			errors.append(metric)
+			error_messages += "The metric \'" + metric + "\' has an invalid value \'" + cvss_values[metric] + "\' (valid values are " + str(list(values)) + ").\n"
+	return missing, errors, error_messages
+
+
+def validate_metrics_all(cvss_values):
+	"""Validates all groups of the vector. Returns the multiline string with error messages and whether the base, temporal and environmental groups are incomplete (have missing or invalid metrics)."""
+
+	base_missing, base_errors, base_messages = validate_metrics(cvss_values, base_metrics_values, True)
+	temp_missing, temp_errors, temp_messages = validate_metrics(cvss_values, temp_metrics_values, False)
+	env_missing, env_errors, env_messages = validate_metrics(cvss_values, env_metrics_values, False)
+	return base_messages + temp_messages + env_messages, len(base_errors) > 0, len(temp_errors) > 0, len(env_errors) > 0
+
+
+def roundup(value, version = default_version):
+	"""The Roundup function of the specification: the smallest number with one decimal place that is equal to or higher than the value. CVSS v3.1 first rounds the value to 5 decimal places, so that floating point errors do not round e.g. 4.000000000000001 up to 4.1."""
+
+	if version == "3.0":
+		return math.ceil(value * 10) / 10.0
+	int_input = int(round(value * 100000))
+	if int_input % 10000 == 0:
+		return int_input / 100000.0
+	return (math.floor(int_input / 10000) + 1) / 10.0
+
+
+def weight(cvss_values, metric, scope_changed = False):
+	"""Returns the weight of the metric's value (the value must be valid)."""
+
+	weights = metric_weights[metric]
+	if metric == "PR":
+		weights = weights[1 if scope_changed else 0]
+	return weights[metric_ordinals[metric][cvss_values.get(metric, "X")]]
+
+
+def impact_subscore(ImpactSubScore, scope_changed, version, modified = False):
+	"""The (modified) impact equation."""
+
+	if not scope_changed:
+		return 6.42 * ImpactSubScore
+	if modified and (version != "3.0"):
+		return 7.52 * (ImpactSubScore - 0.029) - 3.25 * (ImpactSubScore * 0.9731 - 0.02) ** 13
+	return 7.52 * (ImpactSubScore - 0.029) - 3.25 * (ImpactSubScore - 0.02) ** 15
+
+
+def base_equation(Impact, Exploitability, scope_changed, version):
+	"""The base score equation (also the modified base part of the environmental score equation)."""
+
+	if Impact <= 0:
+		return 0.0
+	if scope_changed:
+		return roundup(min(1.08 * (Impact + Exploitability), 10), version)
+	return roundup(min(Impact + Exploitability, 10), version)
+
+
+def compute_base(cvss_values, version = default_version, validate_input_bool = True):
+	"""Computes the base group of metrics from the metric:value dictionary. Returns BaseScore, Impact, Exploitability (the subscores are rounded to 1 decimal place)."""
+
+	if validate_input_bool:
+		missing, errors, error_messages = validate_metrics(cvss_values, base_metrics_values, True)
+		if len(errors) > 0:
+			return float("NaN"), float("NaN"), float("NaN")
+
+	scope_changed = cvss_values["S"] == "C"
+
+	# ISS = 1 - [ (1 - Confidentiality) x (1 - Integrity) x (1 - Availability) ]
+	ImpactSubScore = 1 - ((1 - weight(cvss_values, "C")) * (1 - weight(cvss_values, "I")) * (1 - weight(cvss_values, "A")))
+
+	# Impact = 6.42 x ISS (scope unchanged), 7.52 x (ISS - 0.029) - 3.25 x (ISS - 0.02)^15 (scope changed)
+	Impact = impact_subscore(ImpactSubScore, scope_changed, version)
+
+	# Exploitability = 8.22 x AttackVector x AttackComplexity x PrivilegesRequired x UserInteraction
+	Exploitability = 8.22 * weight(cvss_values, "AV") * weight(cvss_values, "AC") * weight(cvss_values, "PR", scope_changed) * weight(cvss_values, "UI")
+
+	BaseScore = base_equation(Impact, Exploitability, scope_changed, version)
+	return BaseScore, round(Impact, 1), round(Exploitability, 1)
+
+
+def compute_temp(cvss_values, version = default_version, BaseScore_in = None, validate_input_bool = True):
+	"""Computes the temporal score from the metric:value dictionary (from BaseScore_in if it is given)."""
+
+	if validate_input_bool:
+		missing, errors, error_messages = validate_metrics(cvss_values, temp_metrics_values, False)
+		if len(errors) > 0:
+			return float("NaN")
+
+	BaseScore = BaseScore_in
+	if BaseScore == None:
+		BaseScore = compute_base(cvss_values, version, validate_input_bool)[0]
+	if BaseScore != BaseScore:
+		return float("NaN")
+
+	# TemporalScore = Roundup(BaseScore x ExploitCodeMaturity x RemediationLevel x ReportConfidence)
+	return roundup(BaseScore * weight(cvss_values, "E") * weight(cvss_values, "RL") * weight(cvss_values, "RC"), version)
+
+
+def compute_env(cvss_values, version = default_version, validate_input_bool = True):
+	"""Computes the environmental score from the metric:value dictionary."""
+
+	if validate_input_bool:
+		error_messages, base_incomplete, temp_incomplete, env_incomplete = validate_metrics_all(cvss_values)
+		if base_incomplete or temp_incomplete or env_incomplete:
+			return float("NaN")
+
+	# EnvironmentalScore = Roundup(ModifiedBaseScore x ExploitCodeMaturity x RemediationLevel x ReportConfidence), the same equation as the temporal score
+	return compute_temp(cvss_values, version, compute_modified_base(cvss_values, version), False)
+
+
+def compute_modified_base(cvss_values, version = default_version):
+	"""Computes the modified base score (the inner Roundup of the environmental score equation) from the metric:value dictionary. The input is not validated."""
+
+	# the modified base metrics that are not defined take the values of the base metrics
+	modified_values = dict(cvss_values)
+	for modified_metric, metric in modified_metrics.items():
+		if cvss_values.get(modified_metric, "X") != "X":
+			modified_values[metric] = cvss_values[modified_metric]
+	scope_changed = modified_values["S"] == "C"
+
+	# MISS = Minimum ( 1 - [ (1 - ConfidentialityRequirement x ModifiedConfidentiality) x (1 - IntegrityRequirement x ModifiedIntegrity) x (1 - AvailabilityRequirement x ModifiedAvailability) ], 0.915)
+	ModifiedImpactSubScore = min(1 - ((1 - weight(cvss_values, "CR") * weight(modified_values, "C")) * (1 - weight(cvss_values, "IR") * weight(modified_values, "I")) * (1 - weight(cvss_values, "AR") * weight(modified_values, "A"))), 0.915)
+
+	# ModifiedImpact = 6.42 x MISS (scope unchanged), 7.52 x (MISS - 0.029) - 3.25 x (MISS x 0.9731 - 0.02)^13 (scope changed; CVSS v3.0: 7.52 x (MISS - 0.029) - 3.25 x (MISS - 0.02)^15)
+	ModifiedImpact = impact_subscore(ModifiedImpactSubScore, scope_changed, version, True)
+
+	# ModifiedExploitability = 8.22 x ModifiedAttackVector x ModifiedAttackComplexity x ModifiedPrivilegesRequired x ModifiedUserInteraction
+	ModifiedExploitability = 8.22 * weight(modified_values, "AV") * weight(modified_values, "AC") * weight(modified_values, "PR", scope_changed) * weight(modified_values, "UI")
+
+	# ModifiedBaseScore = Roundup(Minimum(ModifiedImpact + ModifiedExploitability, 10)) (scope changed: 1.08 x (ModifiedImpact + ModifiedExploitability)), 0 if ModifiedImpact <= 0
+	return base_equation(ModifiedImpact, ModifiedExploitability, scope_changed, version)
+
+
+# The lookup-table scoring engine (see the lookup-table engine of cvssv2.py).
+#
+# The tables hold the base scores of all 2592 base vectors, the modified base scores of all modified base vectors and requirements, and the temporal scores of every distinct (modified) base score. The temporal and environmental equations share the last step (Roundup(score x E x RL x RC)), so both are looked up in the temporal table. Each CVSS version has its own tables, built lazily on the first use.
+
+def group_index(cvss_values, group_metrics_values):
+	"""Returns the mixed-radix index of the group's metric values (see cvssv2.group_index). Returns None if a metric has an invalid value. Missing metrics count as X (ordinal 0)."""
+
+	return cvssv2.group_index(cvss_values, group_metrics_values, metric_ordinals, "X")
+
+
+base_index_count = 2592 # 4 x 2 x 3 x 2 x 2 x 3 x 3 x 3
+temp_index_count = 100 # 5 x 5 x 4
+requirements_index_count = 27 # 3 x 3 x 3 (X has the same weight as M)
+
+
+class ScoringTables(cvssv2.ScoreIds):
+	"""Precomputed scores of the whole CVSSv3 vector space of one version, stored as score ids (see cvssv2.ScoreIds)."""
+
+	def __init__(self, version):
+		cvssv2.ScoreIds.__init__(self)
+		self.version = version
+
+		# base scores, modified base score ids (of the modified base vector with all metrics defined) indexed by (base index, requirements index)
+		self.base_scores = list() # list of (BaseScore, Impact, Exploitability)
+		self.base_score_ids = list()
+		self.modified_base_ids = list()
+		base_metrics = [metric for metric, values in base_metrics_values]
+		requirements = [dict(zip(("CR", "IR", "AR"), requirements_values)) for requirements_values in self.product(("CR", "IR", "AR"))]
+		for cvss_values in [dict(zip(base_metrics, base_values)) for base_values in self.product(base_metrics)]:
+			BaseScore, Impact, Exploitability = compute_base(cvss_values, version, False)
+			self.base_scores.append((BaseScore, Impact, Exploitability))
+			self.base_score_ids.append(self.score_id(BaseScore))
+			# the base metrics are taken as the modified base metrics
+			for requirements_values in requirements:
+				cvss_values.update(requirements_values)
+				self.modified_base_ids.append(self.score_id(compute_modified_base(cvss_values, version)))
+
+		# temporal scores indexed by (score id, E, RL, RC); covers both the base and the modified base scores
+		self.temp_scores = list()
+		for BaseScore in self.score_values:
+			for E in range(5):
+				for RL in range(5):
+					for RC in range(4):
+						self.temp_scores.append(roundup(BaseScore * metric_weights["E"][E] * metric_weights["RL"][RL] * metric_weights["RC"][RC], version))
+
+
+	def product(self, metrics):
+		"""Returns the list of all combinations of the defined values (without X) of the metrics in the order of the group index."""
+
+		return list(itertools.product(*[[value for value in dict(base_metrics_values + temp_metrics_values + env_metrics_values)[metric] if value != "X"] for metric in metrics]))
+
+
+scoring_tables = {} # dict of string:ScoringTables (version:the lazily built tables)
+
+
+def get_scoring_tables(version = default_version):
+	"""Returns the ScoringTables of the version, builds them on the first call."""
+
+	if version not in scoring_tables:
+		scoring_tables[version] = ScoringTables(version)
+	return scoring_tables[version]
+
+
+# the base index of the modified base vector, computed from the base vector's ordinals and the modified metrics; list of (metric, modified metric, number of the base metric's values)
+modified_index_metrics = [(metric, "M" + metric, len(values)) for metric, values in base_metrics_values]
+requirements_metrics_values = env_metrics_values[:3]
+
+
+def fast_compute_all(cvss_values, version = default_version):
+	"""Computes all scores from the metric:value dictionary using the lookup tables. Returns BaseScore, Impact, Exploitability, TemporalScore, EnvironmentalScore; the values are the same as the ones returned by compute_base, compute_temp and compute_env (NaN for the groups that cannot be computed)."""
+
+	nan = float("NaN")
+	tables = get_scoring_tables(version)
+	base_index = 0
+	modified_index = 0
+	for metric, modified_metric, num_of_values in modified_index_metrics:
+		ordinal = metric_ordinals[metric].get(cvss_values.get(metric))
+		if ordinal == None:
+			return nan, nan, nan, nan, nan
+		base_index = base_index * num_of_values + ordinal
+		modified_ordinal = metric_ordinals[modified_metric].get(cvss_values.get(modified_metric, "X"))
+		if modified_ordinal == None:
+			modified_index = None
+		elif modified_index != None:
+			# the X value of a modified metric has the ordinal 0, the other values are shifted by one
+			modified_index = modified_index * num_of_values + (ordinal if modified_ordinal == 0 else modified_ordinal - 1)
+	BaseScore, Impact, Exploitability = tables.base_scores[base_index]
+
+	temp_index = group_index(cvss_values, temp_metrics_values)
+	if temp_index == None:
+		return BaseScore, Impact, Exploitability, nan, nan
+	TemporalScore = tables.temp_scores[tables.base_score_ids[base_index] * temp_index_count + temp_index]
+
+	requirements_index = 0
+	for metric, values in requirements_metrics_values:
+		ordinal = metric_ordinals[metric].get(cvss_values.get(metric, "X"))
+		if (ordinal == None) or (modified_index == None):
+			return BaseScore, Impact, Exploitability, TemporalScore, nan
+		# X has the same weight as M
+		requirements_index = requirements_index * 3 + (ordinal - 1 if ordinal > 0 else 1)
+	modified_base_id = tables.modified_base_ids[modified_index * requirements_index_count + requirements_index]
+	return BaseScore, Impact, Exploitability, TemporalScore, tables.temp_scores[modified_base_id * temp_index_count + temp_index]
+
+
+def score_vector(cvss_vect_string):
+	"""Computes all scores of the CVSSv3 vector string using the lookup tables (see fast_compute_all). All scores are NaN if the version prefix is missing or unknown."""
+
+	version, cvss_values, error_messages = parse_cvssv3_vector(cvss_vect_string)
+	if version == None:
+		nan = float("NaN")
+		return nan, nan, nan, nan, nan
+	return fast_compute_all(cvss_values, version)
+
+
+def print_scores(cvss_vect_string, bare_output = False):
+	"""Prints the scores of the CVSSv3 vector string in the format of the cvssv2.py command line program (including the error messages unless bare_output is True)."""
+
+	version, cvss_values, error_messages = parse_cvssv3_vector(cvss_vect_string)
+	validation_messages, base_incomplete, temp_incomplete, env_incomplete = validate_metrics_all(cvss_values)
+	if version == None:
+		base_incomplete, temp_incomplete, env_incomplete = True, True, True
+		BaseScore, Impact, Exploitability, TemporalScore, EnvironmentalScore = [float("NaN")] * 5
+	else:
+		BaseScore, Impact, Exploitability = compute_base(cvss_values, version)
+		TemporalScore = compute_temp(cvss_values, version)
+		EnvironmentalScore = compute_env(cvss_values, version)
+
+	if bare_output:
+		print(BaseScore)
+		print(TemporalScore)
+		print(EnvironmentalScore)
+		return
+	if len(error_messages + validation_messages) > 0:
+		print(error_messages + validation_messages)
+	if not base_incomplete:
+		print("CVSS v{} Base Score:          {:>4}".format(version, BaseScore))
+		print(" Impact Subscore:              {:>4}".format(Impact))
+		print(" Exploitability Subscore:      {:>4}".format(Exploitability))
+	if not (base_incomplete or temp_incomplete):
+		print("CVSS v{} Temporal Score:      {:>4}".format(version, TemporalScore))
+	if not (base_incomplete or temp_incomplete or env_incomplete):
+		print("CVSS v{} Environmental Score: {:>4}".format(version, EnvironmentalScore))
+
+
+
+def main():
+	"""A command line program that calculates CVSS v3 score from a provided vector."""
+
+	import argparse
+	parser = argparse.ArgumentParser()
+	parser.add_argument('-v', '--vector', required=True, help="CVSS v3.0 or v3.1 vector provided as a single string (starting with CVSS:3.0/ or CVSS:3.1/). See https://www.first.org/cvss/v3.1/specification-document for the vector format.")
+	parser.add_argument('-b', '--bare-output', help="Prints only the resulting scores (number) or \"nan\" to the output.", action='store_true')
+	args = parser.parse_args()
+	print_scores(args.vector, args.bare_output)
+
+
+
+if __name__ == '__main__':
+    main()
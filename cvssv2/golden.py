@@ -0,0 +1,348 @@
+#!/usr/bin/env python
+
+#   Golden table of all CVSS v2 scores.
+#   Copyright (C) 2026  Jakub Svoboda
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+# The golden file holds the scores of every valid combination of the base, temporal and environmental metrics (729 x 100 x 1920 vectors) as computed by compute_base, compute_temp and compute_env. Any other scoring backend can be verified against it. The golden file of all the blocks is cached in the temporary directory (see cached_golden_file).
+#
+# The file starts with a header (golden_header_format: the magic string, the format version, the number of blocks, the number of the temporal and environmental combinations) followed by one block per base vector in the order of the base index:
+# - 3 bytes: the base score, the impact and the exploitability subscores
+# - 100 bytes: the temporal scores in the order of the temporal index
+# - 4 bytes: the length of the compressed environmental scores (unsigned, little endian)
+# - the zlib-compressed environmental scores, 100 x 1920 bytes in the order of (the temporal index, the environmental index)
+#
+# A score is stored as one byte: the score in tenths plus score_code_offset (the adjusted scores of compute_env can be slightly negative, e.g. -0.2), score_code_negative_zero for -0.0 (compute_base returns it e.g. for C:N/I:N/A:N) or score_code_nan for NaN. The conversion is exact because round(x, 1) returns the same float as k / 10.0.
+
+
+from __future__ import print_function
+import hashlib
+import itertools
+import os
+import struct
+import sys
+import zlib
+import cvssv2
+
+
+golden_magic = b"CVSS2GLD"
+golden_version = 1
+golden_header_format = "<8sHHHH"
+score_code_offset = 100 # the scores from -10.0 to 10.0 are stored as 0-200
+score_code_negative_zero = 254
+score_code_nan = 255
+block_size = cvssv2.temp_index_count * cvssv2.env_index_count
+
+
+def encode_score(score):
+	"""Converts the score into its one byte code."""
+
+	if score != score:
+		return score_code_nan
+	tenths = int(round(score * 10))
+	if (abs(tenths) > score_code_offset) or (tenths / 10.0 != score):
+		raise ValueError("The score " + repr(score) + " cannot be stored in the golden file.")
+	if (tenths == 0) and (repr(score).startswith("-")):
+		return score_code_negative_zero
+	return tenths + score_code_offset
+
+
+def decode_score(code):
+	"""Converts the one byte code into the score."""
+
+	if code == score_code_nan:
+		return float("NaN")
+	if code == score_code_negative_zero:
+		return -0.0
+	return (code - score_code_offset) / 10.0
+
+
+def encode_scores(scores):
+	"""Converts a sequence of scores into a byte string of their codes. NumPy arrays are converted column-wise."""
+
+	if type(scores).__module__ == "numpy":
+		import numpy
+		nan = numpy.isnan(scores)
+		tenths = numpy.rint(numpy.where(nan, 0.0, scores) * 10)
+		if numpy.any((~nan) & ((tenths / 10.0 != scores) | (numpy.abs(tenths) > score_code_offset))):
+			raise ValueError("Some scores cannot be stored in the golden file.")
+		codes = tenths + score_code_offset
+		codes[(tenths == 0) & numpy.signbit(scores)] = score_code_negative_zero
+		codes[nan] = score_code_nan
+		return codes.astype(numpy.uint8).tobytes()
+	return bytes(bytearray(encode_score(score) for score in scores))
+
+
+decoded_scores_array = None # the NumPy array of the scores of all codes (see decode_score)
+
+
+def scores_match(scores, expected_codes):
+	"""Tells whether the codes of the scores (see encode_scores) are the expected codes. A NumPy array is first compared bit by bit with the decoded expected scores, which is faster than encoding it; only when that differs (e.g. a NaN with other bits) it is encoded."""
+
+	global decoded_scores_array
+	if type(scores).__module__ == "numpy":
+		import numpy
+		if decoded_scores_array is None:
+			decoded_scores_array = numpy.array([decode_score(code) for code in range(256)], numpy.float64)
+		expected = decoded_scores_array[numpy.frombuffer(expected_codes, numpy.uint8)]
+		if numpy.array_equal(numpy.asarray(scores, numpy.float64).view(numpy.int64), expected.view(numpy.int64)):
+			return True
+	return encode_scores(scores) == expected_codes
+
+
+def group_packed_bits(group_metrics_values):
+	"""Returns the list of the packed bits (relative to the group's first field) of all valid combinations of the group's metrics in the order of the group index."""
+
+	packed_bits = list()
+	for ordinals in itertools.product(*[range(len(values)) for metric, values in group_metrics_values]):
+		packed = 0
+		for position, ordinal in enumerate(ordinals):
+			packed |= (ordinal + 1) << (position * cvssv2.packed_bits_per_metric)
+		packed_bits.append(packed)
+	return packed_bits
+
+
+base_packed_bits = group_packed_bits(cvssv2.base_metrics_values)
+temp_packed_bits = [packed << cvssv2.packed_temp_shift for packed in group_packed_bits(cvssv2.temp_metrics_values)]
+env_packed_bits = [packed << cvssv2.packed_env_shift for packed in group_packed_bits(cvssv2.env_metrics_values)]
+
+
+block_packed_array = None # the NumPy array of the temporal and environmental packed bits of a block
+
+
+def block_packed_vectors(base_index):
+	"""Returns the packed vectors of one block (all temporal and environmental combinations of the base vector) in the order of the golden file. Returns a NumPy array if NumPy is available, a list otherwise."""
+
+	global block_packed_array
+	base_packed = base_packed_bits[base_index]
+	if block_packed_array is None:
+		try:
+			import numpy
+		except ImportError:
+			return [base_packed | temp_packed | env_packed for temp_packed in temp_packed_bits for env_packed in env_packed_bits]
+		block_packed_array = (numpy.array(temp_packed_bits, numpy.int64)[:, None] | numpy.array(env_packed_bits, numpy.int64)[None, :]).ravel()
+	return block_packed_array | base_packed
+
+
+def scalar_block(base_index):
+	"""Computes one block of the golden file with compute_base, compute_temp and compute_env. Returns the block as a byte string.
+
+	The environmental score depends on the base and temporal metrics and the requirements (CR, IR, AR) only through the adjusted temporal score, so compute_env is not called for all 192000 vectors of the block. With CDP:N/TD:ND (the weights 0 and 1) compute_env returns the adjusted temporal score itself, and with E:ND/RL:ND/RC:ND also the adjusted base score. The block is scored in these steps: one adjusted base score per requirements combination, one adjusted temporal score per distinct adjusted base score and temporal combination, and the scores of the 30 CDP/TD combinations per distinct adjusted temporal score."""
+
+	cvss_values = cvssv2.unpack_cvssv2_values(base_packed_bits[base_index])
+	# the vectors are complete and valid, the validation (and the score cache) is skipped
+	base_scores = encode_scores(cvssv2.compute_base(cvss_values, False))
+	temp_values = [cvssv2.unpack_cvssv2_values(temp_packed) for temp_packed in temp_packed_bits]
+	# the requirements vary the fastest in the environmental index, the CDP/TD combinations are the 30 blocks of 64 requirements
+	requirements_values = [cvssv2.unpack_cvssv2_values(env_packed) for env_packed in env_packed_bits[:cvssv2.requirements_index_count]]
+	env_modifiers_values = [cvssv2.unpack_cvssv2_values(env_packed_bits[env_modifiers_index * cvssv2.requirements_index_count]) for env_modifiers_index in range(cvssv2.env_modifiers_index_count)]
+	for values in requirements_values:
+		del values["CDP"], values["TD"]
+	for values in env_modifiers_values:
+		del values["CR"], values["IR"], values["AR"]
+
+	adjusted_base_values = dict(cvss_values, E="ND", RL="ND", RC="ND", CDP="N", TD="ND")
+	adjusted_base_scores = list()
+	for values in requirements_values:
+		adjusted_base_values.update(values)
+		adjusted_base_scores.append(repr(cvssv2.compute_env(adjusted_base_values, False)))
+
+	temp_scores = list()
+	env_scores = list()
+	adjusted_temp_scores = {} # dict of tuple:string (repr of the adjusted base score, temporal index:repr of the adjusted temporal score)
+	env_modifiers_codes = {} # dict of string:bytes (repr of the adjusted temporal score:the codes of its environmental scores in the order of CDP, TD)
+	for temp_index, values in enumerate(temp_values):
+		cvss_values.update(values)
+		temp_scores.append(cvssv2.compute_temp(cvss_values, None, False))
+		codes_columns = list()
+		for requirements_index, adjusted_base_score in enumerate(adjusted_base_scores):
+			key = (adjusted_base_score, temp_index)
+			adjusted_temp_score = adjusted_temp_scores.get(key)
+			if adjusted_temp_score == None:
+				cvss_values.update(requirements_values[requirements_index])
+				cvss_values.update(CDP="N", TD="ND")
+				adjusted_temp_score = repr(cvssv2.compute_env(cvss_values, False))
+				adjusted_temp_scores[key] = adjusted_temp_score
+			codes = env_modifiers_codes.get(adjusted_temp_score)
+			if codes == None:
+				cvss_values.update(requirements_values[requirements_index])
+				scores = list()
+				for values in env_modifiers_values:
+					cvss_values.update(values)
+					scores.append(cvssv2.compute_env(cvss_values, False))
+				codes = encode_scores(scores)
+				env_modifiers_codes[adjusted_temp_score] = codes
+			codes_columns.append(bytearray(codes))
+		for codes_row in zip(*codes_columns):
+			env_scores.append(bytes(bytearray(codes_row)))
+	compressed_env_scores = zlib.compress(b"".join(env_scores), 9)
+	return base_scores + encode_scores(temp_scores) + struct.pack("<I", len(compressed_env_scores)) + compressed_env_scores
+
+
+def generate_golden_file(file_name, num_of_blocks = cvssv2.base_index_count, jobs = 1):
+	"""Writes the golden file with the first num_of_blocks base vectors (all of them by default) computed by the scalar functions in jobs processes."""
+
+	with open(file_name, "wb") as f:
+		f.write(struct.pack(golden_header_format, golden_magic, golden_version, num_of_blocks, cvssv2.temp_index_count, cvssv2.env_index_count))
+		if jobs > 1:
+			import multiprocessing
+			pool = multiprocessing.Pool(jobs)
+			try:
+				for block in pool.imap(scalar_block, range(num_of_blocks)):
+					f.write(block)
+				pool.close()
+			except:
+				pool.terminate()
+				raise
+			finally:
+				pool.join()
+		else:
+			for base_index in range(num_of_blocks):
+				f.write(scalar_block(base_index))
+
+
+def cached_golden_file(cache_directory = None):
+	"""Returns the name of the golden file of all the blocks in the cache directory (the temporary directory by default), generates it if it is not there. The name includes the Python major version (round() of Python 2 rounds the halves away from zero, so some scores differ from Python 3) and a digest of cvssv2.py and golden.py, so a changed reference computation gets a new file."""
+
+	import tempfile
+	if cache_directory == None:
+		cache_directory = tempfile.gettempdir()
+	digest = hashlib.md5()
+	for module in (cvssv2, sys.modules[__name__]):
+		with open(os.path.splitext(module.__file__)[0] + ".py", "rb") as f:
+			digest.update(f.read())
+	file_name = os.path.join(cache_directory, "cvssv2-golden-{}-py{}-{}.bin".format(golden_version, sys.version_info[0], digest.hexdigest()[:16]))
+	if not os.path.exists(file_name):
+		# generated under another name and renamed, so a concurrent or interrupted generation is never read
+		temp_file = tempfile.NamedTemporaryFile(dir=cache_directory, delete=False)
+		temp_file.close()
+		try:
+			generate_golden_file(temp_file.name)
+			os.rename(temp_file.name, file_name)
+		except:
+			os.remove(temp_file.name)
+			raise
+	return file_name
+
+
+def read_golden_blocks(file_name):
+	"""Yields the blocks of the golden file as (base index, base scores, temporal scores, environmental scores) tuples of byte strings. Reads one block at a time."""
+
+	with open(file_name, "rb") as f:
+		header = f.read(struct.calcsize(golden_header_format))
+		magic, version, num_of_blocks, temp_count, env_count = struct.unpack(golden_header_format, header)
+		if (magic != golden_magic) or (version != golden_version) or (temp_count != cvssv2.temp_index_count) or (env_count != cvssv2.env_index_count):
+			raise ValueError("The file \'" + file_name + "\' is not a golden file of this version.")
+		for base_index in range(num_of_blocks):
+			base_scores = f.read(3)
+			temp_scores = f.read(cvssv2.temp_index_count)
+			compressed_length, = struct.unpack("<I", f.read(4))
+			env_scores = zlib.decompress(f.read(compressed_length))
+			if len(env_scores) != block_size:
+				raise ValueError("The golden file \'" + file_name + "\' is damaged.")
+			yield base_index, base_scores, temp_scores, env_scores
+
+
+# The scoring backends take a list or a NumPy array of packed vectors and return the sequences BaseScore, Impact, Exploitability, TemporalScore, EnvironmentalScore.
+
+def packed_vector_list(packed_vectors):
+	"""Converts a NumPy array of packed vectors into a list of Python integers."""
+
+	if hasattr(packed_vectors, "tolist"):
+		return packed_vectors.tolist()
+	return packed_vectors
+
+
+def scalar_backend(packed_vectors):
+	"""Scores the vectors with compute_base, compute_temp and compute_env. The vectors of the golden file are complete and valid, so they are not validated; this also keeps the score cache (which would return the scores of the lookup tables) out of the reference computation."""
+
+	scores = list()
+	for packed in packed_vector_list(packed_vectors):
+		cvss_values = cvssv2.unpack_cvssv2_values(packed)
+		BaseScore, Impact, Exploitability = cvssv2.compute_base(cvss_values, False)
+		scores.append((BaseScore, Impact, Exploitability, cvssv2.compute_temp(cvss_values, None, False), cvssv2.compute_env(cvss_values, False)))
+	return zip(*scores)
+
+
+def fast_backend(packed_vectors):
+	"""Scores the vectors with fast_compute_all."""
+
+	return zip(*[cvssv2.fast_compute_all(packed) for packed in packed_vector_list(packed_vectors)])
+
+
+def numpy_backend(packed_vectors):
+	"""Scores the vectors with score_many."""
+
+	import numpy
+	return cvssv2.score_many(numpy.asarray(packed_vectors, numpy.int64))
+
+
+backends = {"scalar": scalar_backend, "fast": fast_backend, "numpy": numpy_backend}
+score_names = ("BaseScore", "Impact", "Exploitability", "TemporalScore", "EnvironmentalScore")
+
+
+def verify_golden_file(file_name, backend, max_mismatches = 20):
+	"""Streams the golden file and compares it with the scores of the backend (a function, see backends), one block at a time. Returns the total number of mismatching scores and a list of at most max_mismatches mismatches as (vector string, score name, expected score, backend's score) tuples."""
+
+	mismatch_count = 0
+	mismatches = list()
+	for base_index, base_scores, temp_scores, env_scores in read_golden_blocks(file_name):
+		packed_vectors = block_packed_vectors(base_index)
+		score_sequences = backend(packed_vectors)
+		expected = (base_scores[0:1] * block_size, base_scores[1:2] * block_size, base_scores[2:3] * block_size, b"".join(temp_scores[i:i + 1] * cvssv2.env_index_count for i in range(len(temp_scores))), env_scores)
+		for score_name, expected_codes, scores in zip(score_names, expected, score_sequences):
+			if scores_match(scores, expected_codes):
+				continue
+			codes = bytearray(encode_scores(scores))
+			expected_codes = bytearray(expected_codes)
+			for position in range(block_size):
+				if codes[position] != expected_codes[position]:
+					mismatch_count += 1
+					if len(mismatches) < max_mismatches:
+						mismatches.append((cvssv2.decode_cvssv2_vector(int(packed_vectors[position])), score_name, decode_score(expected_codes[position]), decode_score(codes[position])))
+	return mismatch_count, mismatches
+
+
+def main():
+	"""Generates the golden file or verifies a scoring backend against it."""
+
+	import argparse
+	parser = argparse.ArgumentParser()
+	subparsers = parser.add_subparsers(dest='command')
+	generate_parser = subparsers.add_parser('generate', help="Computes the golden file with compute_base, compute_temp and compute_env.")
+	generate_parser.add_argument('file', help="The golden file.")
+	generate_parser.add_argument('-j', '--jobs', type=int, default=1, help="The number of processes.")
+	generate_parser.add_argument('--limit', type=int, default=cvssv2.base_index_count, help="Covers only the first LIMIT base vectors (of 729).")
+	verify_parser = subparsers.add_parser('verify', help="Compares the scores of a scoring backend with the golden file.")
+	verify_parser.add_argument('file', help="The golden file.")
+	verify_parser.add_argument('-b', '--backend', choices=sorted(backends.keys()), default="numpy", help="The scoring backend: score_many (numpy, default, needs NumPy), fast_compute_all (fast) or compute_base/compute_temp/compute_env (scalar).")
+	verify_parser.add_argument('--max-report', type=int, default=20, help="The maximum number of the reported mismatches.")
+	args = parser.parse_args()
+
+	if args.command == "generate":
+		generate_golden_file(args.file, min(args.limit, cvssv2.base_index_count), args.jobs)
+	else:
+		mismatch_count, mismatches = verify_golden_file(args.file, backends[args.backend], args.max_report)
+		for cvss_vector, score_name, expected_score, score in mismatches:
+			print("{} {}: expected {}, got {}".format(cvss_vector, score_name, expected_score, score))
+		print("{} mismatches".format(mismatch_count))
+		if mismatch_count > 0:
+			sys.exit(1)
+
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,250 @@
+#!/usr/bin/env python
+
+#   Columnar on-disk store of scored CVSS v2 vectors.
+#   Copyright (C) 2026  Jakub Svoboda
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+# A score store holds scored vectors in fixed-width columns, so it can be memory-mapped and read without parsing (several processes reading the same file share it through the page cache).
+#
+# The file starts with a header (store_header_format: the magic string, the format version, the number of the score columns, a reserved field and the number of rows) padded to store_header_size bytes, followed by the columns:
+# - the packed vectors (see cvssv2.pack_cvssv2_values), 8 bytes per row (unsigned, little endian)
+# - one column per score (store_columns), 1 byte per row; the scores are stored as the one byte codes of the golden file (see golden.encode_score)
+
+
+from __future__ import print_function
+import collections
+import mmap
+import struct
+import sys
+import cvssv2
+import cvssv3
+import golden
+
+
+store_magic = b"CVSS2STO"
+store_version = 1
+store_header_format = "<8sHHIQ"
+store_header_size = 64 # the header is padded so that the packed vectors are aligned
+store_columns = ("base", "impact", "exploitability", "temporal", "environmental") # the score columns in the file order (the same as cvssv2.batch_fields)
+store_chunk_size = 65536 # the number of rows scored at once when writing
+
+
+def score_codes(packed_vectors):
+	"""Scores the packed vectors (with score_many if NumPy is available, with fast_compute_all otherwise). Returns the list of the byte strings of the score codes, one per score column."""
+
+	try:
+		import numpy
+	except ImportError:
+		return [golden.encode_scores(scores) for scores in zip(*[cvssv2.fast_compute_all(packed) for packed in packed_vectors])]
+	return [golden.encode_scores(scores) for scores in cvssv2.score_many(numpy.asarray(packed_vectors, numpy.int64))]
+
+
+def write_store(file_name, vectors, chunk_size = store_chunk_size):
+	"""Scores the vectors (an iterable of vector strings or packed vectors) and writes them into the store file. The vectors are streamed: the packed vectors are written first, then the score columns are computed from the written packed vectors chunk by chunk. Returns the number of rows. The store holds CVSSv2 vectors only: a CVSSv3 vector (starting with cvssv3.vector_prefix) raises ValueError and leaves the file without a valid header."""
+
+	with open(file_name, "w+b") as f:
+		f.write(b"\0" * store_header_size)
+		num_of_rows = 0
+		chunk = list()
+		for cvss_vector in vectors:
+			if not isinstance(cvss_vector, cvssv2.integer_types):
+				if cvss_vector.startswith(cvssv3.vector_prefix):
+					raise ValueError("The vector \'" + cvss_vector + "\' is a CVSSv3 vector; the score store holds CVSSv2 vectors only.")
+				cvss_vector = cvssv2.encode_cvssv2_vector(cvss_vector)
+			chunk.append(cvss_vector)
+			if len(chunk) >= chunk_size:
+				f.write(struct.pack("<{}Q".format(len(chunk)), *chunk))
+				num_of_rows += len(chunk)
+				chunk = list()
+		f.write(struct.pack("<{}Q".format(len(chunk)), *chunk))
+		num_of_rows += len(chunk)
+
+		# now the column offsets are known
+		for start in range(0, num_of_rows, chunk_size):
+			count = min(chunk_size, num_of_rows - start)
+			f.seek(store_header_size + start * 8)
+			packed_vectors = struct.unpack("<{}Q".format(count), f.read(count * 8))
+			for column, codes in enumerate(score_codes(packed_vectors)):
+				f.seek(store_header_size + num_of_rows * (8 + column) + start)
+				f.write(codes)
+
+		f.seek(0)
+		f.write(struct.pack(store_header_format, store_magic, store_version, len(store_columns), 0, num_of_rows))
+	return num_of_rows
+
+
+class ScoreStore(object):
+	"""Read access to a store file (see write_store) through a read-only memory map.
+
+	The rows are read directly from the map without loading the file. With NumPy, packed_vectors and codes return arrays that share the memory of the map (no copies), and the aggregates are computed from the counts of the score codes."""
+
+	def __init__(self, file_name):
+		self.file = open(file_name, "rb")
+		try:
+			self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+		except:
+			self.file.close()
+			raise
+		if len(self.map) >= store_header_size:
+			magic, version, num_of_columns, reserved, self.num_of_rows = struct.unpack_from(store_header_format, self.map)
+		if (len(self.map) < store_header_size) or (magic != store_magic) or (version != store_version) or (num_of_columns != len(store_columns)) or (len(self.map) != store_header_size + self.num_of_rows * (8 + num_of_columns)):
+			self.close()
+			raise ValueError("The file \'" + file_name + "\' is not a score store of this version.")
+
+
+	def close(self):
+		"""Closes the memory map and the file. The arrays returned by packed_vectors and codes must not be used anymore."""
+
+		self.map.close()
+		self.file.close()
+
+
+	def __enter__(self):
+		return self
+
+
+	def __exit__(self, exc_type, exc_value, traceback):
+		self.close()
+
+
+	def __len__(self):
+		return self.num_of_rows
+
+
+	def column_offset(self, column):
+		"""Returns the file offset of the score column (one of store_columns)."""
+
+		return store_header_size + self.num_of_rows * (8 + store_columns.index(column))
+
+
+	def packed_vector(self, row):
+		"""Returns the packed vector of the row."""
+
+		if not (0 <= row < self.num_of_rows):
+			raise IndexError("The row " + str(row) + " is out of range.")
+		return struct.unpack_from("<Q", self.map, store_header_size + row * 8)[0]
+
+
+	def row(self, row):
+		"""Returns the vector string (the canonical form, see cvssv2.canonical_cvssv2_vector) and the scores (base, impact, exploitability, temporal, environmental) of the row."""
+
+		packed = self.packed_vector(row)
+		return cvssv2.decode_cvssv2_vector(packed), tuple(golden.decode_score(struct.unpack_from("<B", self.map, self.column_offset(column) + row)[0]) for column in store_columns)
+
+
+	def packed_vectors(self):
+		"""Returns the NumPy array (uint64) of the packed vectors of all rows. The array is a view of the memory map."""
+
+		import numpy
+		return numpy.frombuffer(self.map, numpy.uint64, self.num_of_rows, store_header_size)
+
+
+	def codes(self, column):
+		"""Returns the NumPy array (uint8) of the score codes of the column (see golden.encode_score). The array is a view of the memory map."""
+
+		import numpy
+		return numpy.frombuffer(self.map, numpy.uint8, self.num_of_rows, self.column_offset(column))
+
+
+	def scores(self, column):
+		"""Returns the NumPy array (float64) of the scores of the column. Unlike codes, this creates a new array."""
+
+		import numpy
+		return numpy.array([golden.decode_score(code) for code in range(256)])[self.codes(column)]
+
+
+	def code_counts(self, column):
+		"""Returns the list of the numbers of rows with each of the 256 score codes in the column."""
+
+		try:
+			import numpy
+		except ImportError:
+			counts = [0] * 256
+			offset = self.column_offset(column)
+			for start in range(0, self.num_of_rows, store_chunk_size):
+				for code in bytearray(self.map[offset + start:offset + min(start + store_chunk_size, self.num_of_rows)]):
+					counts[code] += 1
+			return counts
+		return numpy.bincount(self.codes(column), minlength=256).tolist()
+
+
+	def histogram(self, column):
+		"""Returns the number of rows for each score of the column as an ordered dictionary of float:integer (score:count) in the ascending order of the scores. -0.0 is counted as 0.0; the rows without the score (NaN) are not counted."""
+
+		counts = self.code_counts(column)
+		counts[golden.score_code_offset] += counts[golden.score_code_negative_zero]
+		return collections.OrderedDict((golden.decode_score(code), counts[code]) for code in range(golden.score_code_offset * 2 + 1) if counts[code] > 0)
+
+
+	def count_range(self, column, low, high):
+		"""Returns the number of rows with the score of the column from low to high (inclusive)."""
+
+		return sum(count for score, count in self.histogram(column).items() if low <= score <= high)
+
+
+	def mean(self, column):
+		"""Returns the mean score of the column over the rows that have the score (NaN if there are none)."""
+
+		histogram = self.histogram(column)
+		num_of_scores = sum(histogram.values())
+		if num_of_scores == 0:
+			return float("NaN")
+		return sum(score * count for score, count in histogram.items()) / num_of_scores
+
+
+
+def main():
+	"""Writes a score store from a file of vectors or prints the aggregates of a score store."""
+
+	import argparse
+	parser = argparse.ArgumentParser()
+	subparsers = parser.add_subparsers(dest='command')
+	write_parser = subparsers.add_parser('write', help="Scores the vectors of a text file (one vector per line, empty lines are skipped) and writes them into a score store.")
+	write_parser.add_argument('input', help="The file with the vectors (\"-\" for the standard input).")
+	write_parser.add_argument('store', help="The score store file.")
+	show_parser = subparsers.add_parser('show', help="Prints the rows of a score store in the tab-separated batch format.")
+	show_parser.add_argument('store', help="The score store file.")
+	stats_parser = subparsers.add_parser('stats', help="Prints the number of rows, the mean and the histogram of a score column.")
+	stats_parser.add_argument('store', help="The score store file.")
+	stats_parser.add_argument('-c', '--column', choices=store_columns, default="base", help="The score column (default base).")
+	args = parser.parse_args()
+
+	if args.command == "write":
+		try:
+			if args.input == "-":
+				print(write_store(args.store, cvssv2.read_vectors(sys.stdin)), "rows")
+			else:
+				with open(args.input, "r") as in_file:
+					print(write_store(args.store, cvssv2.read_vectors(in_file)), "rows")
+		except ValueError as e:
+			sys.exit(str(e))
+	elif args.command == "show":
+		format_row = cvssv2.batch_row_formatter("tsv")
+		with ScoreStore(args.store) as store:
+			for row in range(len(store)):
+				cvss_vector, scores = store.row(row)
+				sys.stdout.write(format_row(cvss_vector, scores))
+	else:
+		with ScoreStore(args.store) as store:
+			print("rows: {}".format(len(store)))
+			print("mean {}: {}".format(args.column, store.mean(args.column)))
+			for score, count in store.histogram(args.column).items():
+				print("{:>5} {}".format(score, count))
+
+
+
+if __name__ == '__main__':
+    main()
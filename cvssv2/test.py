@@ -17,9 +17,24 @@
 #   along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 
+from __future__ import print_function
 import unittest
 import os
+import json
+import math
+import random
+try:
+	from StringIO import StringIO
+except ImportError:
+	# Python 3
+	from io import StringIO
+import tempfile
 import cvssv2
+
+try:
+	import numpy
+except ImportError:
+	numpy = None
  
 class Cvssv2Unittest(unittest.TestCase):
 
@@ -99,6 +114,506 @@ class Cvssv2Unittest(unittest.TestCase):
 		self.assertEqual(EnvironmentalScore, 1.3)
 
 
+	def test07(self):
+		"""The lookup-table engine returns the same values as the compute_* functions."""
+		rnd = random.Random(7)
+		all_metrics_values = cvssv2.base_metrics_values + cvssv2.temp_metrics_values + cvssv2.env_metrics_values
+		for i in range(3000):
+			cvss_vector_values = dict((metric, rnd.choice(values)) for metric, values in all_metrics_values)
+			self.assertEqual(repr(cvssv2.fast_compute_base(cvss_vector_values)), repr(cvssv2.compute_base(cvss_vector_values)))
+			self.assertEqual(repr(cvssv2.fast_compute_temp(cvss_vector_values)), repr(cvssv2.compute_temp(cvss_vector_values)))
+			self.assertEqual(repr(cvssv2.fast_compute_env(cvss_vector_values)), repr(cvssv2.compute_env(cvss_vector_values)))
+
+	def test08(self):
+		"""The lookup-table engine returns NaN for the groups that cannot be computed."""
+		cvss_vector = "AV:A/AC:M/Au:S/C:P/I:P/A:N/E:U/RL:OF/RC:C/CR:L/TD:L/IR:M/CDP:L/AR:MX/AR:Mx"
+		cvss_vector_values, error_messages = cvssv2.parse_cvssv2_vector(cvss_vector)
+		BaseScore, Impact, Exploitability, TemporalScore, EnvironmentalScore = cvssv2.fast_compute_all(cvss_vector_values)
+		self.assertEqual(BaseScore, 3.8)
+		self.assertEqual(TemporalScore, 2.8)
+		self.assertTrue(math.isnan(EnvironmentalScore))
+		self.assertTrue(math.isnan(cvssv2.fast_compute_env(cvss_vector_values)))
+		cvss_vector_values, error_messages = cvssv2.parse_cvssv2_vector("AV:N/AC:L/Au:N/C:N/I:N/A:X/E:F/RL:OF/RC:C")
+		self.assertTrue(all(math.isnan(score) for score in cvssv2.fast_compute_all(cvss_vector_values)))
+
+	def test09(self):
+		"""The lookup-table engine keeps the sign of the -0.0 base score returned by compute_base."""
+		cvss_vector_values, error_messages = cvssv2.parse_cvssv2_vector("AV:L/AC:H/Au:M/C:N/I:N/A:N/E:U/RL:OF/RC:UC")
+		self.assertEqual(repr(cvssv2.fast_compute_base(cvss_vector_values)), repr(cvssv2.compute_base(cvss_vector_values)))
+		self.assertEqual(repr(cvssv2.fast_compute_temp(cvss_vector_values)), "-0.0")
+
+	def test10(self):
+		"""Packed vectors encode into and decode from the canonical vector string."""
+		cvss_vector = "AV:N/AC:L/Au:N/C:N/I:N/A:C/E:F/RL:OF/RC:C/CDP:H/TD:H/CR:M/IR:M/AR:H"
+		packed = cvssv2.encode_cvssv2_vector(cvss_vector)
+		self.assertEqual(cvssv2.decode_cvssv2_vector(packed), cvss_vector)
+		self.assertEqual(cvssv2.encode_cvssv2_vector("AR:H/IR:M/CR:M/TD:H/CDP:H/RC:C/RL:OF/E:F/A:C/I:N/C:N/Au:N/AC:L/AV:N"), packed)
+		self.assertEqual(cvssv2.decode_cvssv2_vector(cvssv2.encode_cvssv2_vector("AV:A/AC:M/Au:S/C:P/I:P/A:N/AR:MX/AR:Mx")), "AV:A/AC:M/Au:S/C:P/I:P/A:N/AR:")
+		self.assertEqual(cvssv2.encode_cvssv2_vector("AV:A/AC:M/Au:S/C:P/I:P/A:N/AR:"), cvssv2.encode_cvssv2_vector("AV:A/AC:M/Au:S/C:P/I:P/A:N/AR:Mx"))
+		self.assertEqual(cvssv2.unpack_cvssv2_values(cvssv2.encode_cvssv2_vector("AV:N/AC:L/Au:N/C:C/I:C/A:C/XX:Y")), {"AV":"N", "AC":"L", "Au":"N", "C":"C", "I":"C", "A":"C"})
+
+	def test11(self):
+		"""The compute_* functions accept packed vectors."""
+		for cvss_vector in ("AV:N/AC:L/Au:N/C:N/I:N/A:C/E:F/RL:OF/RC:C/CDP:H/TD:H/CR:M/IR:M/AR:H", "AV:A/AC:L/Au:S/C:P/I:C/A:N/E:POC/RL:U/RC:UC/CDP:H/TD:ND/CR:H/IR:L/AR:M", "AV:A/AC:M/Au:S/C:P/I:P/A:N/E:U/RL:OF/RC:C/CR:L/TD:L/IR:M/CDP:L/AR:Mx", "AV:N/AC:L/Au:N/C:C/I:C/A:C"):
+			cvss_vector_values, error_messages = cvssv2.parse_cvssv2_vector(cvss_vector)
+			packed = cvssv2.pack_cvssv2_values(cvss_vector_values)
+			self.assertEqual(repr(cvssv2.compute_base(packed)), repr(cvssv2.compute_base(cvss_vector_values)))
+			self.assertEqual(repr(cvssv2.compute_temp(packed)), repr(cvssv2.compute_temp(cvss_vector_values)))
+			self.assertEqual(repr(cvssv2.compute_env(packed)), repr(cvssv2.compute_env(cvss_vector_values)))
+			self.assertEqual(repr(cvssv2.compute_temp(packed, 5.0)), repr(cvssv2.compute_temp(cvss_vector_values, 5.0)))
+
+	@unittest.skipIf(numpy == None, "NumPy is not available")
+	def test12(self):
+		"""score_many returns the same values as the scalar functions."""
+		cvss_vectors = [
+			"AV:N/AC:L/Au:N/C:N/I:N/A:C/E:F/RL:OF/RC:C/CDP:H/TD:H/CR:M/IR:M/AR:H",
+			"AV:N/AC:L/Au:N/C:C/I:C/A:C",
+			"AV:L/AC:H/Au:N/C:C/I:C/A:C",
+			"AV:L/AC:L/Au:N/C:N/I:P/A:C/E:U/RL:W/RC:UR/CDP:L/TD:M/CR:L/IR:H/AR:L",
+			"AV:A/AC:L/Au:S/C:P/I:C/A:N/E:POC/RL:U/RC:UC/CDP:H/TD:ND/CR:H/IR:L/AR:M",
+			"AV:A/AC:M/Au:M/C:P/I:P/A:C/E:U/RL:TF/RC:UR/CDP:LM/TD:L/CR:M/IR:M/AR:L",
+			"AV:A/AC:M/Au:S/C:P/I:P/A:N/E:U/RL:OF/RC:C/CR:L/TD:L/IR:M/CDP:L/AR:MX/AR:Mx",
+			"AV:L/AC:H/Au:M/C:N/I:N/A:N/E:U/RL:OF/RC:UC",
+			"AV:N/AC:L/Au:N/C:C/I:C/A:X/E:F/RL:OF/RC:C",
+			""
+		]
+		rnd = random.Random(12)
+		all_metrics_values = cvssv2.base_metrics_values + cvssv2.temp_metrics_values + cvssv2.env_metrics_values
+		for i in range(2000):
+			cvss_vectors.append("/".join(metric + ":" + rnd.choice(values) for metric, values in all_metrics_values))
+		score_arrays = cvssv2.score_many(cvss_vectors)
+		packed_score_arrays = cvssv2.score_many(numpy.array([cvssv2.encode_cvssv2_vector(cvss_vector) for cvss_vector in cvss_vectors]))
+		for i, cvss_vector in enumerate(cvss_vectors):
+			cvss_vector_values, error_messages = cvssv2.parse_cvssv2_vector(cvss_vector)
+			expected = cvssv2.fast_compute_all(cvss_vector_values)
+			self.assertEqual([repr(float(score_array[i])) for score_array in score_arrays], [repr(score) for score in expected])
+			self.assertEqual([repr(float(score_array[i])) for score_array in packed_score_arrays], [repr(score) for score in expected])
+		self.assertEqual(repr(cvssv2.compute_env(cvssv2.parse_cvssv2_vector(cvss_vectors[4])[0])), repr(float(score_arrays[4][4])))
+
+	def test13(self):
+		"""The batch mode writes one row per input vector."""
+		in_file = StringIO("AV:N/AC:L/Au:N/C:N/I:N/A:C/E:F/RL:OF/RC:C/CDP:H/TD:H/CR:M/IR:M/AR:H\n\nAV:N/AC:L/Au:N/C:C/I:C/A:C\n")
+		out_file = StringIO()
+		self.assertEqual(cvssv2.score_batch(in_file, out_file, "tsv", 1), 2)
+		self.assertEqual(out_file.getvalue(), "AV:N/AC:L/Au:N/C:N/I:N/A:C/E:F/RL:OF/RC:C/CDP:H/TD:H/CR:M/IR:M/AR:H\t7.8\t6.9\t10.0\t6.4\t9.2\nAV:N/AC:L/Au:N/C:C/I:C/A:C\t10.0\t10.0\t10.0\tnan\tnan\n")
+
+		in_file = StringIO("AV:N/AC:L/Au:N/C:C/I:C/A:C\n")
+		out_file = StringIO()
+		cvssv2.score_batch(in_file, out_file, "csv")
+		self.assertEqual(out_file.getvalue(), "vector,base,impact,exploitability,temporal,environmental\nAV:N/AC:L/Au:N/C:C/I:C/A:C,10.0,10.0,10.0,nan,nan\n")
+
+		in_file = StringIO("AV:N/AC:L/Au:N/C:C/I:C/A:C\n")
+		out_file = StringIO()
+		cvssv2.score_batch(in_file, out_file, "jsonl")
+		self.assertEqual(json.loads(out_file.getvalue()), {"vector": "AV:N/AC:L/Au:N/C:C/I:C/A:C", "base": 10.0, "impact": 10.0, "exploitability": 10.0, "temporal": None, "environmental": None})
+
+	def test14(self):
+		"""The parallel batch mode writes the same rows in the same order as the sequential batch mode."""
+		rnd = random.Random(14)
+		all_metrics_values = cvssv2.base_metrics_values + cvssv2.temp_metrics_values + cvssv2.env_metrics_values
+		lines = list()
+		for i in range(500):
+			lines.append("/".join(metric + ":" + rnd.choice(values) for metric, values in all_metrics_values[:rnd.randint(0, len(all_metrics_values))]))
+		file_descriptor, file_name = tempfile.mkstemp()
+		try:
+			with os.fdopen(file_descriptor, "w") as f:
+				f.write("\n".join(lines) + "\n")
+			shards = cvssv2.file_shards(file_name, 1000)
+			self.assertTrue(len(shards) > 2)
+			self.assertEqual(shards[0][0], 0)
+			self.assertEqual(shards[-1][1], os.path.getsize(file_name))
+			expected_out_file = StringIO()
+			with open(file_name, "r") as in_file:
+				cvssv2.score_batch(in_file, expected_out_file, "csv")
+			out_file = StringIO()
+			cvssv2.score_file_parallel(file_name, out_file, "csv", 3, 1000)
+			self.assertEqual(out_file.getvalue(), expected_out_file.getvalue())
+		finally:
+			os.remove(file_name)
+
+	def test15(self):
+		"""The score cache returns the same scores, shares them among equivalent vectors and evicts the least recently used entries."""
+		self.assertEqual(cvssv2.canonical_cvssv2_vector("AV:A/AC:M/Au:S/C:P/I:P/A:N/AR:MX/AR:Mx/E:U"), "AV:A/AC:M/Au:S/C:P/I:P/A:N/E:U/AR:")
+		cvssv2.enable_score_cache(4)
+		try:
+			cvss_vector = "AV:N/AC:L/Au:N/C:N/I:N/A:C/E:F/RL:OF/RC:C/CDP:H/TD:H/CR:M/IR:M/AR:H"
+			self.assertEqual(cvssv2.score_vector(cvss_vector), (7.8, 6.9, 10.0, 6.4, 9.2))
+			self.assertEqual(cvssv2.score_vector(cvss_vector), (7.8, 6.9, 10.0, 6.4, 9.2))
+			self.assertEqual(cvssv2.score_vector("AR:H/IR:M/CR:M/TD:H/CDP:H/RC:C/RL:OF/E:F/A:C/I:N/C:N/Au:N/AC:L/AV:N"), (7.8, 6.9, 10.0, 6.4, 9.2))
+			info = cvssv2.score_cache_info()
+			self.assertEqual((info["hits"], info["misses"], info["size"], info["evictions"]), (2, 1, 1, 0))
+			# the library functions share the cache
+			cvss_vector_values = cvssv2.parse_cvssv2_vector(cvss_vector)[0]
+			self.assertEqual((cvssv2.compute_base(cvss_vector_values), cvssv2.compute_temp(cvss_vector_values), cvssv2.compute_env(cvss_vector_values)), ((7.8, 6.9, 10.0), 6.4, 9.2))
+			self.assertEqual(cvssv2.evaluate_cvssv2_vector(cvss_vector).as_tuple()[1:6], (7.8, 6.9, 10.0, 6.4, 9.2))
+			self.assertEqual(cvssv2.score_cache_info()["hits"], 6)
+			self.assertRaises(KeyError, cvssv2.compute_env, {"CDP": "H", "TD": "H", "CR": "M", "IR": "M", "AR": "H"})
+			for other_vector in ("AV:N/AC:L/Au:N/C:C/I:C/A:C", "AV:L/AC:L/Au:N/C:C/I:C/A:C", "AV:A/AC:L/Au:N/C:C/I:C/A:C", "AV:A/AC:M/Au:N/C:C/I:C/A:C"):
+				cvssv2.score_vector(other_vector)
+			info = cvssv2.score_cache_info()
+			self.assertEqual((info["size"], info["evictions"]), (4, 1))
+			self.assertNotIn(cvssv2.encode_cvssv2_vector(cvss_vector), cvssv2.score_cache.entries)
+		finally:
+			cvssv2.disable_score_cache()
+		self.assertEqual(cvssv2.score_cache_info(), None)
+
+	def test16(self):
+		"""The single-pass validator reports the same errors as the validate_metrics_* functions."""
+		cvss_vector = "AV:A/AC:M/Au:S/C:P/I:P/E:U/RL:OF/RC:C/CR:L/TD:L/IR:M/CDP:L/AR:MX/AR:Mx"
+		cvss_vector_values, error_messages = cvssv2.parse_cvssv2_vector(cvss_vector)
+		validation = cvssv2.validate_metrics_all(cvss_vector_values)
+		self.assertEqual((validation.base_incomplete, validation.temp_incomplete, validation.env_incomplete), (True, False, True))
+		self.assertEqual(validation.missing, {"base": ["A"], "temp": [], "env": []})
+		self.assertEqual(validation.invalid, {"base": [], "temp": [], "env": ["AR"]})
+		self.assertEqual(validation.messages["env"], "The metric value 'AR:Mx' is invalid (valid values are ['L', 'M', 'H', 'ND']).\n")
+		for group, validate_function in (("base", cvssv2.validate_metrics_base), ("temp", cvssv2.validate_metrics_temp), ("env", cvssv2.validate_metrics_env)):
+			missing_list, error_list, error_messages = validate_function(cvss_vector_values)
+			self.assertEqual((validation.missing[group], validation.errors[group], validation.messages[group]), (missing_list, error_list, error_messages))
+		self.assertTrue(validation.absent("env") == False and cvssv2.validate_metrics_all({}).absent("temp"))
+		# the messages are formatted once
+		self.assertTrue(validation.messages is validation.messages)
+		self.assertEqual((cvssv2.validate_metrics_all({}).temp_missing_count, validation.env_missing_count), (3, 0))
+
+	def test17(self):
+		"""The compute_* functions give the same results with a ValidationResult as with their own validation."""
+		for cvss_vector in ("AV:N/AC:L/Au:N/C:N/I:N/A:C/E:F/RL:OF/RC:C/CDP:H/TD:H/CR:M/IR:M/AR:H", "AV:A/AC:M/Au:S/C:P/I:P/A:N/E:U/RL:OF/RC:C/CR:L/TD:L/IR:M/CDP:L/AR:Mx", "AV:N/AC:L/Au:N/C:C/I:C/A:C", "AV:N/AC:X/Au:N/C:C/I:C/A:C/E:F/RL:OF/RC:C/CDP:H/TD:H/CR:M/IR:M/AR:H"):
+			cvss_vector_values, error_messages = cvssv2.parse_cvssv2_vector(cvss_vector)
+			validation = cvssv2.validate_metrics_all(cvss_vector_values)
+			self.assertEqual(repr(cvssv2.compute_base(cvss_vector_values, validation = validation)), repr(cvssv2.compute_base(cvss_vector_values)))
+			self.assertEqual(repr(cvssv2.compute_temp(cvss_vector_values, validation = validation)), repr(cvssv2.compute_temp(cvss_vector_values)))
+			self.assertEqual(repr(cvssv2.compute_env(cvss_vector_values, validation = validation)), repr(cvssv2.compute_env(cvss_vector_values)))
+
+	def test18(self):
+		"""The fast parsers give the same results as parse_cvssv2_vector on valid and malformed vectors."""
+		import bench
+		for cvss_vector in bench.mixed_corpus(3000, 18) + ["", "/", "AV:N//AC:L", "AV:N:X/AC", "AV:N/AV:X", "AV:X/AV:N", None]:
+			self.assertEqual(cvssv2.parse_cvssv2_vector_fast(cvss_vector), cvssv2.parse_cvssv2_vector(cvss_vector))
+			self.assertEqual(cvssv2.encode_cvssv2_vector(cvss_vector), cvssv2.pack_cvssv2_values(cvssv2.parse_cvssv2_vector(cvss_vector)[0]))
+			if cvss_vector != None:
+				# byte strings (looked up in the byte token tables on Python 3)
+				self.assertEqual(cvssv2.parse_cvssv2_vector_fast(cvss_vector.encode("ascii")), cvssv2.parse_cvssv2_vector(cvss_vector))
+				self.assertEqual(cvssv2.encode_cvssv2_vector(cvss_vector.encode("ascii")), cvssv2.encode_cvssv2_vector(cvss_vector))
+		self.assertEqual(cvssv2.parse_cvssv2_vector_fast(u"AV:N/AC:L/Au:N/C:C/I:C/A:C"), cvssv2.parse_cvssv2_vector("AV:N/AC:L/Au:N/C:C/I:C/A:C"))
+
+	def test19(self):
+		"""The benchmark corpora are deterministic and the comparison of the benchmark results flags slowdowns."""
+		import bench
+		self.assertEqual(bench.build_corpora(50, 19), bench.build_corpora(50, 19))
+		exhaustive = bench.exhaustive_corpus()
+		self.assertEqual(len(set(exhaustive)), 72900)
+		self.assertFalse(any(cvssv2.validate_metrics_all(cvssv2.parse_cvssv2_vector(cvss_vector)[0]).env_incomplete for cvss_vector in exhaustive[::997]))
+		for cvss_vector in bench.shuffled_corpus(20, 19):
+			self.assertEqual(cvssv2.encode_cvssv2_vector(cvss_vector), cvssv2.encode_cvssv2_vector(cvssv2.canonical_cvssv2_vector(cvss_vector)))
+			self.assertFalse(cvssv2.validate_metrics_all(cvssv2.parse_cvssv2_vector(cvss_vector)[0]).env_incomplete)
+		old_results = {"random": {"parse": {"seconds": 1.0, "rate": 1000.0}, "encode": {"seconds": 1.0, "rate": 1000.0}}}
+		new_results = {"random": {"parse": {"seconds": 1.0, "rate": 950.0}, "encode": {"seconds": 2.0, "rate": 500.0}, "new": {"seconds": 1.0, "rate": 1.0}}}
+		self.assertEqual(bench.compare_results(old_results, new_results, 0.1), [("random", "encode", 1000.0, 500.0)])
+
+	def test20(self):
+		"""The golden file matches the scalar functions (random vectors of some blocks), the NumPy backend (all the blocks) and the fast backend (the first block), and a wrong backend is caught."""
+		import golden
+		for score in (-0.2, -0.0, 0.0, 4.3, 10.0):
+			self.assertEqual(repr(golden.decode_score(golden.encode_score(score))), repr(score))
+		self.assertTrue(math.isnan(golden.decode_score(golden.encode_score(float("NaN")))))
+		golden_file = tempfile.NamedTemporaryFile(delete=False)
+		golden_file.close()
+		try:
+			golden.generate_golden_file(golden_file.name, 1)
+			golden_file_names = [golden_file.name]
+			if numpy != None:
+				golden_file_names.append(golden.cached_golden_file())
+				self.assertEqual(golden.verify_golden_file(golden_file_names[-1], golden.numpy_backend), (0, []))
+			# the blocks are generated in steps, the scalar backend scores every vector separately
+			rnd = random.Random(20)
+			for file_name in golden_file_names:
+				for base_index, base_scores, temp_scores, env_scores in golden.read_golden_blocks(file_name):
+					if (base_index % 97) != 0:
+						continue
+					positions = [rnd.randrange(golden.block_size) for i in range(200)]
+					packed_vectors = golden.block_packed_vectors(base_index)
+					scores = list(golden.scalar_backend([int(packed_vectors[position]) for position in positions]))
+					self.assertEqual(golden.encode_scores(scores[0]), base_scores[0:1] * len(positions))
+					self.assertEqual(golden.encode_scores(scores[3]), b"".join(temp_scores[position // cvssv2.env_index_count:position // cvssv2.env_index_count + 1] for position in positions))
+					self.assertEqual(golden.encode_scores(scores[4]), b"".join(env_scores[position:position + 1] for position in positions))
+			self.assertEqual(golden.verify_golden_file(golden_file.name, golden.fast_backend), (0, []))
+			def wrong_backend(packed_vectors):
+				scores = [list(sequence) for sequence in golden.fast_backend(packed_vectors)]
+				scores[4][7] += 0.1
+				return scores
+			backends = [wrong_backend]
+			if numpy != None:
+				backends.append(lambda packed_vectors: [numpy.array(scores) for scores in wrong_backend(packed_vectors)])
+			for backend in backends:
+				mismatch_count, mismatches = golden.verify_golden_file(golden_file.name, backend)
+				self.assertEqual(mismatch_count, 1)
+				self.assertEqual(mismatches[0][1], "EnvironmentalScore")
+		finally:
+			os.remove(golden_file.name)
+
+	def test21(self):
+		"""The server answers pipelined vector, JSON and STATS requests on a Unix socket."""
+		import socket
+		import threading
+		socket_path = tempfile.mktemp(suffix=".sock")
+		server = cvssv2.make_server(socket_path)
+		server_thread = threading.Thread(target=server.serve_forever)
+		server_thread.start()
+		try:
+			client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+			client.connect(socket_path)
+			client.sendall(b"AV:N/AC:L/Au:N/C:N/I:N/A:C/E:F/RL:OF/RC:C/CDP:H/TD:H/CR:M/IR:M/AR:H\n{\"id\": 7, \"vector\": \"AV:N/AC:L/Au:N/C:C/I:C/A:C\"}\n{\"vector\": 1}\nSTATS\n")
+			responses = client.makefile("r")
+			self.assertEqual(responses.readline(), "AV:N/AC:L/Au:N/C:N/I:N/A:C/E:F/RL:OF/RC:C/CDP:H/TD:H/CR:M/IR:M/AR:H\t7.8\t6.9\t10.0\t6.4\t9.2\n")
+			self.assertEqual(json.loads(responses.readline()), {"id": 7, "vector": "AV:N/AC:L/Au:N/C:C/I:C/A:C", "base": 10.0, "impact": 10.0, "exploitability": 10.0, "temporal": None, "environmental": None})
+			self.assertIn("error", json.loads(responses.readline()))
+			stats = json.loads(responses.readline())
+			self.assertEqual((stats["requests"], stats["errors"], stats["connections"]), (3, 1, 1))
+			self.assertEqual(sum(stats["latency_us"].values()), 3)
+			responses.close()
+			client.close()
+			self.assertRaises(ValueError, cvssv2.make_server, socket_path)
+		finally:
+			server.shutdown()
+			server_thread.join()
+			server.server_close()
+			os.remove(socket_path)
+
+	def test22(self):
+		"""The reverse score index answers the range, histogram and threshold queries like a brute-force search."""
+		score_index = cvssv2.get_score_index()
+		base_vectors = score_index.base_packed
+		self.assertEqual(score_index.base_range(7.0, 8.9), sorted([packed for packed in base_vectors if 7.0 <= cvssv2.fast_compute_all(packed)[0] <= 8.9], key=lambda packed: (cvssv2.fast_compute_all(packed)[0], packed)))
+		self.assertEqual(sum(score_index.base_histogram().values()), 729)
+		self.assertEqual(sum(score_index.temp_histogram().values()), 72900)
+		self.assertEqual(len(score_index.temp_range(-1.0, 11.0)), 72900)
+		cvss_vector = "AV:N/AC:L/Au:N/C:P/I:P/A:P/E:F/RL:OF/RC:C"
+		env_vectors = score_index.env_range(cvss_vector, 8.0, 10.0)
+		self.assertEqual(len(env_vectors), 136)
+		self.assertTrue(all(cvssv2.decode_cvssv2_vector(packed).startswith(cvss_vector + "/") and cvssv2.fast_compute_all(packed)[4] >= 8.0 for packed in env_vectors))
+		self.assertEqual(list(score_index.env_histogram(cvss_vector).items())[-1], (8.7, 2))
+		self.assertEqual(score_index.minimal_changes("AV:N/AC:L/Au:N/C:P/I:P/A:P", 9.0), (1, [cvssv2.encode_cvssv2_vector(cvss_vector) for cvss_vector in ("AV:N/AC:L/Au:N/C:C/I:P/A:P", "AV:N/AC:L/Au:N/C:P/I:C/A:P", "AV:N/AC:L/Au:N/C:P/I:P/A:C")]))
+		self.assertEqual(score_index.minimal_changes("AV:N/AC:L/Au:N/C:P/I:P/A:P", 4.0, above=False, metrics=["AV"]), (None, []))
+		self.assertEqual(score_index.minimal_changes("AV:N/AC:L/Au:N/C:P/I:P/A:P", 7.0)[0], 0)
+		self.assertRaises(ValueError, score_index.minimal_changes, "AV:N/AC:L/Au:N/C:P/I:P/A:P", 9.0, "env")
+
+	def test23(self):
+		"""The incrementally updated scores are the same as the scores of the whole updated vector."""
+		rnd = random.Random(23)
+		all_metrics_values = cvssv2.base_metrics_values + cvssv2.temp_metrics_values + cvssv2.env_metrics_values
+		incremental_scores = cvssv2.IncrementalScores()
+		for i in range(3000):
+			changes = dict((metric, rnd.choice(values + ("X",))) for metric, values in rnd.sample(all_metrics_values, rnd.randint(1, 3)))
+			self.assertEqual([repr(score) for score in incremental_scores.update(changes)], [repr(score) for score in cvssv2.fast_compute_all(incremental_scores.packed)])
+		incremental_scores = cvssv2.IncrementalScores("AV:N/AC:L/Au:N/C:N/I:N/A:C/E:F/RL:OF/RC:C")
+		self.assertEqual(incremental_scores.scores()[:4], (7.8, 6.9, 10.0, 6.4))
+		self.assertTrue(math.isnan(incremental_scores.EnvironmentalScore))
+		asset_scores = incremental_scores.copy()
+		self.assertEqual(asset_scores.update("CDP:H/TD:H/CR:M/IR:M/AR:H"), (7.8, 6.9, 10.0, 6.4, 9.2))
+		self.assertEqual(asset_scores.update({"TD": "N"}), (7.8, 6.9, 10.0, 6.4, 0.0))
+		self.assertEqual(asset_scores.update(cvssv2.encode_cvssv2_vector("E:H/TD:H")), (7.8, 6.9, 10.0, 6.8, 9.3))
+		self.assertTrue(math.isnan(incremental_scores.EnvironmentalScore))
+
+	def test24(self):
+		"""The score store returns the rows and the aggregates of the scored vectors."""
+		import store
+		cvss_vectors = ["AV:N/AC:L/Au:N/C:N/I:N/A:C/E:F/RL:OF/RC:C/CDP:H/TD:H/CR:M/IR:M/AR:H", "AV:N/AC:L/Au:N/C:C/I:C/A:C", "AV:L/AC:H/Au:M/C:N/I:N/A:N", "AV:N/AC:L", "AV:N/AC:L/Au:N/C:C/I:C/A:C"]
+		file_descriptor, file_name = tempfile.mkstemp()
+		os.close(file_descriptor)
+		try:
+			self.assertEqual(store.write_store(file_name, cvss_vectors, 2), 5)
+			with store.ScoreStore(file_name) as score_store:
+				self.assertEqual(len(score_store), 5)
+				for row, cvss_vector in enumerate(cvss_vectors):
+					self.assertEqual(score_store.row(row)[0], cvssv2.canonical_cvssv2_vector(cvss_vector))
+					self.assertEqual([repr(score) for score in score_store.row(row)[1]], [repr(score) for score in cvssv2.score_vector(cvss_vector)])
+				self.assertEqual(list(score_store.histogram("base").items()), [(0.0, 1), (7.8, 1), (10.0, 2)])
+				self.assertEqual(score_store.count_range("base", 7.0, 10.0), 3)
+				self.assertEqual(score_store.mean("temporal"), 6.4)
+				self.assertEqual(score_store.mean("environmental"), 9.2)
+				if numpy != None:
+					self.assertEqual(score_store.packed_vectors().tolist(), [cvssv2.encode_cvssv2_vector(cvss_vector) for cvss_vector in cvss_vectors])
+					self.assertFalse(score_store.codes("base").flags.owndata)
+			with open(file_name, "r+b") as f:
+				f.truncate(70)
+			self.assertRaises(ValueError, store.ScoreStore, file_name)
+			self.assertRaises(ValueError, store.write_store, file_name, cvss_vectors[:2] + ["CVSS:3.1/AV:N/AC:L/PR:N/UI:N/S:U/C:H/I:H/A:H"])
+			self.assertRaises(ValueError, store.ScoreStore, file_name)
+		finally:
+			os.remove(file_name)
+
+	def test25(self):
+		"""The CVSS v3 calculator returns the scores of the specification examples, the lookup tables agree with the equations and mixed input is scored in one pass."""
+		import cvssv3
+		for cvss_vector, base_score in (("AV:N/AC:L/PR:N/UI:R/S:C/C:L/I:L/A:N", 6.1), ("AV:N/AC:L/PR:L/UI:N/S:C/C:L/I:L/A:N", 6.4), ("AV:N/AC:H/PR:N/UI:R/S:U/C:L/I:N/A:N", 3.1), ("AV:N/AC:L/PR:L/UI:N/S:C/C:H/I:H/A:H", 9.9), ("AV:L/AC:L/PR:H/UI:N/S:U/C:L/I:L/A:L", 4.2), ("AV:N/AC:L/PR:N/UI:N/S:U/C:H/I:N/A:N", 7.5), ("AV:P/AC:L/PR:N/UI:N/S:U/C:H/I:H/A:H", 6.8)):
+			for version in ("3.0", "3.1"):
+				self.assertEqual(cvssv3.score_vector("CVSS:" + version + "/" + cvss_vector)[0], base_score)
+		self.assertEqual(cvssv3.score_vector("CVSS:3.1/AV:N/AC:L/PR:N/UI:N/S:U/C:H/I:H/A:H/E:P/RL:O/RC:C/CR:H/MAV:L/MS:C"), (9.8, 5.9, 3.9, 8.8, 8.4))
+		self.assertEqual((cvssv3.roundup(4.000000000000001, "3.1"), cvssv3.roundup(4.000000000000001, "3.0")), (4.0, 4.1))
+		self.assertTrue(all(math.isnan(score) for score in cvssv3.score_vector("CVSS:3.2/AV:N/AC:L/PR:N/UI:N/S:U/C:H/I:H/A:H")))
+		rnd = random.Random(25)
+		all_metrics_values = cvssv3.base_metrics_values + cvssv3.temp_metrics_values + cvssv3.env_metrics_values
+		for i in range(2000):
+			version = rnd.choice(("3.0", "3.1"))
+			cvss_values = dict((metric, rnd.choice(values + ("Z",)) if rnd.random() < 0.02 else rnd.choice(values)) for metric, values in all_metrics_values if (metric in dict(cvssv3.base_metrics_values)) or (rnd.random() < 0.5))
+			expected = cvssv3.compute_base(cvss_values, version) + (cvssv3.compute_temp(cvss_values, version), cvssv3.compute_env(cvss_values, version))
+			self.assertEqual([repr(score) for score in cvssv3.fast_compute_all(cvss_values, version)], [repr(score) for score in expected])
+		in_file = StringIO("CVSS:3.1/AV:N/AC:L/PR:N/UI:N/S:U/C:H/I:H/A:H\nAV:N/AC:L/Au:N/C:C/I:C/A:C\n")
+		out_file = StringIO()
+		cvssv2.score_batch(in_file, out_file)
+		self.assertEqual(out_file.getvalue(), "CVSS:3.1/AV:N/AC:L/PR:N/UI:N/S:U/C:H/I:H/A:H\t9.8\t5.9\t3.9\t9.8\t9.8\nAV:N/AC:L/Au:N/C:C/I:C/A:C\t10.0\t10.0\t10.0\tnan\tnan\n")
+
+	def test26(self):
+		"""The structured results record error codes and format the same messages as the command line program on demand."""
+		import pickle
+		cvss_vector = "AV:N/AC:L/Au:N/C:P/I:P/A:P/foo/E:X/RL:OF/RC:C"
+		result = cvssv2.evaluate_cvssv2_vector(cvss_vector)
+		self.assertEqual(result.scores()[:3], (7.5, 6.4, 10.0))
+		self.assertEqual(result.error_codes()[:3], [cvssv2.error_unparseable, cvssv2.error_invalid, cvssv2.error_missing])
+		self.assertEqual(result.diagnostics[:3], ((cvssv2.error_unparseable, None, None, "foo"), (cvssv2.error_invalid, "temp", "E", "X"), (cvssv2.error_missing, "env", "CDP", None)))
+		cvss_vector_values, error_messages = cvssv2.parse_cvssv2_vector(cvss_vector)
+		validation = cvssv2.validate_metrics_all(cvss_vector_values)
+		self.assertEqual(result.messages(), error_messages + validation.messages["base"] + validation.messages["temp"] + validation.messages["env"])
+		self.assertEqual(repr(pickle.loads(pickle.dumps(result))), repr(result))
+		self.assertEqual(repr(pickle.loads(pickle.dumps(result, 2)).as_tuple()), repr(result.as_tuple()))
+		self.assertRaises(AttributeError, setattr, result, "extra", 1)
+		self.assertEqual(cvssv2.evaluate_cvssv2_vector("AV:N/AC:L/Au:N/C:N/I:N/A:C/E:F/RL:OF/RC:C/CDP:H/TD:H/CR:M/IR:M/AR:H").as_tuple(), ("AV:N/AC:L/Au:N/C:N/I:N/A:C/E:F/RL:OF/RC:C/CDP:H/TD:H/CR:M/IR:M/AR:H", 7.8, 6.9, 10.0, 6.4, 9.2, ()))
+
+
+	def test27(self):
+		"""The module imports without argparse and without building any table. The timed latency budget of bench.py depends on the load of the machine, so it is checked only if the environment variable CVSSV2_CHECK_BUDGET is set (or by python bench.py --budget)."""
+		import bench
+		import_time, argparse_imported, tables_built = bench.measure_import()
+		self.assertFalse(argparse_imported)
+		self.assertFalse(tables_built)
+		if os.environ.get("CVSSV2_CHECK_BUDGET"):
+			self.assertEqual(bench.check_latency_budget(), [])
+
+
+	def test28(self):
+		"""The aggregate statistics count the scores and the metric values, and the aggregates of the shards merge into the aggregates of the whole file."""
+		lines = ["AV:N/AC:L/Au:N/C:N/I:N/A:C/E:F/RL:OF/RC:C/CDP:H/TD:H/CR:M/IR:M/AR:H", "AV:N/AC:L/Au:N/C:C/I:C/A:C", "AV:L/AC:H/Au:N/C:C/I:C/A:C", "AV:X/AC:L", "CVSS:3.1/AV:N/AC:L/PR:N/UI:N/S:U/C:H/I:H/A:H"]
+		stats = cvssv2.collect_stats(lines)
+		self.assertEqual((stats.count, stats.invalid_count, stats.cvssv3_count), (5, 1, 1))
+		self.assertEqual(list(stats.histogram("base").items()), [(6.2, 1), (7.8, 1), (9.8, 1), (10.0, 1)])
+		self.assertEqual(stats.missing("temporal"), 3)
+		self.assertAlmostEqual(stats.mean("base"), 8.45)
+		self.assertEqual([stats.percentile("base", percent) for percent in (0, 25, 50, 75, 100)], [6.2, 6.2, 7.8, 9.8, 10.0])
+		self.assertEqual(list(stats.severity_counts("base").values()), [0, 1, 3])
+		self.assertEqual(list(stats.metric_value_counts("AV").items()), [("L", 1), ("A", 0), ("N", 2), ("missing", 0), ("invalid", 1)])
+		self.assertEqual(cvssv2.score_stats_from_dict(json.loads(json.dumps(stats.to_dict()))).to_dict(), stats.to_dict())
+		self.assertTrue(math.isnan(cvssv2.ScoreStats().mean("base")))
+
+		rnd = random.Random(28)
+		all_metrics_values = cvssv2.base_metrics_values + cvssv2.temp_metrics_values + cvssv2.env_metrics_values
+		lines = ["/".join(metric + ":" + rnd.choice(values) for metric, values in all_metrics_values[:rnd.randint(1, len(all_metrics_values))]) for i in range(500)]
+		file_descriptor, file_name = tempfile.mkstemp()
+		try:
+			with os.fdopen(file_descriptor, "w") as f:
+				f.write("\n".join(lines) + "\n")
+			expected = cvssv2.collect_stats(lines[:200]).merge(cvssv2.collect_stats(lines[200:])).to_dict()
+			self.assertEqual(cvssv2.collect_stats_parallel(file_name, 3, 1000).to_dict(), expected)
+		finally:
+			os.remove(file_name)
+
+
+	def test29(self):
+		"""The profiling counts the calls of the pipeline stages and restores the original functions when disabled."""
+		encode_cvssv2_vector = cvssv2.encode_cvssv2_vector
+		temp_score = cvssv2.ScoringTables.__dict__["temp_score"]
+		group_index = cvssv2.group_index
+		group_indices = cvssv2.group_indices
+		self.assertEqual(cvssv2.profiling_report(), None)
+		cvssv2.enable_profiling()
+		try:
+			self.assertNotEqual(cvssv2.encode_cvssv2_vector, encode_cvssv2_vector)
+			cvss_vector = "AV:N/AC:L/Au:N/C:N/I:N/A:C/E:F/RL:OF/RC:C/CDP:H/TD:H/CR:M/IR:M/AR:H"
+			self.assertEqual(cvssv2.score_vector(cvss_vector), (7.8, 6.9, 10.0, 6.4, 9.2))
+			self.assertEqual(cvssv2.score_vector("AV:N/AC:L/Au:N/C:C/I:C/A:C")[:3], (10.0, 10.0, 10.0))
+			cvss_vector_values, error_messages = cvssv2.parse_cvssv2_vector(cvss_vector)
+			validation = cvssv2.validate_metrics_all(cvss_vector_values)
+			self.assertEqual(cvssv2.compute_env(cvss_vector_values, validation = validation), 9.2)
+			cvssv2.batch_row_formatter("tsv")(cvss_vector, (7.8, 6.9, 10.0, 6.4, 9.2))
+			report = cvssv2.profiling_report()
+			self.assertEqual(json.loads(json.dumps(report)), report)
+			stages = report["stages"]
+			self.assertEqual([stage for stage, names in cvssv2.profiled_stages], list(stages.keys()))
+			self.assertEqual([stages[stage]["calls"] for stage in ("parse", "validate_all", "compute_base", "compute_temp", "compute_env", "compute_all", "format")], [3, 3, 1, 2, 2, 2, 1])
+			# the validation of the groups by the group index lookups
+			self.assertEqual([stages[stage]["calls"] for stage in ("validate_base", "validate_temp", "validate_env")], [2, 2, 2])
+			self.assertTrue(0 <= stages["compute_all"]["self_seconds"] <= stages["compute_all"]["seconds"] <= report["wall_seconds"])
+		finally:
+			cvssv2.disable_profiling()
+		self.assertEqual(cvssv2.encode_cvssv2_vector, encode_cvssv2_vector)
+		self.assertEqual(cvssv2.ScoringTables.__dict__["temp_score"], temp_score)
+		self.assertEqual((cvssv2.group_index, cvssv2.group_indices), (group_index, group_indices))
+		self.assertEqual(cvssv2.profiling_report(), None)
+
+
+	def test30(self):
+		"""The what-if analysis reports the same deltas and severity crossings as rescoring the substituted vectors."""
+		self.assertEqual([cvssv2.severity_band(score) for score in (-0.0, 3.9, 4.0, 6.9, 7.0, 10.0, float("NaN"))], ["Low", "Low", "Medium", "Medium", "High", "High", None])
+		self.assertRaises(ValueError, cvssv2.parse_substitution_rules, "XX:U=OF")
+		self.assertRaises(ValueError, cvssv2.parse_substitution_rules, "RL:U=X")
+		rules = cvssv2.parse_substitution_rules("RL:U=OF,CR=H")
+		self.assertEqual(cvssv2.decode_cvssv2_vector(cvssv2.substitute_packed(cvssv2.encode_cvssv2_vector("AV:N/AC:L/Au:N/C:C/I:C/A:C/E:F/RL:U/RC:C"), rules)), "AV:N/AC:L/Au:N/C:C/I:C/A:C/E:F/RL:OF/RC:C/CR:H")
+		report = cvssv2.what_if(["AV:N/AC:L/Au:N/C:N/I:N/A:C/E:F/RL:OF/RC:C/CDP:H/TD:H/CR:M/IR:M/AR:H", "AV:N/AC:L/Au:N/C:C/I:C/A:C", "CVSS:3.1/AV:N/AC:L/PR:N/UI:N/S:U/C:H/I:H/A:H"], "AV=L", "base")
+		self.assertEqual((report.count, report.changed, report.skipped, dict(report.deltas)), (3, 2, 1, {-2.9: 1, -2.8: 1}))
+		self.assertEqual(report.crossings, [(0, "AV:N/AC:L/Au:N/C:N/I:N/A:C/E:F/RL:OF/RC:C/CDP:H/TD:H/CR:M/IR:M/AR:H", 7.8, 4.9)])
+		self.assertEqual(dict(report.band_changes), {("High", "Medium"): 1})
+
+		rnd = random.Random(30)
+		all_metrics_values = cvssv2.base_metrics_values + cvssv2.temp_metrics_values + cvssv2.env_metrics_values
+		lines = ["/".join(metric + ":" + rnd.choice(values) for metric, values in all_metrics_values[:rnd.randint(6, len(all_metrics_values))]) for i in range(1000)]
+		for rules_string in ("RL:U=OF,CR=H", "CDP=H", "AV:L=N", "E:ND=U,TD:H=N"):
+			rules = cvssv2.parse_substitution_rules(rules_string)
+			report = cvssv2.what_if(lines, rules_string)
+			crossings = list()
+			for position, cvss_vector in enumerate(lines):
+				old_score = cvssv2.overall_score(cvssv2.fast_compute_all(cvssv2.encode_cvssv2_vector(cvss_vector)))
+				new_score = cvssv2.overall_score(cvssv2.fast_compute_all(cvssv2.substitute_packed(cvssv2.encode_cvssv2_vector(cvss_vector), rules)))
+				if cvssv2.severity_band(old_score) != cvssv2.severity_band(new_score):
+					crossings.append((position, cvss_vector, old_score, new_score))
+			self.assertEqual(report.crossings, crossings)
+			self.assertEqual(sum(report.deltas.values()), 1000)
+		self.assertEqual(json.loads(json.dumps(report.to_dict()))["count"], 1000)
+
+		# a small change cache and a limited list of the crossings give the same aggregates
+		what_if_cache_size = cvssv2.what_if_cache_size
+		cvssv2.what_if_cache_size = 10
+		try:
+			limited_report = cvssv2.what_if(lines + lines, rules_string, "overall", 3)
+		finally:
+			cvssv2.what_if_cache_size = what_if_cache_size
+		self.assertEqual(limited_report.crossings, report.crossings[:3])
+		self.assertEqual(dict(limited_report.band_changes), dict((band_change, 2 * count) for band_change, count in report.band_changes.items()))
+		self.assertEqual(dict(limited_report.deltas), dict((delta, 2 * count) for delta, count in report.deltas.items()))
+		self.assertIn("severity changes: {} (the first 3 listed)".format(2 * len(report.crossings)), limited_report.summary())
+
+	def test31(self):
+		"""The score cache returns the right scores and consistent counters when it is shared by several threads (as in the server)."""
+		import threading
+		cache = cvssv2.ScoreCache(64)
+		rnd = random.Random(31)
+		lines = ["/".join(metric + ":" + rnd.choice(values) for metric, values in cvssv2.base_metrics_values + cvssv2.temp_metrics_values) for i in range(500)]
+		failures = list()
+		def score_lines(seed):
+			thread_rnd = random.Random(seed)
+			for i in range(2000):
+				cvss_vector = thread_rnd.choice(lines)
+				# str, NaN is not equal to itself
+				if str(cache.score(cvss_vector)) != str(cvssv2.fast_compute_all(cvssv2.encode_cvssv2_vector(cvss_vector))):
+					failures.append(cvss_vector)
+		threads = [threading.Thread(target=score_lines, args=(seed,)) for seed in range(4)]
+		for thread in threads:
+			thread.start()
+		for thread in threads:
+			thread.join()
+		self.assertEqual(failures, [])
+		info = cache.info()
+		self.assertEqual(info["hits"] + info["misses"], 8000)
+		self.assertTrue(info["size"] <= 64)
+
+
 
 # runs the test suite if run as a standalone program
 if __name__ == '__main__':
@@ -4,14 +4,17 @@
 import vysavacice
 import random
 
+# read and index the word list once for both glue lengths
+glue_index = vysavacice.GlueIndex("nouns.txt", 2, 3)
+
 # initialize Vysavacice
-vys = vysavacice.Vysavacice("nouns.txt", 3, 9)
+vys = vysavacice.Vysavacice(None, 3, 9, lazy = True, glue_index = glue_index)
 
 # print all concatenated words
 vys.print_result()
 
 # initialize another Vysavacice
-vys2 = vysavacice.Vysavacice("nouns.txt", 2, 7)
+vys2 = vysavacice.Vysavacice(None, 2, 7, lazy = True, glue_index = glue_index)
 
 # open a file with normal text and print out a vysavacice-ized text
 
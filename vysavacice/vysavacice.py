@@ -5,15 +5,29 @@
 class Vysavacice:
 	"""Reads words from a word list file and matches them into concatenations that share the common beginning/end of the individual word pairs. E.g. words PICTURE and RELAXATION from the list form a concatenated word PICTURELAXATION. The class also provides intermediary data that can be used for other purposes."""
 
-	def __init__(self, word_list_file_name, glue_len_num_of_chars, word_len_limit):
-		self.wordlist = self.read_word_list_file(word_list_file_name, word_len_limit, glue_len_num_of_chars)
-		self.word_endings_dict, self.word_beginnings_dict = self.create_word_glue_dicts(self.wordlist, glue_len_num_of_chars)
-		self.concatenated_words_dict, self.concatenated_equations_dict, self.dict_glue_numofwords, self.dict_numofwords_listofglues = self.match_glue_words(self.word_endings_dict, self.word_beginnings_dict, glue_len_num_of_chars)
-		self.exploded_list_eq, self.exploded_list_words = self.explode_concats_ascending_order(self.dict_numofwords_listofglues, self.concatenated_equations_dict, self.concatenated_words_dict)
+	def __init__(self, word_list_file_name, glue_len_num_of_chars, word_len_limit, lazy = False, glue_index = None):
+		"""In the lazy mode, only the glue dicts and the counts of the concatenations are built; the concatenations and equations are not stored (the *_dict and exploded_list_* attributes are None) but generated one at a time by iter_concatenations, so the memory use is proportional to the word list and not to the output. If glue_index (a GlueIndex) is given, the word list and the glue dicts are taken from it and word_list_file_name must be None."""
+		self.glue_len_num_of_chars = glue_len_num_of_chars
+		self.lazy = lazy
+		if glue_index != None:
+			if word_list_file_name != None:
+				raise ValueError("The word list file name must be None when glue_index is given.")
+			self.wordlist, self.word_endings_dict, self.word_beginnings_dict = glue_index.glue_dicts(glue_len_num_of_chars, word_len_limit)
+		else:
+			self.wordlist = self.read_word_list_file(word_list_file_name, word_len_limit, glue_len_num_of_chars)
+			self.word_endings_dict, self.word_beginnings_dict = self.create_word_glue_dicts(self.wordlist, glue_len_num_of_chars)
+		if lazy:
+			self.concatenated_words_dict, self.concatenated_equations_dict = None, None
+			self.dict_glue_numofwords, self.dict_numofwords_listofglues = self.count_glue_words(self.word_endings_dict, self.word_beginnings_dict)
+			self.exploded_list_eq, self.exploded_list_words = None, None
+		else:
+			self.concatenated_words_dict, self.concatenated_equations_dict, self.dict_glue_numofwords, self.dict_numofwords_listofglues = self.match_glue_words(self.word_endings_dict, self.word_beginnings_dict, glue_len_num_of_chars)
+			self.exploded_list_eq, self.exploded_list_words = self.explode_concats_ascending_order(self.dict_numofwords_listofglues, self.concatenated_equations_dict, self.concatenated_words_dict)
 
 
-	def read_word_list_file(self, file_name, word_len_limit, glue_len_num_of_chars):
-		"""Reads words from a file and saves them into a list. Assumes that there is one word per line and the file is in UTF-8."""
+	@staticmethod
+	def read_word_list_file(file_name, word_len_limit, glue_len_num_of_chars):
+		"""Reads words from a file and saves them into a list. Assumes that there is one word per line and the file is in UTF-8. Keeps the words longer than glue_len_num_of_chars and shorter than word_len_limit."""
 		wordlist=list() # in-memory representation of the wordlist
 		with open(file_name, "rb") as f:
 			for line in f:
@@ -93,6 +107,23 @@ class Vysavacice:
 					count_set.add(glued_words_count)
 		return concatenated_words_dict, concatenated_equations_dict, glue_count, glue_count2
 
+
+
+	def count_glue_words(self, word_endings_dict, word_beginnings_dict):
+		"""Counts the concatenations of every glue without building them. Returns the same glue counts as match_glue_words: a dict of string:integer (glue:number of words created using this glue) and a dict of integer:list (number of words:list of glues), with the glues in the same order."""
+		glue_count = {} # dict of string:integer (glue/start/end string:number of words created using this glue string)
+		glue_count2 = {} # dict of integer:list (number of words created using this glue string:list of glue/start/end string)
+		for glue in word_endings_dict:
+			if glue in word_beginnings_dict:
+				glued_words_count = len(word_endings_dict[glue]) * len(word_beginnings_dict[glue])
+				if glued_words_count > 0:
+					glue_count[glue] = glued_words_count
+					if glued_words_count in glue_count2:
+						glue_count2[glued_words_count].append(glue)
+					else:
+						glue_count2[glued_words_count] = [glue]
+		return glue_count, glue_count2
+
 			
 	def explode_concats_ascending_order(self, dict_numofwords_listofglues, concatenated_equations_dict, concatenated_words_dict):
 		"""Explodes concatenations from concatenated_equations_dict, concatenated_words_dict according to the list of incidence for individual glue strings in ascending order. Concatenations with unique glue strings are listed first and after that are listed concatenations with more and more common glue strings."""
@@ -110,14 +141,376 @@ class Vysavacice:
 					exploded_list_words.append(word)
 		return exploded_list_eq, exploded_list_words
 
+	def iter_concatenations(self):
+		"""Generates the (concatenated word, concatenation equation) pairs in the same order as explode_concats_ascending_order (concatenations with unique glue strings first), building them one at a time from the glue dicts."""
+		howmany = self.glue_len_num_of_chars
+		for glue_count in sorted(self.dict_numofwords_listofglues.keys()): # ascending order
+			for glue in self.dict_numofwords_listofglues[glue_count]:
+				beginnings_list = self.word_beginnings_dict[glue]
+				for word1 in self.word_endings_dict[glue]:
+					for word2 in beginnings_list:
+						concatenated = word1 + word2[howmany:]
+						yield concatenated, u"".join((word1, u" + ", word2, u" = ", concatenated))
+
+	def iter_words(self):
+		"""Generates the concatenated words in the order of iter_concatenations."""
+		for concatenated, concatenated_equation in self.iter_concatenations():
+			yield concatenated
+
+	def iter_equations(self):
+		"""Generates the concatenation equations in the order of iter_concatenations."""
+		for concatenated, concatenated_equation in self.iter_concatenations():
+			yield concatenated_equation
+
+	def plan_concatenations(self, sample_size = 1000):
+		"""Sizes the output of this instance (see plan_glue_concatenations). In the eager mode the concatenations are already built when the instance is created, so to plan a setting before building it, call plan_glue_concatenations on the glue dicts (or create the instance with lazy = True)."""
+		return plan_glue_concatenations(self.word_endings_dict, self.word_beginnings_dict, self.glue_len_num_of_chars, sample_size)
+
 	def print_result(self):
-		"""Prints the result of all concatenations."""
-		for word in self.exploded_list_eq:
+		"""Prints the result of all concatenations. In the lazy mode, the equations are streamed from iter_equations."""
+		if self.lazy:
+			equations = self.iter_equations()
+		else:
+			equations = self.exploded_list_eq
+		for word in equations:
 			## printing unicode sometimes throws an error (TODO: why?) but printing binary str with utf-8-encoded text is OK
 			## assuming that the OS uses utf-8
 			print word.encode("utf-8")
 
 
+
+def plan_glue_concatenations(word_endings_dict, word_beginnings_dict, glue_len_num_of_chars, sample_size = 1000):
+	"""Sizes the output of Vysavacice with the given glue dicts (see Vysavacice.create_word_glue_dicts and GlueIndex.glue_dicts) without building it. The counts and lengths of the concatenations are computed from the glue dicts (len(endings) * len(beginnings) pairs per glue), the memory of the eager mode is estimated from the sizes of the string objects, and the time of building all concatenations is extrapolated from building sample_size of them. The sampled pairs are drawn at random with the glues weighted by their numbers of concatenations, so the sample is not biased towards the rare glues that come first in the output. Returns a dict of string:number (see the comments below)."""
+	import bisect
+	import random
+	import struct
+	import sys
+	import time
+	howmany = glue_len_num_of_chars
+	glues = list() # the glues with at least one concatenation
+	cumulative_counts = list() # the number of concatenations of the glues up to and including every glue of glues
+	histogram = {} # dict of integer:integer (number of concatenations of a glue:number of such glues)
+	total = 0
+	word_chars = 0 # the number of characters of all concatenated words
+	for glue in word_endings_dict:
+		if glue in word_beginnings_dict:
+			endings_list = word_endings_dict[glue]
+			beginnings_list = word_beginnings_dict[glue]
+			pairs = len(endings_list) * len(beginnings_list)
+			if pairs == 0:
+				continue
+			total += pairs
+			glues.append(glue)
+			cumulative_counts.append(total)
+			histogram[pairs] = histogram.get(pairs, 0) + 1
+			# every word of one list is paired with every word of the other list
+			word_chars += len(beginnings_list) * sum(len(word) for word in endings_list) + len(endings_list) * sum(len(word) - howmany for word in beginnings_list)
+	# word1 + " + " + word2 + " = " + concatenated has twice the characters of the concatenated word plus the glue and the 6 characters of the operators
+	equation_chars = 2 * word_chars + total * (howmany + 6)
+	empty_size = sys.getsizeof(u"")
+	char_size = sys.getsizeof(u"aa") - sys.getsizeof(u"a")
+	pointer_size = struct.calcsize("P")
+	# the eager mode keeps every string once and refers to it from the *_dict lists and from the exploded_list_* lists
+	memory_bytes = 2 * total * empty_size + (word_chars + equation_chars) * char_size + 4 * total * pointer_size
+
+	# the sample is drawn before the timing, only building the strings is timed
+	rnd = random.Random(0)
+	sample = list()
+	for i in range(min(sample_size, total)):
+		glue = glues[bisect.bisect_right(cumulative_counts, rnd.randrange(total))]
+		sample.append((rnd.choice(word_endings_dict[glue]), rnd.choice(word_beginnings_dict[glue])))
+	start = time.time()
+	for word1, word2 in sample:
+		concatenated = word1 + word2[howmany:]
+		concatenated_equation = u"".join((word1, u" + ", word2, u" = ", concatenated))
+	elapsed = time.time() - start
+	if len(sample) > 0:
+		seconds = elapsed / len(sample) * total
+	else:
+		seconds = 0.0
+
+	return {
+		"total": total, # the number of concatenations
+		"glues": len(glues), # the number of glue strings with at least one concatenation
+		"histogram": histogram, # dict of integer:integer (number of concatenations of a glue:number of such glues)
+		"word_chars": word_chars, # the number of characters of all concatenated words
+		"equation_chars": equation_chars, # the number of characters of all equations
+		"memory_bytes": memory_bytes, # the estimated memory of the concatenations in the eager mode
+		"seconds": seconds # the estimated time of building all concatenations
+	}
+
+
+
+class GlueIndex:
+	"""Reads words from a word list file once and indexes them by their beginnings and endings of every length from min_glue_len to max_glue_len in one pass over the words. The index serves Vysavacice instances with any glue length in that range and any word length limit (see the glue_index parameter of Vysavacice) and answers which word pairs share an overlap of a given length (see overlapping_pairs)."""
+
+	def __init__(self, word_list_file_name, min_glue_len, max_glue_len):
+		self.min_glue_len = min_glue_len
+		self.max_glue_len = max_glue_len
+		# the shortest words usable by any glue length of the index, with no upper limit
+		self.wordlist = Vysavacice.read_word_list_file(word_list_file_name, float("inf"), min_glue_len)
+		self.max_word_len = max([len(word) for word in self.wordlist] + [0])
+		self.word_positions = {} # dict of string:integer (word:position of its first occurrence in wordlist)
+		for position, word in enumerate(self.wordlist):
+			self.word_positions.setdefault(word, position)
+		self.word_endings_dicts, self.word_beginnings_dicts = self.create_word_glue_dicts(self.wordlist, range(min_glue_len, max_glue_len + 1))
+
+
+	def create_word_glue_dicts(self, word_list, glue_lens):
+		"""Creates the dictionaries of endings/beginnings and the respective words for all glue lengths in one pass over the words. Returns two dicts of integer:dict (glue length:(ending/beginning:list of words)). A word is indexed only for the glue lengths shorter than the word (the same as in Vysavacice); the lists keep the order of the word list."""
+		word_endings_dicts = dict((glue_len, {}) for glue_len in glue_lens)
+		word_beginnings_dicts = dict((glue_len, {}) for glue_len in glue_lens)
+		for word in word_list:
+			for glue_len in glue_lens:
+				if len(word) <= glue_len:
+					break
+				word_endings_dicts[glue_len].setdefault(word[-glue_len:], []).append(word)
+				word_beginnings_dicts[glue_len].setdefault(word[:glue_len], []).append(word)
+		return word_endings_dicts, word_beginnings_dicts
+
+
+	def glue_dicts(self, glue_len, word_len_limit):
+		"""Returns the word list and the endings/beginnings dicts of the words longer than glue_len and shorter than word_len_limit; they are the same (including the order) as the ones of Vysavacice.read_word_list_file and Vysavacice.create_word_glue_dicts. The dicts are filtered from the dicts of the index without indexing the words again (see filter_glue_dict); if no word is too long, the dicts of the index are returned without copying (they must not be modified)."""
+		if not (self.min_glue_len <= glue_len <= self.max_glue_len):
+			raise ValueError("The glue length " + str(glue_len) + " is not indexed (the index has the lengths " + str(self.min_glue_len) + " to " + str(self.max_glue_len) + ").")
+		wordlist = [word for word in self.wordlist if len(word) > glue_len and len(word) < word_len_limit]
+		if word_len_limit > self.max_word_len:
+			return wordlist, self.word_endings_dicts[glue_len], self.word_beginnings_dicts[glue_len]
+		return wordlist, self.filter_glue_dict(self.word_endings_dicts[glue_len], word_len_limit), self.filter_glue_dict(self.word_beginnings_dicts[glue_len], word_len_limit)
+
+
+	def filter_glue_dict(self, glue_dict, word_len_limit):
+		"""Returns a copy of the endings/beginnings dict without the words of word_len_limit or more characters (and without the glues that are left with no words). The order of a dict depends on the order in which its keys were inserted, so the glues are inserted in the order of their first remaining word in the word list, which is the order in which Vysavacice.create_word_glue_dicts inserts them."""
+		filtered_list = list() # list of (position of the first word, glue, list of words)
+		for glue, words in glue_dict.iteritems():
+			short_words = [word for word in words if len(word) < word_len_limit]
+			if len(short_words) > 0:
+				filtered_list.append((self.word_positions[short_words[0]], glue, short_words))
+		filtered_list.sort()
+		filtered_dict = {}
+		for position, glue, short_words in filtered_list:
+			filtered_dict[glue] = short_words
+		return filtered_dict
+
+
+	def overlapping_pairs(self, glue_len):
+		"""Generates the (word1, word2, glue) triples of all word pairs where the last glue_len characters of word1 are the first glue_len characters of word2."""
+		word_endings_dict = self.word_endings_dicts[glue_len]
+		word_beginnings_dict = self.word_beginnings_dicts[glue_len]
+		for glue in word_endings_dict:
+			if glue in word_beginnings_dict:
+				beginnings_list = word_beginnings_dict[glue]
+				for word1 in word_endings_dict[glue]:
+					for word2 in beginnings_list:
+						yield word1, word2, glue
+
+
+
+class OverlapMatcher:
+	"""Finds the word pairs with the longest (or with every sufficiently long) overlap of the end of the first word and the beginning of the second word, e.g. VYSAVAC + VACICE (overlap VAC). Uses an Aho-Corasick automaton over the word list: the trie of all words with the failure links, so walking a word through the automaton ends in the longest suffix of the word that is a prefix of some word, and the failure links from there list all shorter such suffixes. Every trie node also keeps the range of the words with its prefix in the sorted word list, so the partner words are found without searching. Building the automaton and matching a word take time linear in the length of the words.
+
+	The trie is stored compactly: the transitions in one dict keyed by integers (node and character code) and the other node data in integer arrays."""
+
+	char_bits = 21 # the number of bits of a unicode character code in the transition keys
+
+	def __init__(self, word_list):
+		import array
+		self.sorted_words = sorted(word_list)
+		self.transitions = {} # dict of integer:integer ((node << char_bits) | character code:child node)
+		self.parent = array.array("l", [0]) # the parent node of every node; the root is the node 0
+		self.label = array.array("l", [0]) # the character code of the transition from the parent
+		self.depth = array.array("l", [0]) # the length of the prefix of the node
+		self.range_start = array.array("l", [0]) # the first position of the words with the prefix in sorted_words
+		self.range_end = array.array("l", [len(self.sorted_words)]) # the position after the last word with the prefix
+		self.fail = array.array("l", [0]) # the failure link: the node of the longest proper suffix of the prefix that is a prefix of some word
+		self.build_trie()
+		self.build_failure_links()
+
+
+	def build_trie(self):
+		"""Inserts the sorted words into the trie. The words with a common prefix are adjacent in sorted_words, so every node's words form a range."""
+		transitions = self.transitions
+		char_bits = self.char_bits
+		for position, word in enumerate(self.sorted_words):
+			node = 0
+			for char in word:
+				key = (node << char_bits) | ord(char)
+				child = transitions.get(key)
+				if child == None:
+					child = len(self.depth)
+					transitions[key] = child
+					self.parent.append(node)
+					self.label.append(ord(char))
+					self.depth.append(self.depth[node] + 1)
+					self.range_start.append(position)
+					self.range_end.append(position + 1)
+					self.fail.append(0)
+				else:
+					self.range_end[child] = position + 1
+				node = child
+
+
+	def build_failure_links(self):
+		"""Computes the failure links in the order of the node depths (the links of the parents and of all shorter prefixes are known before a node is processed)."""
+		nodes_by_depth = sorted(range(1, len(self.depth)), key=self.depth.__getitem__)
+		for node in nodes_by_depth:
+			parent = self.parent[node]
+			if parent != 0:
+				self.fail[node] = self.goto(self.fail[parent], self.label[node])
+
+
+	def goto(self, node, char_code):
+		"""Returns the node reached from the node by the character (following the failure links while there is no transition)."""
+		transitions = self.transitions
+		while True:
+			child = transitions.get((node << self.char_bits) | char_code)
+			if child != None:
+				return child
+			if node == 0:
+				return 0
+			node = self.fail[node]
+
+
+	def overlap_nodes(self, word):
+		"""Generates the trie nodes of the suffixes of the word that are prefixes of some word, from the longest one. The whole word is not its own overlap, so the nodes at least as deep as the word are skipped."""
+		node = 0
+		for char in word:
+			node = self.goto(node, ord(char))
+		while node != 0:
+			if self.depth[node] < len(word):
+				yield node
+			node = self.fail[node]
+
+
+	def node_partners(self, node):
+		"""Returns the words with the prefix of the node that are longer than the prefix (the overlap must leave some characters of the second word)."""
+		overlap_len = self.depth[node]
+		return [word for word in self.sorted_words[self.range_start[node]:self.range_end[node]] if len(word) > overlap_len]
+
+
+	def longest_overlap_partners(self, word, min_overlap_len = 1):
+		"""Returns the length of the longest overlap (at least min_overlap_len characters) of the end of the word with the beginning of some other word and the list of those words. Returns 0 and an empty list if there is no such overlap."""
+		for node in self.overlap_nodes(word):
+			if self.depth[node] < min_overlap_len:
+				break
+			partners = self.node_partners(node)
+			if len(partners) > 0:
+				return self.depth[node], partners
+		return 0, []
+
+
+	def overlap_partners(self, word, min_overlap_len):
+		"""Generates the (overlap length, partner word) pairs of all overlaps of at least min_overlap_len characters of the end of the word with the beginning of other words, the longest overlaps first."""
+		for node in self.overlap_nodes(word):
+			if self.depth[node] < min_overlap_len:
+				break
+			for partner in self.node_partners(node):
+				yield self.depth[node], partner
+
+
+	def longest_overlaps(self, min_overlap_len = 1):
+		"""Generates the (word1, word2, overlap length) triples of the longest overlap of every word (see longest_overlap_partners), in the order of the sorted words. The concatenated word is word1 + word2[overlap length:]."""
+		for word1 in self.sorted_words:
+			overlap_len, partners = self.longest_overlap_partners(word1, min_overlap_len)
+			for word2 in partners:
+				yield word1, word2, overlap_len
+
+
+	def all_overlaps(self, min_overlap_len):
+		"""Generates the (word1, word2, overlap length) triples of all overlaps of at least min_overlap_len characters (see overlap_partners), in the order of the sorted words."""
+		for word1 in self.sorted_words:
+			for overlap_len, word2 in self.overlap_partners(word1, min_overlap_len):
+				yield word1, word2, overlap_len
+
+
+
+class WordChainGraph:
+	"""Finds chains of words where the ending of every word is the beginning of the next word, e.g. KROCAN + ANKO + KOKOS = KROCANKOKOS. The chains are paths in a directed graph of the words built from word_endings_dict and word_beginnings_dict (see Vysavacice). All successors of a word begin with its ending, so the graph is stored per glue instead of per edge: the words have integer ids (positions in the sorted word list), every word points to the glue of its ending and every glue to the range of the ids of the words beginning with it, all in integer arrays. The size of the graph is linear in the number of words, although the number of edges is not."""
+
+	def __init__(self, word_endings_dict, word_beginnings_dict, glue_len_num_of_chars):
+		import array
+		self.glue_len_num_of_chars = glue_len_num_of_chars
+		words = set()
+		for word_list in word_endings_dict.values():
+			words.update(word_list)
+		for word_list in word_beginnings_dict.values():
+			words.update(word_list)
+		self.words = sorted(words) # the word of every word id
+		word_ids = dict((word, word_id) for word_id, word in enumerate(self.words))
+		self.glues = sorted(glue for glue in word_beginnings_dict if glue in word_endings_dict) # the glues that both end and begin some words
+		glue_ids = dict((glue, glue_id) for glue_id, glue in enumerate(self.glues))
+		self.glue_words = array.array("l") # the ids of the words beginning with every glue, glue after glue
+		self.glue_start = array.array("l", [0]) # the position of the words of every glue in glue_words (and the end after the last glue)
+		for glue in self.glues:
+			self.glue_words.extend(sorted(set(word_ids[word] for word in word_beginnings_dict[glue])))
+			self.glue_start.append(len(self.glue_words))
+		self.word_end_glue = array.array("l", [glue_ids.get(word[-glue_len_num_of_chars:], -1) for word in self.words]) # the glue id of the ending of every word (-1 if no word begins with it)
+
+
+	def successors(self, word_id):
+		"""Returns the range of the positions of the successors of the word in glue_words."""
+		glue_id = self.word_end_glue[word_id]
+		if glue_id < 0:
+			return 0, 0
+		return self.glue_start[glue_id], self.glue_start[glue_id + 1]
+
+
+	def chain_heights(self, max_chain_len):
+		"""Returns the array of the number of words of the longest chain starting with every word, up to max_chain_len. The chains here may repeat words, so the heights are an upper bound of the chains that are generated; they are computed per glue, max_chain_len - 1 passes over the words."""
+		import array
+		heights = array.array("l", [1] * len(self.words))
+		for chain_len in range(2, max_chain_len + 1):
+			glue_heights = [max(heights[word_id] for word_id in self.glue_words[self.glue_start[glue_id]:self.glue_start[glue_id + 1]]) for glue_id in range(len(self.glues))]
+			new_heights = array.array("l", [1 + glue_heights[glue_id] if glue_id >= 0 else 1 for glue_id in self.word_end_glue])
+			if new_heights == heights:
+				break
+			heights = new_heights
+		return heights
+
+
+	def iter_chains(self, min_chain_len = 3, max_chain_len = 3, first_words = None):
+		"""Generates the chains (tuples of words) of min_chain_len to max_chain_len words, with no word used twice in a chain. The chains are found by a depth-first search from every word (or from the words in first_words) and generated one at a time, in the order of the sorted words. A word is not added to a chain if the longest chain starting with it (see chain_heights) cannot make the chain min_chain_len words long, so the search does not expand the words that lead to dead ends."""
+		heights = self.chain_heights(max_chain_len)
+		glue_words = self.glue_words
+		words = self.words
+		on_chain = bytearray(len(words)) # 1 for the words on the current chain
+		if first_words == None:
+			first_ids = range(len(words))
+		else:
+			word_ids = dict((word, word_id) for word_id, word in enumerate(words))
+			first_ids = [word_ids[word] for word in first_words if word in word_ids]
+		for first_id in first_ids:
+			if heights[first_id] < min_chain_len:
+				continue
+			chain = [first_id]
+			on_chain[first_id] = 1
+			positions = [list(self.successors(first_id))] # [next position, end] in glue_words for every word on the chain
+			if min_chain_len <= 1:
+				yield (words[first_id],)
+			while len(chain) > 0:
+				position, end = positions[-1]
+				if position >= end or len(chain) >= max_chain_len:
+					# backtrack
+					on_chain[chain.pop()] = 0
+					positions.pop()
+					continue
+				positions[-1][0] = position + 1
+				word_id = glue_words[position]
+				if on_chain[word_id] or len(chain) + heights[word_id] < min_chain_len:
+					continue
+				chain.append(word_id)
+				on_chain[word_id] = 1
+				positions.append(list(self.successors(word_id)))
+				if len(chain) >= min_chain_len:
+					yield tuple(words[chain_id] for chain_id in chain)
+
+
+	def chain_concatenation(self, chain):
+		"""Returns the concatenated word and the equation (in the format of Vysavacice) of the chain of words."""
+		concatenated = chain[0] + u"".join(word[self.glue_len_num_of_chars:] for word in chain[1:])
+		return concatenated, u" + ".join(chain) + u" = " + concatenated
+
+
 	
 import unittest
 import os
@@ -207,6 +600,96 @@ class VysavaciceUnittest(unittest.TestCase):
 		self.assertIn("foobarwordabc", exploded_list_words)
 		self.assertIn("foobarworddef", exploded_list_words)
 
+	def test_lazy_generators(self):
+		filename = "unittest_vysavacice_tmp.txt"
+		glue_len = 2
+		len_limit = 11
+		vys = Vysavacice(filename, glue_len, len_limit)
+		vys_lazy = Vysavacice(filename, glue_len, len_limit, lazy = True)
+		self.assertEqual(vys_lazy.exploded_list_eq, None)
+		self.assertEqual(vys_lazy.dict_numofwords_listofglues, vys.dict_numofwords_listofglues)
+		self.assertEqual(list(vys_lazy.iter_words()), vys.exploded_list_words)
+		self.assertEqual(list(vys_lazy.iter_equations()), vys.exploded_list_eq)
+		self.assertIn(u"foobarwo + wordabc = foobarwordabc", vys.exploded_list_eq)
+
+	def test_plan_concatenations(self):
+		filename = "unittest_vysavacice_tmp.txt"
+		glue_len = 2
+		len_limit = 11
+		vys = Vysavacice(filename, glue_len, len_limit)
+		plan = Vysavacice(filename, glue_len, len_limit, lazy = True).plan_concatenations()
+		self.assertEqual(plan["total"], len(vys.exploded_list_words))
+		self.assertEqual(plan["glues"], len(vys.dict_glue_numofwords))
+		self.assertEqual(plan["histogram"], dict((glue_count, len(glue_list)) for glue_count, glue_list in vys.dict_numofwords_listofglues.items()))
+		self.assertEqual(plan["word_chars"], sum(len(word) for word in vys.exploded_list_words))
+		self.assertEqual(plan["equation_chars"], sum(len(eq) for eq in vys.exploded_list_eq))
+		self.assertTrue(plan["memory_bytes"] > plan["equation_chars"])
+		# the plan of the glue dicts does not need an instance
+		word_endings_dict, word_beginnings_dict = vys.create_word_glue_dicts(vys.read_word_list_file(filename, len_limit, glue_len), glue_len)
+		glue_plan = plan_glue_concatenations(word_endings_dict, word_beginnings_dict, glue_len, 10)
+		del plan["seconds"], glue_plan["seconds"]
+		self.assertEqual(glue_plan, plan)
+
+	def test_glue_index(self):
+		filename = "unittest_vysavacice_tmp.txt"
+		index = GlueIndex(filename, 2, 5)
+		for glue_len in range(2, 6):
+			for len_limit in (9, 11, 100):
+				vys = Vysavacice(filename, glue_len, len_limit)
+				vys_index = Vysavacice(None, glue_len, len_limit, glue_index = index)
+				self.assertEqual(vys_index.wordlist, vys.wordlist)
+				self.assertEqual(vys_index.word_endings_dict, vys.word_endings_dict)
+				self.assertEqual(vys_index.word_beginnings_dict, vys.word_beginnings_dict)
+				self.assertEqual(vys_index.exploded_list_eq, vys.exploded_list_eq)
+		self.assertIn((u"foobarwo", u"wordabc", u"wo"), list(index.overlapping_pairs(2)))
+		self.assertIn((u"foobarwrod", u"wrodabc", u"wrod"), list(index.overlapping_pairs(4)))
+		self.assertRaises(ValueError, index.glue_dicts, 6, 11)
+		self.assertRaises(ValueError, Vysavacice, filename, 2, 11, glue_index = index)
+		# the index is not built again for a word length limit
+		calls = []
+		create_word_glue_dicts = index.create_word_glue_dicts
+		index.create_word_glue_dicts = lambda *args: calls.append(args) or create_word_glue_dicts(*args)
+		Vysavacice(None, 2, 9, glue_index = index)
+		index.glue_dicts(3, 9)
+		self.assertEqual(calls, [])
+
+	def test_overlap_matcher(self):
+		words = [u"vysavac", u"vacice", u"avacado", u"cice", u"ce", u"abab", u"bab", u"ababx", u"xyz"]
+		matcher = OverlapMatcher(words)
+		self.assertEqual(matcher.longest_overlap_partners(u"vysavac"), (4, [u"avacado"]))
+		self.assertEqual(list(matcher.overlap_partners(u"vysavac", 3)), [(4, u"avacado"), (3, u"vacice")])
+		# the overlap must leave some characters of the second word (cice, ce)
+		self.assertEqual(matcher.longest_overlap_partners(u"vacice"), (0, []))
+		self.assertEqual(matcher.longest_overlap_partners(u"abab"), (2, [u"abab", u"ababx"]))
+		self.assertEqual(matcher.longest_overlap_partners(u"xyz"), (0, []))
+		# compare with trying every overlap length
+		brute_force = set()
+		for word1 in words:
+			for word2 in words:
+				for overlap_len in range(2, min(len(word1), len(word2))):
+					if word1[-overlap_len:] == word2[:overlap_len]:
+						brute_force.add((word1, word2, overlap_len))
+		self.assertEqual(set(matcher.all_overlaps(2)), brute_force)
+		longest = dict()
+		for word1, word2, overlap_len in brute_force:
+			longest[word1] = max(longest.get(word1, 0), overlap_len)
+		self.assertEqual(set(matcher.longest_overlaps(2)), set(triple for triple in brute_force if triple[2] == longest[triple[0]]))
+
+	def test_word_chain_graph(self):
+		vys = Vysavacice("unittest_vysavacice_tmp.txt", 2, 11)
+		words = [u"krocan", u"cancani", u"nikl", u"klokan", u"anko", u"kokos", u"ostrov", u"ovoce", u"cecko", u"kolo"]
+		word_endings_dict, word_beginnings_dict = vys.create_word_glue_dicts(words, 2)
+		graph = WordChainGraph(word_endings_dict, word_beginnings_dict, 2)
+		self.assertEqual(list(graph.iter_chains(4, 4, [u"krocan"])), [(u"krocan", u"anko", u"kokos", u"ostrov")])
+		# cecko + kokos is not generated, kokos is already on the chain
+		self.assertEqual(list(graph.iter_chains(6, 8, [u"krocan"])), [(u"krocan", u"anko", u"kokos", u"ostrov", u"ovoce", u"cecko"), (u"krocan", u"anko", u"kokos", u"ostrov", u"ovoce", u"cecko", u"kolo")])
+		# compare with trying every sequence of words
+		import itertools
+		for chain_len in range(1, 5):
+			brute_force = [chain for chain in itertools.permutations(graph.words, chain_len) if all(word1[-2:] == word2[:2] for word1, word2 in zip(chain, chain[1:]))]
+			self.assertEqual(sorted(graph.iter_chains(chain_len, chain_len)), sorted(brute_force))
+		self.assertEqual(graph.chain_concatenation((u"krocan", u"anko", u"kokos")), (u"krocankokos", u"krocan + anko + kokos = krocankokos"))
+
 		
 
 